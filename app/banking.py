@@ -1,41 +1,80 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from datetime import datetime
+from collections import deque
+from dataclasses import dataclass, field
 from pathlib import Path
 import csv
+import io
+
+from app.bank_format import BankFormat, sniff_file
+from app.ledger import Ledger
+from app.transactions import Transactions, date_key
+
+# rows kept from each end of the statement; pick_latest_transactions
+# only ever needs the first/last row and the newest n
+KEEP_ROWS = 50
+# bytes before the parsed offset that must be unchanged for a grown
+# file to count as appended to (else it was rewritten: parse again)
+PROBE_BYTES = 64
+# statements are read this much at a time, never whole
+STREAM_BYTES = 64 * 1024
+
+
+@dataclass
+class _Progress:
+    """How far the newest CSV has been parsed, and every row so far as columns."""
+
+    path: Path
+    device: int
+    inode: int
+    size: int
+    mtime_ns: int
+    keep: int
+    fmt: BankFormat = BankFormat()   # sniffed when the file is first parsed
+    offset: int = 0              # bytes parsed, always at a line start
+    probe: bytes = b""           # the PROBE_BYTES before `offset`
+    count: int = 0
+    head: list[list[str]] = field(default_factory=list)
+    tail: deque = field(default_factory=deque)
+    book: Transactions = field(default_factory=Transactions)
+    # rows of an unterminated last line: in `book`, but not in the
+    # offset, head, tail or count — taken back once the file grows
+    pending: list[list[str]] = field(default_factory=list)
+
+    def same_file(self, path: Path, st) -> bool:
+        return self.path == path and (self.device, self.inode) == (st.st_dev, st.st_ino)
 
 
 class Banking:
-    def __init__(self, bank_dir: Path | None = None):
+    def __init__(self, bank_dir: Path | None = None, ledger: Ledger | None = None, *, history: bool = True):
         self.bank_dir: Path | None = bank_dir
+        self.ledger = ledger   # set: every CSV merged into one history, not just the newest
+        # off: only totals and the first/last rows are kept — memory stays
+        # O(bank_rows) however large the statement, but no monthly totals
+        self.keep_history = history
         self.error: str | None = None
 
         self.exists: bool = bool(bank_dir and bank_dir.exists() and bank_dir.is_dir())
 
+        self._progress: _Progress | None = None
+        self.rows_parsed = 0   # CSV rows parsed by the last update (0 = unchanged)
+
         # Current “state” you probably want to keep:
         self.transactions: list[list[str]] = []
         self.balance: float = 0.0
         self.total_spent: float = 0.0
         self.total_received: float = 0.0
-
+        self.history = Transactions()   # every row of the statement (or ledger), columnar
         if not self.exists:
             self.error = "Bank directory does not exist (or is not a directory)."
 
-    def _parse_bank_date(self, d: str):
-        for fmt in ("%d.%m.%Y", "%d/%m/%Y", "%Y-%m-%d"):
-            try:
-                return datetime.strptime((d or "").strip(), fmt)
-            except ValueError:
-                continue
-        return None
-
     def pick_latest_transactions(self, transactions: list[list[str]], n: int) -> list[list[str]]:
         if not transactions:
             return []
 
-        first_date = self._parse_bank_date(transactions[0][0] if transactions[0] else "")
-        last_date = self._parse_bank_date(transactions[-1][0] if transactions[-1] else "")
+        # rows are in Banking's layout by now (app/bank_format.py)
+        first_date = date_key(transactions[0][0] if transactions[0] else "")
+        last_date = date_key(transactions[-1][0] if transactions[-1] else "")
 
         if first_date and last_date:
             # ascending => newest at end
@@ -47,46 +86,182 @@ class Banking:
         # fallback: many exports are newest-first
         return transactions[:n]
 
-    def load_latest_bank_csv(self) -> tuple[list[list[str]], float, float, float]:
+    def signature(self) -> tuple | None:
+        """(name, mtime_ns, size) of the newest CSV — of every CSV in ledger
+        mode — a stat() per file, no parsing."""
         if not self.exists or self.bank_dir is None:
-            raise FileNotFoundError("Bank directory not found.")
+            return None
+        stamps = []
+        for path in self.bank_dir.glob("*.csv"):
+            st = path.stat()
+            stamps.append((st.st_mtime_ns, path.name, st.st_size))
+        if not stamps:
+            return None
+        if self.ledger is not None:
+            return tuple(sorted((name, mtime_ns, size) for mtime_ns, name, size in stamps))
+        mtime_ns, name, size = max(stamps)
+        return name, mtime_ns, size
 
-        csv_files = sorted(self.bank_dir.glob("*.csv"), key=lambda p: p.stat().st_mtime)
-        if not csv_files:
-            raise FileNotFoundError("Keine CSV-Dateien gefunden!")
+    def load_latest_bank_csv(self, rows: int = KEEP_ROWS) -> tuple[list[list[str]], float, float, float]:
+        """(newest `rows` transactions, balance, spent, received) of the newest CSV.
 
-        latest_csv_path = csv_files[-1]
+        Streams the file: totals are summed as it is read and only the
+        first and last `rows` rows are held, so memory does not grow
+        with the statement."""
+        path = self._latest_csv_path()
+        p = self._new_progress(path, path.stat(), rows, history=False)
+        with path.open("rb") as f:
+            _, rest = self._feed(p, f)
+        self._hold(p, rest)
+        total_spent, total_received = p.book.totals()
+        transactions = self.pick_latest_transactions(self._newest(p), rows)
+        return transactions, total_received - total_spent, total_spent, total_received
 
-        transactions: list[list[str]] = []
-        total_spent = 0.0
-        total_received = 0.0
+    # ── incremental parsing ─────────────────────────────────────────
+
+    def _latest_csv_path(self) -> Path:
+        if not self.exists or self.bank_dir is None:
+            raise FileNotFoundError("Bank directory not found.")
+        # the same pick as signature(): a file that grows becomes the newest
+        stamps = [(path.stat().st_mtime_ns, path.name, path) for path in self.bank_dir.glob("*.csv")]
+        if not stamps:
+            raise FileNotFoundError("Keine CSV-Dateien gefunden!")
+        return max(stamps)[2]
 
-        with latest_csv_path.open("r", encoding="utf-8", errors="replace") as f:
-            csv_reader = csv.reader(f, delimiter=";")
+    def _add_rows(self, p: _Progress, text: str, *, header: bool) -> int:
+        """Fold complete CSV lines into `p`, in Banking's layout; returns rows added."""
+        csv_reader = csv.reader(io.StringIO(text), delimiter=p.fmt.delimiter)
+        if header and p.fmt.header:
             next(csv_reader, None)
+        normalize = p.fmt.normalizer()
+        rows = [normalize(line) for line in csv_reader if line]
+        p.book.extend(rows)
+        if len(p.head) < p.keep:
+            p.head.extend(rows[: p.keep - len(p.head)])
+        p.tail.extend(rows)
+        p.count += len(rows)
+        return len(rows)
+
+    def _scan(self, keep: int) -> _Progress:
+        """Progress on the newest CSV, its book holding every row.
+
+        Finding the newest CSV costs one stat() per file; an older file
+        that grows becomes the newest without the directory changing.
+        Unchanged file: no read, the same progress and book.  Grown
+        file whose last PROBE_BYTES before the parsed offset are
+        untouched: the unterminated last line (if any) is taken back
+        and only the appended lines are parsed, into the same book.
+        Anything else (another file, truncation, rewrite, inode change)
+        parses the file again from the start, into a new book."""
+        prev = self._progress
+        path = self._latest_csv_path()
+        st = path.stat()
+
+        self.rows_parsed = 0
+        if (prev is not None and prev.same_file(path, st) and prev.keep >= keep
+                and st.st_size == prev.size and st.st_mtime_ns == prev.mtime_ns):
+            return prev
+
+        # the book is extended in place: until this scan completes, the
+        # progress must not be reused
+        self._progress = None
+        with path.open("rb") as f:
+            p = None
+            if prev is not None and prev.same_file(path, st) and prev.keep >= keep and st.st_size >= prev.offset:
+                start = max(0, prev.offset - len(prev.probe))
+                f.seek(start)
+                if f.read(prev.offset - start) == prev.probe:
+                    p = prev
+                    p.size, p.mtime_ns = st.st_size, st.st_mtime_ns
+                    p.book.drop(p.pending)
+                    p.pending = []
+            if p is None:   # new file, truncated or rewritten
+                f.seek(0)
+                p = self._new_progress(path, st, keep, history=self.keep_history)
+            added, rest = self._feed(p, f)
+
+        self._hold(p, rest)
+        self.rows_parsed = added + len(p.pending)
+        self._progress = p
+        return p
+
+    @staticmethod
+    def _new_progress(path: Path, st, keep: int, *, history: bool) -> _Progress:
+        return _Progress(path, st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, keep,
+                         sniff_file(path), tail=deque(maxlen=keep), book=Transactions(columns=history))
 
-            for line in csv_reader:
-                transactions.append(line)
+    def _feed(self, p: _Progress, f) -> tuple[int, bytes]:
+        """Parse `f` from its position on, STREAM_BYTES at a time.
 
-                spent_str = (line[3] or "").replace("'", "")
-                try:
-                    total_spent += float(spent_str) if spent_str else 0.0
-                except ValueError:
-                    pass
+        Returns rows added and the bytes after the last newline.  Only
+        whole lines advance the offset; a line still being written (or
+        a last line without newline) is left to the caller."""
+        added = 0
+        rest = b""
+        while True:
+            block = f.read(STREAM_BYTES)
+            if not block:
+                return added, rest
+            data = rest + block
+            cut = data.rfind(b"\n") + 1
+            if cut:
+                added += self._add_rows(p, data[:cut].decode(p.fmt.encoding, errors="replace"), header=p.offset == 0)
+                p.offset += cut
+                p.probe = (p.probe + data[:cut])[-PROBE_BYTES:]
+            rest = data[cut:]
 
-                recv_str = (line[4] or "").replace("'", "")
-                try:
-                    total_received += float(recv_str) if recv_str else 0.0
-                except ValueError:
-                    pass
+    def _hold(self, p: _Progress, rest: bytes):
+        """Add the rows of an unterminated last line to `p`'s book only,
+        as `p.pending`, so they can be taken back once the line grows."""
+        if not rest.strip():
+            return
+        scratch = _Progress(p.path, 0, 0, 0, 0, p.keep, p.fmt, tail=deque(maxlen=p.keep),
+                            book=Transactions(columns=False))
+        self._add_rows(scratch, rest.decode(p.fmt.encoding, errors="replace"), header=p.offset == 0)
+        p.pending = list(scratch.tail)
+        p.book.extend(p.pending)
 
-        balance = total_received - total_spent
-        return transactions, balance, total_spent, total_received
+    @staticmethod
+    def _newest(p: _Progress) -> list[list[str]]:
+        """First and last rows of the statement, in file order — all
+        pick_latest_transactions needs to find the newest."""
+        pending = p.pending
+        count = p.count + len(pending)
+        if count <= len(p.head) + len(pending):
+            return p.head + pending
+        # rows past the head; the middle of a long statement is never needed
+        tail = list(p.tail) + pending
+        return p.head + tail[-min(len(tail), count - len(p.head)):]
+
+    def _update_ledger(self, rows: int) -> None:
+        if not self.exists or self.bank_dir is None:
+            raise FileNotFoundError("Bank directory not found.")
+        paths = list(self.bank_dir.glob("*.csv"))
+        if not paths:
+            raise FileNotFoundError("Keine CSV-Dateien gefunden!")
+        tx, book = self.ledger.load(paths)
+        self.rows_parsed = len(tx) if self.ledger.files_parsed else 0
+        self.history = book
+        self.total_spent, self.total_received = book.totals()
+        self.balance = self.total_received - self.total_spent
+        self.transactions = self.pick_latest_transactions(tx, rows)
 
     def update(self, rows: int) -> None:
-        """Refresh object state from latest CSV and keep only the newest `rows` transactions."""
-        tx, bal, spent, received = self.load_latest_bank_csv()
+        """Refresh object state from latest CSV and keep only the newest `rows` transactions.
+
+        Only rows appended since the last update are parsed; see _scan().
+        A file's format is sniffed when it is first parsed and its rows
+        are read into Banking's own layout; see app/bank_format.py.
+        In ledger mode every CSV counts; see app/ledger.py."""
+        if self.ledger is not None:
+            self._update_ledger(rows)
+            return
+        p = self._scan(max(rows, KEEP_ROWS))
+        spent, received = p.book.totals()
+        tx = self._newest(p)
+
+        self.history = p.book
         self.total_spent = spent
         self.total_received = received
-        self.balance = bal
+        self.balance = received - spent
         self.transactions = self.pick_latest_transactions(tx, rows)
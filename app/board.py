@@ -0,0 +1,188 @@
+"""
+WeatherBoard – forecasts for many fixed sites at once (operations wall).
+
+Sites come from the "board_locations" config key: city names (resolved
+once through the gateway's geocoder) or {"name", "lat", "lon"} objects.
+Each refresh sends every site's hourly and weekly request as one
+gateway batch (GatewayClient.batch()) on at most `workers` threads;
+calls are started `stagger` seconds apart so a board of 50 sites never
+bursts 100 requests at the gateway.  Sites configured by name are
+geocoded first, in a batch of their own, once.  The last forecast
+batch's calls, errors and wall time are kept in `last_batch`.
+
+Per site only two Forecast objects are kept (see app/forecast.py), and
+a failing site keeps its last good forecast, so memory and refresh time
+grow linearly with the number of sites.
+
+Usage:
+    board = WeatherBoard.from_config(config.data, weather, location)
+    errors = board.refresh()
+    for site in board.snapshot():
+        site.name, site.hourly, site.weekly, site.error
+    board.last_batch            # BatchStats(calls=100, errors=0, seconds=1.8)
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from app.forecast import Forecast
+from app.location import LocationService
+from app.weather import WeatherService
+
+DEFAULT_BOARD_WORKERS = 4
+DEFAULT_BOARD_STAGGER = 0.1   # seconds between site submissions
+BOARD_HOURLY_ROWS = 4         # rows per cell; fetched at exactly this depth
+BOARD_WEEKLY_ROWS = 3
+
+
+@dataclass
+class Site:
+    name: str
+    lat: float | None = None
+    lon: float | None = None
+
+    @classmethod
+    def parse(cls, entry: Any) -> "Site":
+        if isinstance(entry, str):
+            return cls(entry)
+        if isinstance(entry, dict) and entry.get("name"):
+            lat, lon = entry.get("lat"), entry.get("lon")
+            return cls(
+                str(entry["name"]),
+                float(lat) if lat is not None else None,
+                float(lon) if lon is not None else None,
+            )
+        raise ValueError(f"board location must be a city name or {{name, lat, lon}}: {entry!r}")
+
+    @property
+    def coords(self) -> tuple[float, float] | None:
+        if self.lat is None or self.lon is None:
+            return None
+        return self.lat, self.lon
+
+
+@dataclass(frozen=True)
+class BatchStats:
+    """One gateway batch: calls sent, calls failed, wall time in seconds."""
+
+    calls: int
+    errors: int
+    seconds: float
+
+
+@dataclass(frozen=True)
+class SiteForecast:
+    """One board cell; forecasts are shared and must be treated as read-only."""
+
+    name: str
+    coords: tuple[float, float] | None = None
+    hourly: Forecast | None = None
+    weekly: Forecast | None = None
+    updated_at: float | None = None
+    error: str | None = None
+
+
+class WeatherBoard:
+    def __init__(
+        self,
+        sites: list[Site],
+        weather: WeatherService,
+        location: LocationService,
+        *,
+        workers: int = DEFAULT_BOARD_WORKERS,
+        stagger: float = DEFAULT_BOARD_STAGGER,
+        hourly_rows: int = BOARD_HOURLY_ROWS,
+        weekly_rows: int = BOARD_WEEKLY_ROWS,
+    ):
+        self.sites = sites
+        self.weather = weather
+        self.location = location       # geocodes sites configured by name
+        self.workers = max(1, workers)
+        self.stagger = max(0.0, stagger)
+        self.hourly_rows = hourly_rows
+        self.weekly_rows = weekly_rows
+
+        self._lock = threading.Lock()
+        self._results: dict[int, SiteForecast] = {
+            i: SiteForecast(site.name, site.coords) for i, site in enumerate(sites)
+        }
+        self.last_batch: BatchStats | None = None
+
+    @classmethod
+    def from_config(cls, data: dict, weather: WeatherService, location: LocationService) -> "WeatherBoard | None":
+        """The board for config `data`, or None when no board locations are set."""
+        entries = data.get("board_locations") or []
+        if not entries:
+            return None
+        return cls(
+            [Site.parse(e) for e in entries],
+            weather,
+            location,
+            workers=int(data.get("board_workers", DEFAULT_BOARD_WORKERS)),
+            stagger=float(data.get("board_stagger_ms", DEFAULT_BOARD_STAGGER * 1000)) / 1000,
+            hourly_rows=int(data.get("board_hourly_rows", BOARD_HOURLY_ROWS)),
+            weekly_rows=int(data.get("board_weekly_rows", BOARD_WEEKLY_ROWS)),
+        )
+
+    # ── one site ────────────────────────────────────────────────────
+
+    def _set(self, index: int, hourly: Forecast | None = None, weekly: Forecast | None = None,
+             error: Exception | None = None):
+        site = self.sites[index]
+        if error is None:
+            result = SiteForecast(site.name, site.coords, hourly, weekly, time.time())
+        else:
+            # keep the last good forecast, flag the cell
+            prev = self._results[index]
+            result = SiteForecast(site.name, site.coords, prev.hourly, prev.weekly, prev.updated_at, str(error))
+        with self._lock:
+            self._results[index] = result
+
+    # ── whole board ─────────────────────────────────────────────────
+
+    def _batch(self):
+        return self.weather.gateway.batch(max_workers=self.workers, stagger=self.stagger)
+
+    def _geocode(self) -> dict[int, Exception]:
+        """Coordinates for every site configured by name, one batch; failures by site."""
+        names = [i for i, site in enumerate(self.sites) if site.coords is None]
+        if not names:
+            return {}
+        with self._batch() as batch:
+            pending = {i: self.location.queue_geocode(batch, self.sites[i].name) for i in names}
+        failed: dict[int, Exception] = {}
+        for i, result in pending.items():
+            try:
+                self.sites[i].lat, self.sites[i].lon = result()
+            except Exception as e:
+                failed[i] = e
+        return failed
+
+    def refresh(self) -> list[Exception]:
+        """Refresh every site; failures are returned, not raised."""
+        failed = self._geocode()
+        pending: dict[int, Callable[[], tuple[Forecast, Forecast]]] = {}
+        with self._batch() as batch:
+            for i, site in enumerate(self.sites):
+                if i not in failed:
+                    pending[i] = self.weather.queue_forecasts(batch, site.coords, self.hourly_rows, self.weekly_rows)
+            # `stagger` spaces sites, whatever the calls per site
+            if len(batch):
+                batch.stagger = self.stagger * len(pending) / len(batch)
+        for i, result in pending.items():
+            try:
+                self._set(i, *result())
+            except Exception as e:
+                failed[i] = e
+        for i, e in failed.items():
+            self._set(i, error=e)
+        self.last_batch = BatchStats(batch.sent, len(batch.errors), batch.elapsed or 0.0)
+        return [RuntimeError(f"{self.sites[i].name}: {e}") for i, e in sorted(failed.items())]
+
+    def snapshot(self) -> tuple[SiteForecast, ...]:
+        with self._lock:
+            return tuple(self._results[i] for i in range(len(self.sites)))
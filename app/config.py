@@ -15,8 +15,6 @@ import time
 import requests
 import pyfiglet
 
-from winrt.windows.devices.geolocation import Geolocator
-
 from rich.console import Console
 from rich.layout import Layout
 from rich.rule import Rule
@@ -27,15 +25,88 @@ from rich.live import Live
 
 DEFAULT_CONFIG = {
     "theme": "classic",
-    "refresh_minutes": 15,
+    "refresh_minutes": 15,        # fixed interval, or retry interval when adaptive
     "units": "metric",            # "metric" or "imperial"
     "use_winrt_location": True,   # True/False
 
+    # Location providers, raced (app/location_providers.py): "winrt",
+    # "gpsd", "ip", "static"; the first fix within location_accuracy_m
+    # wins, else the best one by the deadline
+    "location_providers": ["winrt", "ip"],
+    "location_deadline_seconds": 3,
+    "location_provider_deadlines": {},   # name → seconds, e.g. {"winrt": 1.5}; within the race deadline
+    "location_accuracy_m": 1000,
+    "static_location": None,      # {"name", "lat", "lon"} — used alone when set
+    "gpsd_address": "127.0.0.1:2947",
+
     # UI limits
     "bank_rows": 2,               # show last N transactions
+    "bank_months": 3,             # per-month totals under the account sum; 0 = off
     "max_hourly_forecast": 12,    # upper bound
     "max_weekly_forecast": 7,
     "live_screen": False,
+
+    # Merge every CSV in the bank directory (overlaps counted once)
+    # instead of showing the newest export only; 0 workers = one per core
+    "bank_ledger": False,
+    "bank_ledger_workers": 0,
+    # Keep every row of the statement as compact columns for the monthly
+    # totals; off = totals and the shown rows only, memory independent of
+    # the statement's size
+    "bank_history": True,
+
+    # Gateway connection pool
+    "gateway_pool_connections": 4,   # hosts kept warm
+    "gateway_pool_maxsize": 10,      # keep-alive connections per host
+    "gateway_deadline_seconds": 20,  # per call, retries included
+    "refresh_deadline_seconds": 45,  # hard bound for one refresh cycle
+
+    # On-disk cache of gateway GET responses (cache/http)
+    "response_cache": True,
+    "response_cache_mb": 20,
+
+    # Remember IP → city and city → coordinates (cache/location.json);
+    # the IP entry also expires when the machine joins another network
+    "location_cache": True,
+    "ip_location_ttl_minutes": 60,   # capped at 6 h
+
+    # Pace gateway calls to the limits reported by /rate-limits/me;
+    # off by default because reading the limits costs two calls at startup
+    "rate_limit_scheduler": False,
+
+    # Decode only the forecast rows/fields the dashboard shows
+    "compact_forecast_decode": True,
+
+    # Build weekly rows from the hourly forecast (5 days); the daily
+    # endpoint is only called for days past that
+    "derive_weekly_from_hourly": False,
+
+    # Snap forecast coordinates to geohash cells of this length (6 ≈ 1 km)
+    # so drifting or nearby locations share cached forecasts; 0 = exact
+    # coordinates, as sent before snapping existed
+    "forecast_grid_precision": 0,
+
+    # Local history of shown forecasts (data/forecasts.sqlite3): instant
+    # start from the last one and a temperature trend sparkline
+    "forecast_store": True,
+    "forecast_retain_days": 14,
+
+    # Per-source cadences (app/schedule.py): weather just after each
+    # forecast slot boundary, location backing off while it stays in one
+    # grid cell, banking only when a CSV changes
+    "adaptive_refresh": True,
+    "forecast_slot_grace_seconds": 120,
+    "location_max_minutes": 60,
+    "bank_poll_seconds": 5,
+    "bank_poll_max_seconds": 60,
+
+    # Multi-location board: city names or {"name", "lat", "lon"}; when
+    # set, a grid of these sites replaces the single-city weather view
+    "board_locations": [],
+    "board_workers": 4,           # concurrent sites
+    "board_stagger_ms": 100,      # between site submissions
+    "board_hourly_rows": 4,
+    "board_weekly_rows": 3,
 }
 
 class Config:
@@ -50,4 +121,4 @@ class Config:
 
     def _load(self):
         with self.config_path.open("r", encoding="utf-8") as f:
-            self.data = json.load(f)
\ No newline at end of file
+            self.data = {**DEFAULT_CONFIG, **json.load(f)}
\ No newline at end of file
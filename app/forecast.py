@@ -0,0 +1,262 @@
+"""
+Compact forecast model for WeatherService.
+
+A Forecast holds one response as parallel arrays, decoded once from the
+{"city", "rows"} shape (see requirements/decoding.py): timestamps as
+int64, temperature/wind/gust as doubles (NaN = missing), icon codes and
+descriptions as interned strings.  The arrays are the stdlib's `array`,
+not numpy's: the app does not depend on numpy, and a response has a
+few dozen rows.  Table cells are formatted once per (units) and
+memoized across forecasts by value, so building a Rich table is a
+slice of ready-made strings.
+
+daily_from_hourly() folds an hourly Forecast into one row per city-local
+day (mean/min/max temperature, dominant icon, peak wind and gust), so
+the weekly view can skip the daily endpoint for days the hourly series
+covers; extend_days() appends daily-endpoint rows past that horizon.
+
+Usage:
+    fc = Forecast.from_data(data, time_format="%H:%M")   # city-local time
+    fc.cells("°C", "m/s")[:12]   # ((when, weather, data), ...)
+
+    weekly = daily_from_hourly(fc, time_format="%d/%m")
+    weekly = extend_days(weekly, daily_fc, fc.offset, limit=7)
+"""
+
+from __future__ import annotations
+
+import sys
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any
+
+WEATHER_ICONS = {
+    "01d": "☀️", "02d": "⛅", "03d": "☁️", "04d": "☁️☁️", "09d": "🌧️",
+    "10d": "🌦️", "11d": "🌩️", "13d": "🌨️", "50d": "🌫️",
+    "01n": "🌙", "02n": "🌙☁️", "03n": "☁️", "04n": "☁️☁️", "09n": "🌧️",
+    "10n": "🌙🌧️", "11n": "🌩️", "13n": "🌨️", "50n": "🌫️",
+}
+
+NAN = float("nan")
+DAY = 86400
+
+Cells = tuple[tuple[str, str, str], ...]
+
+
+@lru_cache(maxsize=64)
+def tz_for(offset: int) -> timezone:
+    """One timezone object per UTC offset (seconds)."""
+    return timezone(timedelta(seconds=offset))
+
+
+@lru_cache(maxsize=1024)
+def _when(unix_time: int, offset: int | None, fmt: str) -> str:
+    # offset None → the machine's local time
+    tz = tz_for(offset) if offset is not None else None
+    return datetime.fromtimestamp(unix_time, tz=tz).strftime(fmt)
+
+
+@lru_cache(maxsize=256)
+def _weather(icon_code: str, desc: str) -> str:
+    return f"{WEATHER_ICONS.get(icon_code, '')} {desc}"
+
+
+@lru_cache(maxsize=2048)
+def _measure(temp: float | None, wind: float | None, gust: float | None,
+             temp_unit: str, wind_unit: str) -> str:
+    temp_part = "—" if temp is None else f"{temp:.1f}{temp_unit}"
+    wind_part = "—" if wind is None else f"{wind:.1f}{wind_unit}"
+    gust_part = "" if gust is None else f" {gust:.1f}{wind_unit}"
+    return f"{temp_part} {wind_part}{gust_part}"
+
+
+def _num(value: Any) -> float:
+    return float(value) if isinstance(value, (int, float)) else NAN
+
+
+def _opt(value: float) -> float | None:
+    # NaN never equals itself, so it would never hit the memo
+    return None if value != value else value
+
+
+def _text(value: Any) -> str:
+    return "" if value is None else str(value)
+
+
+class Forecast:
+    """One forecast response as parallel arrays; treat as immutable."""
+
+    __slots__ = (
+        "city", "country", "offset", "time_format",
+        "dt", "temp", "wind", "gust", "icon", "description",
+        "temp_min", "temp_max",
+        "_cells",
+    )
+
+    def __init__(
+        self,
+        *,
+        city: str,
+        country: str,
+        offset: int | None,
+        time_format: str,
+        dt: array,
+        temp: array,
+        wind: array,
+        gust: array,
+        icon: tuple[str, ...],
+        description: tuple[str, ...],
+        temp_min: array | None = None,
+        temp_max: array | None = None,
+    ):
+        self.city = city
+        self.country = country
+        self.offset = offset            # UTC offset for `when` cells, None = local time
+        self.time_format = time_format
+        self.dt = dt
+        self.temp = temp
+        self.wind = wind
+        self.gust = gust
+        self.icon = icon
+        self.description = description
+        # per-row range, only for rows aggregated from an hourly series
+        self.temp_min = temp_min if temp_min is not None else array("d")
+        self.temp_max = temp_max if temp_max is not None else array("d")
+        self._cells: dict[tuple[str, str], Cells] = {}
+
+    @classmethod
+    def from_data(cls, data: dict, *, time_format: str, city_time: bool = True) -> "Forecast":
+        """Decode {"city": {...}, "rows": [[dt, temp, wind, gust, icon, description], ...]}.
+
+        With `city_time` the timestamps are shown in the city's timezone,
+        otherwise in the machine's."""
+        city = data.get("city") or {}
+        rows = data.get("rows") or []
+        intern = sys.intern
+        return cls(
+            city=city.get("name", "—"),
+            country=city.get("country", "—"),
+            offset=int(city.get("timezone") or 0) if city_time else None,
+            time_format=time_format,
+            dt=array("q", (int(r[0] or 0) for r in rows)),
+            temp=array("d", (_num(r[1]) for r in rows)),
+            wind=array("d", (_num(r[2]) for r in rows)),
+            gust=array("d", (_num(r[3]) for r in rows)),
+            icon=tuple(intern(_text(r[4])) for r in rows),
+            description=tuple(intern(_text(r[5])) for r in rows),
+        )
+
+    def __len__(self) -> int:
+        return len(self.dt)
+
+    def fingerprint(self) -> tuple[bytes, bytes, tuple[str, ...]]:
+        """Equal for forecasts with the same slots, temperatures and icons."""
+        return self.dt.tobytes(), self.temp.tobytes(), self.icon
+
+    def cells(self, temp_unit: str, wind_unit: str) -> Cells:
+        """(when, weather, data) strings per row, formatted once per units."""
+        key = (temp_unit, wind_unit)
+        cells = self._cells.get(key)
+        if cells is None:
+            offset, fmt = self.offset, self.time_format
+            cells = tuple(
+                (
+                    _when(self.dt[i], offset, fmt),
+                    _weather(self.icon[i], self.description[i]),
+                    _measure(_opt(self.temp[i]), _opt(self.wind[i]), _opt(self.gust[i]), temp_unit, wind_unit),
+                )
+                for i in range(len(self.dt))
+            )
+            self._cells[key] = cells
+        return cells
+
+
+def _peak(values: array) -> float:
+    known = [v for v in values if v == v]
+    return max(known) if known else NAN
+
+
+def _dominant_icon(icons: tuple[str, ...]) -> str:
+    # the day's weather, not the night's: prefer "..d" icons when present
+    day_icons = [i for i in icons if i.endswith("d")] or list(icons)
+    return Counter(day_icons).most_common(1)[0][0] if day_icons else ""
+
+
+def daily_from_hourly(hourly: Forecast, *, time_format: str) -> Forecast:
+    """One row per city-local day of an hourly Forecast.
+
+    Rows carry the mean temperature (range in temp_min/temp_max), the
+    peak wind and gust, and the most frequent daytime icon.  Today is
+    kept however few slots remain; a trailing day the series only
+    partly covers is dropped, as its aggregate would be misleading.
+    Timestamps are local noon, shown in the machine's time like the
+    daily endpoint's.
+
+    The series is ascending, as the endpoint returns it, so each day is
+    one slice of the arrays: its end is a binary search for the next
+    local midnight, and only the aggregates walk the day's own rows."""
+    offset = hourly.offset or 0
+    dt = hourly.dt
+    n = len(dt)
+    starts, days = [], []
+    i = 0
+    while i < n:
+        day = (dt[i] + offset) // DAY
+        starts.append(i)
+        days.append(day)
+        i = bisect_left(dt, (day + 1) * DAY - offset, i + 1)
+    ends = starts[1:] + [n]
+
+    if len(starts) > 1:
+        step = min((b - a for a, b in zip(dt, dt[1:]) if b > a), default=10800)
+        if ends[-1] - starts[-1] < DAY // step:
+            starts, ends, days = starts[:-1], ends[:-1], days[:-1]
+
+    out_dt, mean, low, high, wind, gust, icon, desc = (
+        array("q"), array("d"), array("d"), array("d"), array("d"), array("d"), [], [],
+    )
+    for day, s, e in zip(days, starts, ends):
+        temps = [t for t in hourly.temp[s:e] if t == t]
+        out_dt.append(day * DAY + DAY // 2 - offset)
+        mean.append(sum(temps) / len(temps) if temps else NAN)
+        low.append(min(temps) if temps else NAN)
+        high.append(max(temps) if temps else NAN)
+        wind.append(_peak(hourly.wind[s:e]))
+        gust.append(_peak(hourly.gust[s:e]))
+        icons = hourly.icon[s:e]
+        dominant = _dominant_icon(icons)
+        icon.append(dominant)
+        desc.append(hourly.description[s + icons.index(dominant)] if dominant in icons else "")
+
+    return Forecast(
+        city=hourly.city, country=hourly.country, offset=None, time_format=time_format,
+        dt=out_dt, temp=mean, wind=wind, gust=gust,
+        icon=tuple(icon), description=tuple(desc),
+        temp_min=low, temp_max=high,
+    )
+
+
+def extend_days(weekly: Forecast, daily: Forecast, utc_offset: int | None, *, limit: int) -> Forecast:
+    """`weekly` followed by `daily`'s rows for later city-local days, up to `limit` rows."""
+    offset = utc_offset or 0
+    last = (weekly.dt[-1] + offset) // DAY if len(weekly) else None
+    extra = [i for i, t in enumerate(daily.dt) if last is None or (t + offset) // DAY > last]
+    extra = extra[:max(0, limit - len(weekly))]
+    if not extra:
+        return weekly
+
+    pad = array("d", [NAN]) * len(extra)
+    return Forecast(
+        city=weekly.city, country=weekly.country, offset=weekly.offset, time_format=weekly.time_format,
+        dt=weekly.dt + array("q", (daily.dt[i] for i in extra)),
+        temp=weekly.temp + array("d", (daily.temp[i] for i in extra)),
+        wind=weekly.wind + array("d", (daily.wind[i] for i in extra)),
+        gust=weekly.gust + array("d", (daily.gust[i] for i in extra)),
+        icon=weekly.icon + tuple(daily.icon[i] for i in extra),
+        description=weekly.description + tuple(daily.description[i] for i in extra),
+        temp_min=weekly.temp_min + pad,
+        temp_max=weekly.temp_max + pad,
+    )
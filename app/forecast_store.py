@@ -0,0 +1,249 @@
+"""
+ForecastStore – append-only SQLite history of fetched forecasts.
+
+Every forecast the dashboard shows is appended under its location cell
+(units + geohash of the coordinates) and fetch time.  That gives:
+
+- warm start: latest() returns the last shown forecasts and location
+  in a few milliseconds, so a restart renders data before the gateway
+  answers (marked with its real age);
+- trends: trend() returns, per slot, the temperature from the newest
+  fetch covering it — the past hours as they were last forecast, the
+  coming hours as currently forecast — without any gateway call;
+- retention: compact() drops slots older than `retain_days` and,
+  for fetches older than a day, slots a later fetch has superseded.
+
+Unchanged forecasts are not appended again.  Connections are shared
+between threads behind a lock; SQLite runs in WAL mode.
+
+Usage:
+    store = ForecastStore(DATA_DIR / "forecasts.sqlite3", retain_days=14, precision=6)
+    store.append("metric", "Zurich", (47.37, 8.54), hourly_fc, weekly_fc)
+    last = store.latest("metric")           # StoredForecast | None
+    store.trend("metric", (47.37, 8.54), since=now - 86400, until=now + 86400)
+    # → [(dt, temp), ...]
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.forecast import DAY, NAN, Forecast
+from requirements.geo_grid import encode
+
+DEFAULT_RETAIN_DAYS = 14
+DEFAULT_PRECISION = 6          # ≈ 1 km cells
+SETTLED = DAY                  # forecast revisions kept this long before compaction
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fetch (
+    cell        TEXT NOT NULL,
+    kind        TEXT NOT NULL,          -- 'hourly' | 'daily'
+    fetched_at  REAL NOT NULL,
+    label       TEXT,
+    lat         REAL,
+    lon         REAL,
+    city        TEXT,
+    country     TEXT,
+    utc_offset  INTEGER,                -- NULL = machine local time
+    time_format TEXT,
+    PRIMARY KEY (cell, kind, fetched_at)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS fetch_recent ON fetch (kind, fetched_at);
+
+CREATE TABLE IF NOT EXISTS slot (
+    cell        TEXT NOT NULL,
+    kind        TEXT NOT NULL,
+    fetched_at  REAL NOT NULL,
+    dt          INTEGER NOT NULL,
+    temp        REAL,
+    wind        REAL,
+    gust        REAL,
+    temp_min    REAL,
+    temp_max    REAL,
+    icon        TEXT,
+    description TEXT,
+    PRIMARY KEY (cell, kind, fetched_at, dt)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS slot_series ON slot (cell, kind, dt, fetched_at);
+"""
+
+
+@dataclass(frozen=True)
+class StoredForecast:
+    label: str
+    coords: tuple[float, float]
+    fetched_at: float
+    hourly: Forecast
+    daily: Forecast | None
+
+
+def _real(value: float) -> float | None:
+    # SQLite has no NaN; store missing values as NULL
+    return None if value != value else value
+
+
+def _num(value: float | None) -> float:
+    return NAN if value is None else value
+
+
+class ForecastStore:
+    def __init__(self, path: Path, *, retain_days: float = DEFAULT_RETAIN_DAYS,
+                 precision: int = DEFAULT_PRECISION):
+        self.path = path
+        self.retain_days = retain_days
+        self.precision = precision if precision > 0 else DEFAULT_PRECISION
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA auto_vacuum = INCREMENTAL")   # only takes effect on a new file
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute("PRAGMA synchronous = NORMAL")
+        self._db.executescript(_SCHEMA)
+
+        self._last: dict[tuple[str, str], tuple] = {}   # (cell, kind) → fingerprint last appended
+        self._compacted_at = 0.0
+
+    def cell(self, units: str, coords: tuple[float, float]) -> str:
+        lat, lon = coords
+        return f"{units}/{encode(lat, lon, self.precision)}"
+
+    # ── write ───────────────────────────────────────────────────────
+
+    def append(self, units: str, label: str, coords: tuple[float, float],
+               hourly: Forecast, daily: Forecast | None = None, *, fetched_at: float | None = None) -> int:
+        """Append the forecasts that changed since the last append; returns slots written."""
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        cell = self.cell(units, coords)
+        lat, lon = coords
+        written = 0
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                for kind, fc in (("hourly", hourly), ("daily", daily)):
+                    if fc is None or self._last.get((cell, kind)) == fc.fingerprint():
+                        continue
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO fetch VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (cell, kind, fetched_at, label, lat, lon, fc.city, fc.country, fc.offset, fc.time_format),
+                    )
+                    has_range = len(fc.temp_min) == len(fc)
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO slot VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        [
+                            (cell, kind, fetched_at, fc.dt[i],
+                             _real(fc.temp[i]), _real(fc.wind[i]), _real(fc.gust[i]),
+                             _real(fc.temp_min[i]) if has_range else None,
+                             _real(fc.temp_max[i]) if has_range else None,
+                             fc.icon[i], fc.description[i])
+                            for i in range(len(fc))
+                        ],
+                    )
+                    written += len(fc)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            for kind, fc in (("hourly", hourly), ("daily", daily)):
+                if fc is not None:
+                    self._last[(cell, kind)] = fc.fingerprint()
+        if fetched_at - self._compacted_at >= DAY:
+            self.compact(fetched_at)
+        return written
+
+    def compact(self, now: float | None = None) -> int:
+        """Apply retention; returns slots deleted."""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._compacted_at = now
+            self._db.execute("BEGIN")
+            try:
+                deleted = self._db.execute(
+                    "DELETE FROM slot WHERE dt < ?", (now - self.retain_days * DAY,),
+                ).rowcount
+                deleted += self._db.execute(
+                    """DELETE FROM slot WHERE fetched_at < ? AND EXISTS (
+                           SELECT 1 FROM slot AS newer
+                           WHERE newer.cell = slot.cell AND newer.kind = slot.kind
+                             AND newer.dt = slot.dt AND newer.fetched_at > slot.fetched_at)""",
+                    (now - SETTLED,),
+                ).rowcount
+                self._db.execute(
+                    """DELETE FROM fetch WHERE NOT EXISTS (
+                           SELECT 1 FROM slot
+                           WHERE slot.cell = fetch.cell AND slot.kind = fetch.kind
+                             AND slot.fetched_at = fetch.fetched_at)"""
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("PRAGMA incremental_vacuum")
+        return deleted
+
+    # ── read ────────────────────────────────────────────────────────
+
+    def _forecast(self, cell: str, kind: str, fetched_at: float, meta: tuple) -> Forecast:
+        city, country, offset, time_format = meta
+        rows = self._db.execute(
+            """SELECT dt, temp, wind, gust, temp_min, temp_max, icon, description FROM slot
+               WHERE cell = ? AND kind = ? AND fetched_at = ? ORDER BY dt""",
+            (cell, kind, fetched_at),
+        ).fetchall()
+        ranged = any(r[4] is not None for r in rows)
+        fc = Forecast(
+            city=city, country=country, offset=offset, time_format=time_format,
+            dt=array("q", (r[0] for r in rows)),
+            temp=array("d", (_num(r[1]) for r in rows)),
+            wind=array("d", (_num(r[2]) for r in rows)),
+            gust=array("d", (_num(r[3]) for r in rows)),
+            icon=tuple(r[6] or "" for r in rows),
+            description=tuple(r[7] or "" for r in rows),
+            temp_min=array("d", (_num(r[4]) for r in rows)) if ranged else None,
+            temp_max=array("d", (_num(r[5]) for r in rows)) if ranged else None,
+        )
+        self._last[(cell, kind)] = fc.fingerprint()
+        return fc
+
+    def latest(self, units: str) -> StoredForecast | None:
+        """The most recently stored hourly forecast in `units`, with its daily one."""
+        with self._lock:
+            row = self._db.execute(
+                """SELECT cell, fetched_at, label, lat, lon, city, country, utc_offset, time_format
+                   FROM fetch WHERE kind = 'hourly' AND cell LIKE ?
+                   ORDER BY fetched_at DESC LIMIT 1""",
+                (f"{units}/%",),
+            ).fetchone()
+            if row is None:
+                return None
+            cell, fetched_at, label, lat, lon = row[:5]
+            hourly = self._forecast(cell, "hourly", fetched_at, row[5:])
+            daily_row = self._db.execute(
+                """SELECT fetched_at, city, country, utc_offset, time_format FROM fetch
+                   WHERE cell = ? AND kind = 'daily' ORDER BY fetched_at DESC LIMIT 1""",
+                (cell,),
+            ).fetchone()
+            daily = self._forecast(cell, "daily", daily_row[0], daily_row[1:]) if daily_row else None
+        return StoredForecast(label or "—", (lat, lon), fetched_at, hourly, daily)
+
+    def trend(self, units: str, coords: tuple[float, float], *, since: float, until: float) -> list[tuple[int, float]]:
+        """(dt, temperature) per hourly slot in [since, until], from the newest fetch covering it."""
+        with self._lock:
+            # SQLite takes bare columns from the row that holds MAX()
+            rows = self._db.execute(
+                """SELECT dt, temp, MAX(fetched_at) FROM slot
+                   WHERE cell = ? AND kind = 'hourly' AND dt BETWEEN ? AND ?
+                   GROUP BY dt ORDER BY dt""",
+                (self.cell(units, coords), int(since), int(until)),
+            ).fetchall()
+        return [(dt, temp) for dt, temp, _ in rows if temp is not None]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -1,23 +1,24 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import timedelta, timezone
 import asyncio
-from pathlib import Path
-from typing import Optional
+from typing import Callable
 import sys
 import os
 
-import requests
-from winrt.windows.devices.geolocation import Geolocator
-
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
-from requirements.gateway import GatewayClient
-from requirements import config
-
-
-class LocationError(RuntimeError):
-    pass
+from requirements.gateway import AsyncGatewayClient, GatewayBatch, GatewayClient, shared_client
+from app.location_cache import LocationCache
+from app.location_providers import (
+    DEFAULT_ACCURACY_M,
+    DEFAULT_DEADLINE,
+    LocationError,
+    LocationProvider,
+    ProviderTiming,
+    build_providers,
+    provider_names,
+    race,
+)
 
 
 @dataclass
@@ -27,65 +28,139 @@ class LocationResult:
 
 
 class LocationService:
-    def __init__(self, *, use_winrt: bool):
+    def __init__(
+        self,
+        *,
+        use_winrt: bool,
+        gateway: GatewayClient | None = None,
+        cache: LocationCache | None = None,
+        providers: list[LocationProvider] | None = None,
+        deadline: float = DEFAULT_DEADLINE,
+        accuracy_m: float = DEFAULT_ACCURACY_M,
+    ):
         self.use_winrt = use_winrt
-        self.gateway = GatewayClient(
-            base_url=config.GATEWAY_URL,
-            username=config.GATEWAY_USERNAME,
-            password=config.GATEWAY_PASSWORD
-        )
+        self.gateway = gateway or shared_client()
+        self.agateway = AsyncGatewayClient(self.gateway)
+        self.cache = cache  # IP → city and city → coords across restarts
+
+        # raced on every update; see app/location_providers.py
+        if providers is None:
+            providers = build_providers(provider_names({"use_winrt_location": use_winrt}), self, {})
+        self.providers = providers
+        self.deadline = deadline
+        self.accuracy_m = accuracy_m
+        self.timings: dict[str, ProviderTiming] = {}   # per provider, last update
 
         # state you can read from main/ui
         self.label: str = "—"
         self.coords: tuple[float, float] = (0.0, 0.0)
 
-    async def _winrt_get_lat_lon(self) -> tuple[float, float]:
-        geo = Geolocator()
-        pos = await geo.get_geoposition_async()
-        point = pos.coordinate.point.position
-        return float(point.latitude), float(point.longitude)
+    def _cached_ip_city(self) -> str | None:
+        return self.cache.ip_city() if self.cache is not None else None
 
     def _detect_city_from_ip(self) -> str:
+        city = self._cached_ip_city()
+        if city:
+            return city
         try:
             data = self.gateway.get_location_from_ip()
-            city = data.get("location", {}).get("city")
-            if not city:
-                raise LocationError("IPRegistry response did not contain a city.")
+            return self._city_from_ip_data(data)
+        except Exception as e:
+            raise LocationError(f"Unable to retrieve city information from IPRegistry: {e}")
+
+    async def _detect_city_from_ip_async(self) -> str:
+        city = self._cached_ip_city()
+        if city:
             return city
+        try:
+            data = await self.agateway.get_location_from_ip()
+            return self._city_from_ip_data(data)
         except Exception as e:
             raise LocationError(f"Unable to retrieve city information from IPRegistry: {e}")
 
+    def _city_from_ip_data(self, data: dict) -> str:
+        city = data.get("location", {}).get("city")
+        if not city:
+            raise LocationError("IPRegistry response did not contain a city.")
+        if self.cache is not None:
+            self.cache.put_ip_city(city, ip=data.get("ip"))
+        return city
+
+    def _cached_coords(self, city_name: str) -> tuple[float, float] | None:
+        return self.cache.coords(city_name) if self.cache is not None else None
+
     def _geocode_city(self, city_name: str) -> tuple[float, float]:
+        coords = self._cached_coords(city_name)
+        if coords is not None:
+            return coords
         try:
             data = self.gateway.geocode(city_name)
-            features = data.get("features") or []
-            if not features:
-                raise LocationError(f"Geoapify returned no results for city '{city_name}'.")
-
-            props = features[0].get("properties", {})
-            lat = props.get("lat")
-            lon = props.get("lon")
-            if lat is None or lon is None:
-                raise LocationError("Geoapify response missing lat/lon.")
+            return self._coords_from_geocode(data, city_name)
+        except Exception as e:
+            raise LocationError(f"Unable to retrieve coordinates from Geoapify: {e}")
 
-            return float(lat), float(lon)
+    def geocode(self, city_name: str) -> tuple[float, float]:
+        """Coordinates for a city name, via the gateway's geocoder."""
+        return self._geocode_city(city_name)
+
+    def queue_geocode(self, batch: GatewayBatch, city_name: str) -> Callable[[], tuple[float, float]]:
+        """Queue geocode() on `batch`; call the returned function once the
+        batch is sent.  A cached city queues nothing."""
+        coords = self._cached_coords(city_name)
+        if coords is not None:
+            return lambda: coords
+        future = batch.geocode(city_name)
+
+        def result() -> tuple[float, float]:
+            try:
+                return self._coords_from_geocode(future.result(), city_name)
+            except Exception as e:
+                raise LocationError(f"Unable to retrieve coordinates from Geoapify: {e}")
+
+        return result
+
+    async def _geocode_city_async(self, city_name: str) -> tuple[float, float]:
+        coords = self._cached_coords(city_name)
+        if coords is not None:
+            return coords
+        try:
+            data = await self.agateway.geocode(city_name)
+            return self._coords_from_geocode(data, city_name)
         except Exception as e:
             raise LocationError(f"Unable to retrieve coordinates from Geoapify: {e}")
 
+    def _coords_from_geocode(self, data: dict, city_name: str) -> tuple[float, float]:
+        features = data.get("features") or []
+        if not features:
+            raise LocationError(f"Geoapify returned no results for city '{city_name}'.")
+
+        props = features[0].get("properties", {})
+        lat = props.get("lat")
+        lon = props.get("lon")
+        if lat is None or lon is None:
+            raise LocationError("Geoapify response missing lat/lon.")
+
+        coords = float(lat), float(lon)
+        if self.cache is not None:
+            self.cache.put_coords(city_name, coords)
+        return coords
+
     def _fallback_ip_city_geo(self) -> LocationResult:
         city = self._detect_city_from_ip()
         lat, lon = self._geocode_city(city)
         return LocationResult(label=city, coords=(lat, lon))
 
+    async def _fallback_ip_city_geo_async(self) -> LocationResult:
+        city = await self._detect_city_from_ip_async()
+        lat, lon = await self._geocode_city_async(city)
+        return LocationResult(label=city, coords=(lat, lon))
+
     def get_coordinates(self) -> LocationResult:
         """
         Sync method that returns LocationResult.
-        - If use_winrt is True, try WinRT first (if we can).
-        - Otherwise fallback to IP → City → Geoapify.
+        - Races the providers (see get_coordinates_async).
+        - Inside a running event loop: IP → City → Geoapify only.
         """
-        if not self.use_winrt:
-            return self._fallback_ip_city_geo()
-
         # If an event loop is already running, we cannot call asyncio.run().
         # In that case we fall back (simple + safe).
         try:
@@ -95,13 +170,21 @@ class LocationService:
         except RuntimeError:
             pass  # no running loop, safe to use asyncio.run()
 
-        try:
-            lat, lon = asyncio.run(self._winrt_get_lat_lon())
-            return LocationResult(label="Current Location", coords=(lat, lon))
-        except Exception:
-            return self._fallback_ip_city_geo()
+        return asyncio.run(self.get_coordinates_async())
+
+    async def get_coordinates_async(self) -> LocationResult:
+        """All providers at once: the first accurate enough fix, else the best by the deadline."""
+        self.timings = {}
+        fix, _ = await race(self.providers, deadline=self.deadline, accuracy_m=self.accuracy_m,
+                            timings=self.timings)
+        return LocationResult(label=fix.label, coords=fix.coords)
 
     def update(self) -> None:
         result = self.get_coordinates()
         self.label = result.label
-        self.coords = result.coords
\ No newline at end of file
+        self.coords = result.coords
+
+    async def update_async(self) -> None:
+        result = await self.get_coordinates_async()
+        self.label = result.label
+        self.coords = result.coords
@@ -0,0 +1,148 @@
+"""
+LocationCache – on-disk memo of IP → city and city → coordinates.
+
+The IP fallback of LocationService costs two sequential gateway calls
+(/geo/ip, then /geo/geocode) whose answers almost never change.  This
+cache keeps both in one small JSON file so they survive restarts:
+
+- cities: coordinates per normalized city name ("  zürich" and
+  "Zürich" share an entry), least recently used dropped past
+  `max_cities`;
+- IP: the last city the public IP resolved to, valid for `ip_ttl`
+  seconds (never more than MAX_IP_TTL) and only on the same network.
+  The public IP itself cannot be read without a request, so the local
+  address of the default route stands in for it (checked with a
+  connected UDP socket — nothing is sent).  That catches a move to a
+  network with another address range, but behind NAT the local address
+  stays the same when the public IP changes or on a different network
+  with the same range, so the age cap is what bounds a wrong city.
+
+With both fresh a location refresh makes no network call at all.
+
+Usage:
+    cache = LocationCache(CACHE_DIR / "location.json", ip_ttl=3600)
+    cache.ip_city()                      # "Zurich" | None
+    cache.put_ip_city("Zurich", ip="203.0.113.7")
+    cache.coords("zurich ")              # (47.37, 8.54) | None
+    cache.put_coords("Zurich", (47.37, 8.54))
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+DEFAULT_IP_TTL = 3600.0
+MAX_IP_TTL = 6 * 3600.0     # cap on ip_ttl; the network check misses most moves behind NAT
+DEFAULT_MAX_CITIES = 256
+
+# any routable address works: connect() on UDP only picks the route
+_ROUTE_PROBE = ("192.0.2.1", 9)   # TEST-NET-1
+
+
+def normalize_city(name: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", name).casefold().split())
+
+
+def network_id() -> str | None:
+    """Local address of the default route, None when offline."""
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            s.connect(_ROUTE_PROBE)
+            return s.getsockname()[0]
+    except OSError:
+        return None
+
+
+class LocationCache:
+    def __init__(self, path: Path, *, ip_ttl: float = DEFAULT_IP_TTL, max_cities: int = DEFAULT_MAX_CITIES):
+        self.path = path
+        self.ip_ttl = min(ip_ttl, MAX_IP_TTL)
+        self.max_cities = max(1, max_cities)
+
+        self._lock = threading.Lock()
+        self._ip: dict | None = None
+        self._cities: OrderedDict[str, list[float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    # ── file ────────────────────────────────────────────────────────
+
+    def _load(self):
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if isinstance(data.get("ip"), dict):
+            self._ip = data["ip"]
+        for key, coords in (data.get("cities") or {}).items():
+            if isinstance(coords, list) and len(coords) == 2:
+                self._cities[key] = [float(coords[0]), float(coords[1])]
+
+    def _save(self):
+        # write-then-rename so a crash never leaves half a file
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"ip": self._ip, "cities": self._cities}), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    # ── IP → city ───────────────────────────────────────────────────
+
+    def ip_city(self, now: float | None = None) -> str | None:
+        """The cached city for this network's public IP, None when stale."""
+        now = time.time() if now is None else now
+        network = network_id()
+        with self._lock:
+            entry = self._ip
+            # an entry from the future (clock set back) counts as stale too
+            if (entry is None or network is None or entry.get("network") != network
+                    or not 0 <= now - float(entry.get("stored_at", 0)) < self.ip_ttl):
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry.get("city")
+
+    def put_ip_city(self, city: str, *, ip: str | None = None, now: float | None = None):
+        entry = {
+            "network": network_id(),
+            "ip": ip,
+            "city": city,
+            "stored_at": time.time() if now is None else now,
+        }
+        with self._lock:
+            self._ip = entry
+            self._save()
+
+    # ── city → coordinates ──────────────────────────────────────────
+
+    def coords(self, city: str) -> tuple[float, float] | None:
+        key = normalize_city(city)
+        with self._lock:
+            coords = self._cities.get(key)
+            if coords is None:
+                self.misses += 1
+                return None
+            self._cities.move_to_end(key)
+            self.hits += 1
+            return coords[0], coords[1]
+
+    def put_coords(self, city: str, coords: tuple[float, float]):
+        key = normalize_city(city)
+        with self._lock:
+            self._cities[key] = [coords[0], coords[1]]
+            self._cities.move_to_end(key)
+            while len(self._cities) > self.max_cities:
+                self._cities.popitem(last=False)
+            self._save()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "cities": len(self._cities),
+                    "ip": bool(self._ip)}
@@ -0,0 +1,285 @@
+"""
+Location providers – pluggable sources of "where is this machine".
+
+Each provider is an object with a `name` and an async `locate()` that
+returns a Fix (coordinates plus accuracy in metres, None = unknown).
+Platform modules are imported inside `locate()`, never at import time,
+so every provider can be listed on every OS and simply fails where its
+platform is missing.
+
+    winrt    Windows geolocation (Wi-Fi / GPS), typically 10–100 m
+    gpsd     a gpsd-compatible daemon's JSON protocol (default
+             127.0.0.1:2947), accuracy from the TPV report
+    ip       public IP → city → geocode via the gateway (city level)
+    static   fixed coordinates from the "static_location" config key;
+             when set, no other provider runs
+
+race() runs providers concurrently under one deadline: the first fix
+at least as accurate as `accuracy_m` wins and the others are
+cancelled; otherwise the most accurate fix that arrived in time is
+used.  A provider with its own `deadline` (seconds, from the
+"location_provider_deadlines" config key) is given up on after that,
+so a slow one such as winrt cannot hold the race; the race deadline
+stays the upper bound.  The time and outcome of every provider is
+returned with it.
+
+New providers register a factory under a name:
+
+    register_provider("mqtt", lambda service, config: MqttProvider(config))
+
+Usage:
+    providers = build_providers(["winrt", "ip"], service, config.data)
+    fix, timings = await race(providers, deadline=3.0, accuracy_m=1000)
+    timings["winrt"]   # ProviderTiming(seconds=0.41, outcome="ok")
+    timings["gpsd"]    # ProviderTiming(seconds=1.0, outcome="timeout")
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Protocol
+
+if TYPE_CHECKING:
+    from app.location import LocationService
+
+DEFAULT_DEADLINE = 3.0          # seconds for the whole race
+DEFAULT_ACCURACY_M = 1000.0     # a fix this good ends the race at once
+IP_ACCURACY_M = 10_000.0        # IP geolocation resolves to a city
+DEFAULT_GPSD_ADDRESS = "127.0.0.1:2947"
+
+
+class LocationError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class Fix:
+    label: str
+    coords: tuple[float, float]   # (lat, lon)
+    accuracy_m: float | None      # None = unknown
+    provider: str = ""
+
+
+@dataclass(frozen=True)
+class ProviderTiming:
+    seconds: float
+    outcome: str                  # "ok", "error: …", "cancelled", "timeout"
+
+
+class LocationProvider(Protocol):
+    name: str
+    deadline: float | None        # seconds; None = the race deadline only
+
+    async def locate(self) -> Fix: ...
+
+
+# ── built-in providers ──────────────────────────────────────────────
+
+
+class WinRTProvider:
+    name = "winrt"
+    deadline: float | None = None
+
+    async def locate(self) -> Fix:
+        # Windows-only; imported on use so the module loads everywhere
+        from winrt.windows.devices.geolocation import Geolocator
+
+        pos = await Geolocator().get_geoposition_async()
+        coordinate = pos.coordinate
+        point = coordinate.point.position
+        accuracy = getattr(coordinate, "accuracy", None)
+        return Fix(
+            "Current Location",
+            (float(point.latitude), float(point.longitude)),
+            float(accuracy) if accuracy is not None else None,
+            self.name,
+        )
+
+
+class GpsdProvider:
+    """First TPV report with a 2D fix from a gpsd-compatible daemon."""
+
+    name = "gpsd"
+    deadline: float | None = None
+
+    def __init__(self, address: str = DEFAULT_GPSD_ADDRESS):
+        host, _, port = address.rpartition(":")
+        self.host = host or "127.0.0.1"
+        self.port = int(port)
+
+    async def locate(self) -> Fix:
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            writer.write(b'?WATCH={"enable":true,"json":true};\n')
+            await writer.drain()
+            while True:
+                line = await reader.readline()
+                if not line:
+                    raise LocationError("gpsd closed the connection without a fix.")
+                try:
+                    report = json.loads(line)
+                except ValueError:
+                    continue
+                if report.get("class") != "TPV" or int(report.get("mode") or 0) < 2:
+                    continue
+                if report.get("lat") is None or report.get("lon") is None:
+                    continue
+                errors = [report[k] for k in ("epx", "epy") if report.get(k) is not None]
+                accuracy = max(errors) if errors else report.get("eph")
+                return Fix("GPS", (float(report["lat"]), float(report["lon"])),
+                           float(accuracy) if accuracy is not None else None, self.name)
+        finally:
+            writer.close()
+
+
+class IPProvider:
+    name = "ip"
+    deadline: float | None = None
+
+    def __init__(self, service: LocationService):
+        self.service = service
+
+    async def locate(self) -> Fix:
+        result = await self.service._fallback_ip_city_geo_async()
+        return Fix(result.label, result.coords, IP_ACCURACY_M, self.name)
+
+
+class StaticProvider:
+    name = "static"
+    deadline: float | None = None
+
+    def __init__(self, entry: dict):
+        if not isinstance(entry, dict) or entry.get("lat") is None or entry.get("lon") is None:
+            raise ValueError(f"static_location must be {{name, lat, lon}}: {entry!r}")
+        self.label = str(entry.get("name") or "Static Location")
+        self.coords = (float(entry["lat"]), float(entry["lon"]))
+        self.accuracy_m = float(entry.get("accuracy_m", 0.0))
+
+    async def locate(self) -> Fix:
+        return Fix(self.label, self.coords, self.accuracy_m, self.name)
+
+
+# ── registry ────────────────────────────────────────────────────────
+
+ProviderFactory = Callable[["LocationService", dict], LocationProvider]
+
+_PROVIDERS: dict[str, ProviderFactory] = {
+    "winrt": lambda service, config: WinRTProvider(),
+    "gpsd": lambda service, config: GpsdProvider(str(config.get("gpsd_address") or DEFAULT_GPSD_ADDRESS)),
+    "ip": lambda service, config: IPProvider(service),
+    "static": lambda service, config: StaticProvider(config.get("static_location")),
+}
+
+
+def register_provider(name: str, factory: ProviderFactory):
+    _PROVIDERS[name] = factory
+
+
+def build_providers(names: list[str], service: LocationService, config: dict) -> list[LocationProvider]:
+    unknown = [n for n in names if n not in _PROVIDERS]
+    if unknown:
+        raise ValueError(f"unknown location providers: {', '.join(unknown)}")
+    deadlines = config.get("location_provider_deadlines") or {}
+    providers = [_PROVIDERS[n](service, config) for n in names]
+    for provider in providers:
+        if deadlines.get(provider.name) is not None:
+            provider.deadline = float(deadlines[provider.name])
+    return providers
+
+
+# ── race ────────────────────────────────────────────────────────────
+
+
+class ProviderTimeout(LocationError):
+    pass
+
+
+async def _locate(provider: LocationProvider) -> Fix:
+    """provider.locate(), bounded by the provider's own deadline if it has one."""
+    deadline = getattr(provider, "deadline", None)
+    if deadline is None:
+        return await provider.locate()
+    try:
+        return await asyncio.wait_for(provider.locate(), deadline)
+    except asyncio.TimeoutError:
+        raise ProviderTimeout(f"no fix within {deadline:g}s") from None
+
+
+def _better(fix: Fix, best: Fix | None) -> bool:
+    if best is None:
+        return True
+    if fix.accuracy_m is None:
+        return False
+    return best.accuracy_m is None or fix.accuracy_m < best.accuracy_m
+
+
+async def race(
+    providers: list[LocationProvider],
+    *,
+    deadline: float = DEFAULT_DEADLINE,
+    accuracy_m: float = DEFAULT_ACCURACY_M,
+    timings: dict[str, ProviderTiming] | None = None,
+) -> tuple[Fix, dict[str, ProviderTiming]]:
+    """The first fix within `accuracy_m`, else the best one by `deadline`.
+
+    Each provider also stops at its own `deadline`, if set.  Provider
+    timings are also written to `timings` when given, so they are kept
+    when no provider succeeds."""
+    if not providers:
+        raise LocationError("No location providers configured.")
+    started = time.perf_counter()
+    timings = {} if timings is None else timings
+    tasks = {asyncio.ensure_future(_locate(p)): p.name for p in providers}
+    pending = set(tasks)
+    best: Fix | None = None
+    errors: list[str] = []
+    timed_out = False
+
+    try:
+        while pending:
+            remaining = deadline - (time.perf_counter() - started)
+            if remaining <= 0:
+                timed_out = True
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            elapsed = time.perf_counter() - started
+            for task in done:
+                name = tasks[task]
+                exc = task.exception()
+                if exc is not None:
+                    outcome = "timeout" if isinstance(exc, ProviderTimeout) else f"error: {type(exc).__name__}: {exc}"
+                    timings[name] = ProviderTiming(elapsed, outcome)
+                    errors.append(f"{name}: {exc}")
+                    continue
+                fix = task.result()
+                timings[name] = ProviderTiming(elapsed, "ok")
+                if _better(fix, best):
+                    best = fix
+            if best is not None and best.accuracy_m is not None and best.accuracy_m <= accuracy_m:
+                break
+    finally:
+        elapsed = time.perf_counter() - started
+        for task in pending:
+            task.cancel()
+            timings[tasks[task]] = ProviderTiming(elapsed, "timeout" if timed_out else "cancelled")
+
+    if best is None:
+        detail = "; ".join(errors) or f"no answer within {deadline:g}s"
+        raise LocationError(f"No location provider succeeded ({detail}).")
+    return best, timings
+
+
+def provider_names(config: dict[str, Any]) -> list[str]:
+    """Providers to race for a config, honouring the older use_winrt_location switch.
+
+    A configured static_location is used alone: racing it would still
+    send the others' requests (the ip provider's through the gateway)."""
+    if config.get("static_location"):
+        return ["static"]
+    names = list(config.get("location_providers") or ["winrt", "ip"])
+    if not config.get("use_winrt_location", True):
+        names = [n for n in names if n != "winrt"]
+    return names
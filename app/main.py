@@ -1,24 +1,90 @@
 from __future__ import annotations
 
 import time
+from pathlib import Path
+
 from rich.console import Console
 from rich.live import Live
 
-from app.paths import BANK_DIR, LOG_DIR, CONFIG_DIR, CONFIG_PATH
+from app.paths import BANK_DIR, LOG_DIR, CONFIG_DIR, CONFIG_PATH, CACHE_DIR, DATA_DIR
 from app.config import Config
 from app.ui.theme import STYLES
 from app.ui.utils import compute_forecast_limits
-from app.ui.layout import build_layout
+from app.ui.layout import build_board_grid, build_layout
 
 from app.banking import Banking
+from app.ledger import Ledger
+from app.board import WeatherBoard
 from app.location import LocationService
+from app.location_cache import LocationCache
+from app.location_providers import build_providers, provider_names
 from app.weather import WeatherService
+from app.forecast_store import ForecastStore
+from app.refresh import RefreshWorker
+from app.schedule import RefreshSchedule
 
-from requirements import config as gw_config
-from requirements.gateway import GatewayClient
+from requirements.gateway import GatewayClient, shared_client, close_shared_sessions
+from requirements.rate_limit import RateLimitScheduler
+from requirements.response_cache import ResponseCache
 from app.heartbeat import Heartbeat
 
 
+def build_gateway(config: Config, *, cache_dir: Path | None, **credentials) -> GatewayClient:
+    """The shared client with every feature the config enables.
+
+    `credentials` (base_url, username, password) default to
+    requirements/config.py."""
+    # one pooled session + one login shared by every gateway user
+    gw = shared_client(
+        **credentials,
+        pool_connections=int(config.data["gateway_pool_connections"]),
+        pool_maxsize=int(config.data["gateway_pool_maxsize"]),
+    )
+    gw.deadline = float(config.data["gateway_deadline_seconds"])
+    if config.data["response_cache"] and cache_dir is not None:
+        gw.cache = ResponseCache(
+            cache_dir,
+            max_bytes=int(config.data["response_cache_mb"]) * 1024 * 1024,
+        )
+    if config.data["rate_limit_scheduler"]:
+        gw.scheduler = RateLimitScheduler()
+        gw.scheduler.seed(gw)
+    return gw
+
+
+def build_services(
+    config: Config,
+    gw: GatewayClient,
+    *,
+    bank_dir: Path,
+    cache_dir: Path | None = None,
+) -> tuple[Banking, LocationService, WeatherService]:
+    bank = Banking(
+        bank_dir,
+        ledger=Ledger(int(config.data["bank_ledger_workers"])) if config.data["bank_ledger"] else None,
+        history=bool(config.data["bank_history"]),
+    )
+    location = LocationService(
+        use_winrt=bool(config.data["use_winrt_location"]),
+        gateway=gw,
+        cache=LocationCache(
+            cache_dir / "location.json",
+            ip_ttl=float(config.data["ip_location_ttl_minutes"]) * 60,
+        ) if config.data["location_cache"] and cache_dir is not None else None,
+        deadline=float(config.data["location_deadline_seconds"]),
+        accuracy_m=float(config.data["location_accuracy_m"]),
+    )
+    location.providers = build_providers(provider_names(config.data), location, config.data)
+    weather = WeatherService(
+        units=config.data["units"],
+        gateway=gw,
+        compact=bool(config.data["compact_forecast_decode"]),
+        derive_weekly=bool(config.data["derive_weekly_from_hourly"]),
+        grid_precision=int(config.data["forecast_grid_precision"]),
+    )
+    return bank, location, weather
+
+
 def main():
     BANK_DIR.mkdir(parents=True, exist_ok=True)
     LOG_DIR.mkdir(parents=True, exist_ok=True)
@@ -29,61 +95,100 @@ def main():
     console = Console(theme=STYLES.get(config.data["theme"], STYLES["autumn"]))
 
     refresh_seconds = max(10, int(config.data["refresh_minutes"]) * 60)
-    last_fetch_at = 0.0
 
-    bank = Banking(BANK_DIR)
-    location = LocationService(
-        use_winrt=bool(config.data["use_winrt_location"]),
-    )
-    weather = WeatherService(units=config.data["units"])
+    gw = build_gateway(config, cache_dir=CACHE_DIR / "http")
+    bank, location, weather = build_services(config, gw, bank_dir=BANK_DIR, cache_dir=CACHE_DIR)
 
     # ── kill-switch heartbeat ─────────────────────────────────────
     # Disable "python-panel" in /settings/software on the gateway to
     # shut the dashboard down remotely.
-    _gw = GatewayClient(gw_config.GATEWAY_URL, gw_config.GATEWAY_USERNAME, gw_config.GATEWAY_PASSWORD)
-    heartbeat = Heartbeat(_gw, kind="software", name="python-panel")
+    heartbeat = Heartbeat(gw, kind="software", name="python-panel")
     heartbeat.start()
 
     live_screen = bool(config.data.get("live_screen", False))
 
+    max_hourly = int(config.data["max_hourly_forecast"])
+    max_weekly = int(config.data["max_weekly_forecast"])
+    bank_months = max(0, int(config.data["bank_months"]))
+
+    def refresh_limits() -> tuple[int, int, int]:
+        # always fetch the deepest forecast; resizes only re-slice it
+        bank_rows = max(1, min(int(config.data["bank_rows"]), 50))
+        return max_hourly, max_weekly, bank_rows
+
+    board = WeatherBoard.from_config(config.data, weather, location)
+
+    store = None
+    if config.data["forecast_store"]:
+        store = ForecastStore(
+            DATA_DIR / "forecasts.sqlite3",
+            retain_days=float(config.data["forecast_retain_days"]),
+            precision=int(config.data["forecast_grid_precision"]),
+        )
+
+    # all fetching happens on the worker; this loop only renders snapshots
+    worker = RefreshWorker(
+        location, weather, bank,
+        refresh_seconds=refresh_seconds,
+        deadline_seconds=float(config.data["refresh_deadline_seconds"]),
+        limits=refresh_limits,
+        healthy=gw.healthy,
+        board=board,
+        schedule=(
+            RefreshSchedule.from_config(config.data, retry_seconds=refresh_seconds)
+            if config.data["adaptive_refresh"] else None
+        ),
+        store=store,
+    )
+    worker.start()
+
+    tables_for: tuple | None = None   # (snapshot, hourly_rows, weekly_rows) the tables were cut for
+    hourly_table = weekly_table = grid = None
+
     try:
         with Live(console=console, screen=live_screen, auto_refresh=False) as live:
             while True:
                 if heartbeat.killed.is_set():
                     break
                 now = time.time()
-                elapsed = now - last_fetch_at
-                remaining = int(refresh_seconds - elapsed)
+                snap = worker.snapshot
 
-                if last_fetch_at == 0.0 or elapsed >= refresh_seconds:
-                    last_fetch_at = now
-
-                    hourly_rows, weekly_rows = compute_forecast_limits(
-                        console,
-                        max_hourly=int(config.data["max_hourly_forecast"]),
-                        max_weekly=int(config.data["max_weekly_forecast"]),
+                # new data or a resized terminal → re-slice, never refetch
+                hourly_rows, weekly_rows = compute_forecast_limits(
+                    console, max_hourly=max_hourly, max_weekly=max_weekly,
+                )
+                if tables_for is None or tables_for[0] is not snap or tables_for[1:] != (hourly_rows, weekly_rows):
+                    hourly_table, weekly_table = weather.tables(
+                        hourly_rows, weekly_rows, snap.hourly_forecast, snap.daily_forecast,
                     )
-
-                    location.update()
-                    weather.update(location.coords, hourly_rows, weekly_rows)
-
-                    bank_rows = max(1, min(int(config.data["bank_rows"]), 50))
-                    bank.update(rows=bank_rows)
+                    if board is not None:
+                        grid = build_board_grid(
+                            snap.board, units=config.data["units"],
+                            hourly_rows=board.hourly_rows, weekly_rows=board.weekly_rows,
+                        )
+                    tables_for = (snap, hourly_rows, weekly_rows)
 
                 layout = build_layout(
-                    location_label=location.label,
-                    coords=location.coords,
-                    city=weather.city,
-                    country=weather.country,
-                    hourly_table=weather.hourly_table,
-                    weekly_table=weather.weekly_table,
-                    transactions=bank.transactions,
-                    balance=bank.balance,
-                    total_spent=bank.total_spent,
-                    total_received=bank.total_received,
-                    next_refresh_in_seconds=max(0, remaining),
+                    location_label=snap.location_label,
+                    coords=snap.coords,
+                    city=snap.city,
+                    country=snap.country,
+                    hourly_table=hourly_table,
+                    weekly_table=weekly_table,
+                    transactions=snap.transactions,
+                    balance=snap.balance,
+                    total_spent=snap.total_spent,
+                    total_received=snap.total_received,
+                    months=snap.months[-bank_months:] if bank_months else (),
+                    next_refresh_in_seconds=max(0, int(snap.next_refresh_at - now)),
                     refresh_minutes=int(config.data["refresh_minutes"]),
                     units=config.data["units"],
+                    stale=snap.stale,
+                    age_seconds=snap.age(now),
+                    refreshing=worker.refreshing.is_set(),
+                    board=grid,
+                    batch=snap.batch,
+                    trend=snap.trend,
                 )
                 console.clear()
                 live.update(layout, refresh=True)
@@ -98,6 +203,14 @@ def main():
             console.clear()
         print("Dashboard stopped.")
 
+    finally:
+        worker.stop(timeout=1)
+        close_shared_sessions()
+        if bank.ledger is not None:
+            bank.ledger.close()
+        if store is not None and not worker.refreshing.is_set():
+            store.close()
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -5,4 +5,6 @@ PROJECT_ROOT = Path(__file__).resolve().parent.parent
 BANK_DIR = PROJECT_ROOT / "02_Bankauszüge"
 CONFIG_DIR = PROJECT_ROOT / "requirements"
 LOG_DIR = PROJECT_ROOT / "logs"
+CACHE_DIR = PROJECT_ROOT / "cache"
+DATA_DIR = PROJECT_ROOT / "data"
 CONFIG_PATH = CONFIG_DIR / "config.json"
\ No newline at end of file
@@ -0,0 +1,406 @@
+"""
+RefreshWorker – background thread that owns every fetch for the dashboard.
+
+Location, weather and banking are refreshed on the worker's own event
+loop (refresh_async) and published as an immutable Snapshot.  The
+render loop only reads `worker.snapshot`, so the clock
+and countdown keep ticking while requests are in flight, and a failing
+service never raises into it.
+
+With a RefreshSchedule (app/schedule.py) each source runs on its own
+cadence instead: weather after forecast slot boundaries, location with
+backoff until it moves, banking when the CSV changes.  Without one,
+every source is refreshed each `refresh_seconds`.
+
+With a ForecastStore (app/forecast_store.py) every new forecast is
+appended to the local history, start() publishes the last stored one
+before the first fetch, and snapshots carry a temperature trend read
+from the store.
+
+Stale-while-revalidate: each service keeps its last good state when a
+refresh fails, so a snapshot always carries the last good data; its
+`errors` say what failed and `updated_at` when data last refreshed
+cleanly.
+
+Usage:
+    worker = RefreshWorker(location, weather, bank, refresh_seconds=600,
+                           deadline_seconds=45, limits=lambda: (40, 16, 20))
+    # or: RefreshWorker(..., schedule=RefreshSchedule(retry_seconds=600))
+    worker.start()
+    snap = worker.snapshot          # never blocks
+    snap.age(), snap.stale
+    worker.stop()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from app.banking import Banking
+from app.board import BatchStats, SiteForecast, WeatherBoard
+from app.forecast import DAY, Forecast
+from app.forecast_store import ForecastStore
+from app.location import LocationService
+from app.schedule import RefreshSchedule
+from app.transactions import Group
+from app.weather import WeatherService
+
+# (hourly_rows, weekly_rows, bank_rows) fetched by the next refresh —
+# the deepest the UI may show; smaller views are re-sliced locally
+Limits = Callable[[], "tuple[int, int, int]"]
+
+# trend sparkline: the last day as last forecast, the next as forecast now
+TREND_BEHIND = DAY
+TREND_AHEAD = DAY
+
+
+async def refresh_async(
+    location: LocationService,
+    weather: WeatherService,
+    bank: Banking,
+    *,
+    hourly_rows: int,
+    weekly_rows: int,
+    bank_rows: int,
+    board: WeatherBoard | None = None,
+) -> list[Exception]:
+    """One refresh cycle with every independent request in flight at once.
+
+    Weather needs the coordinates, so it waits for location; banking is
+    local disk I/O and runs alongside on a worker thread, as does the
+    board's gateway batch.  With a board the grid replaces the forecast for
+    the current location, so that one is not fetched.  Failures are
+    returned, not raised — each service keeps its last good state."""
+
+    async def _location_then_weather():
+        await location.update_async()
+        if board is None:
+            await weather.update_async(location.coords, hourly_rows, weekly_rows)
+
+    jobs = [_location_then_weather(), asyncio.to_thread(bank.update, rows=bank_rows)]
+    if board is not None:
+        jobs.append(asyncio.to_thread(board.refresh))
+    results = await asyncio.gather(*jobs, return_exceptions=True)
+
+    errors: list[Exception] = []
+    for r in results:
+        if isinstance(r, list):      # board.refresh(): one error per failed site
+            errors.extend(r)
+        elif isinstance(r, Exception):
+            errors.append(r)
+    return errors
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Everything the layout shows, as of one refresh.
+
+    Forecasts are kept at full fetch depth; WeatherService.tables()
+    cuts them to the terminal.  Forecasts and rows are shared, not
+    copied, and must be treated as read-only."""
+
+    location_label: str = "—"
+    coords: tuple[float, float] = (0.0, 0.0)
+    city: str = "—"
+    country: str = "—"
+    hourly_forecast: Forecast | None = None
+    daily_forecast: Forecast | None = None
+    transactions: tuple[tuple[str, ...], ...] = ()
+    balance: float = 0.0
+    total_spent: float = 0.0
+    total_received: float = 0.0
+    months: tuple[Group, ...] = ()       # per-month bank totals, oldest first
+
+    updated_at: float | None = None      # last refresh without errors
+    checked_at: float | None = None      # last refresh attempt
+    next_refresh_at: float = 0.0
+    errors: tuple[str, ...] = ()
+    healthy: bool = True                 # gateway circuits all closed
+    board: tuple[SiteForecast, ...] = ()   # multi-location mode only
+    batch: BatchStats | None = None        # the board's last gateway batch
+    trend: tuple[float, ...] = ()          # hourly temperatures, forecast store only
+
+    @property
+    def stale(self) -> bool:
+        return bool(self.errors) or not self.healthy
+
+    def age(self, now: float | None = None) -> int | None:
+        """Seconds since data last refreshed cleanly, None before that."""
+        if self.updated_at is None:
+            return None
+        return int((now if now is not None else time.time()) - self.updated_at)
+
+
+class RefreshWorker:
+    def __init__(
+        self,
+        location: LocationService,
+        weather: WeatherService,
+        bank: Banking,
+        *,
+        refresh_seconds: float,
+        deadline_seconds: float,
+        limits: Limits,
+        healthy: Callable[[], bool] = lambda: True,
+        board: WeatherBoard | None = None,
+        schedule: RefreshSchedule | None = None,
+        store: ForecastStore | None = None,
+    ):
+        self.location = location
+        self.weather = weather
+        self.bank = bank
+        self.board = board
+        self.refresh_seconds = refresh_seconds
+        self.deadline_seconds = deadline_seconds
+        self.limits = limits
+        self.healthy = healthy
+        self.schedule = schedule
+        self.store = store
+
+        # latest outcome per source, so a quiet source keeps reporting its failure
+        self._errors: dict[str, list[Exception]] = {}
+
+        self._snapshot = Snapshot()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self.refreshing = threading.Event()   # set while a cycle is in flight
+        self._thread: threading.Thread | None = None
+
+    # ── public helpers ──────────────────────────────────────────────
+
+    @property
+    def snapshot(self) -> Snapshot:
+        return self._snapshot
+
+    def refresh_now(self):
+        """Start the next cycle without waiting for the interval."""
+        if self.schedule is not None:
+            self.schedule.wake()
+        self._wake.set()
+
+    # ── forecast store ──────────────────────────────────────────────
+
+    def _trend(self, coords: tuple[float, float], now: float) -> tuple[float, ...]:
+        points = self.store.trend(self.weather.units, coords, since=now - TREND_BEHIND, until=now + TREND_AHEAD)
+        return tuple(temp for _, temp in points)
+
+    def _record(self, now: float) -> tuple[float, ...]:
+        """Append a newly fetched forecast; the trend at its location."""
+        loc, wx = self.location, self.weather
+        self.store.append(wx.units, loc.label, loc.coords, wx.hourly_forecast, wx.daily_forecast, fetched_at=now)
+        return self._trend(loc.coords, now)
+
+    def _restore(self):
+        """Publish the last stored forecast, before anything is fetched."""
+        try:
+            stored = self.store.latest(self.weather.units)
+        except sqlite3.Error:
+            return
+        if stored is None:
+            return
+        self.location.label, self.location.coords = stored.label, stored.coords
+        self.weather.restore(stored.hourly, stored.daily)
+        self._publish([], stored.fetched_at, time.time())
+
+    # ── one cycle ───────────────────────────────────────────────────
+
+    def _publish(self, errors: list[BaseException], updated_at: float | None,
+                 next_refresh_at: float) -> Snapshot:
+        prev = self._snapshot
+        loc, wx, bank = self.location, self.weather, self.bank
+        now = time.time()
+        trend = prev.trend
+        if self.store is not None and wx.hourly_forecast is not None and wx.hourly_forecast is not prev.hourly_forecast:
+            try:
+                trend = self._record(now)
+            except sqlite3.Error as e:
+                errors = [*errors, e]
+        snap = Snapshot(
+            location_label=loc.label,
+            coords=loc.coords,
+            city=wx.city,
+            country=wx.country,
+            hourly_forecast=wx.hourly_forecast,
+            daily_forecast=wx.daily_forecast,
+            transactions=tuple(tuple(tx) for tx in bank.transactions),
+            balance=bank.balance,
+            total_spent=bank.total_spent,
+            total_received=bank.total_received,
+            months=tuple(bank.history.by_month()),
+            updated_at=updated_at,
+            checked_at=now,
+            next_refresh_at=next_refresh_at,
+            errors=tuple(f"{type(e).__name__}: {e}" for e in errors),
+            healthy=self.healthy(),
+            board=self.board.snapshot() if self.board is not None else (),
+            batch=self.board.last_batch if self.board is not None else None,
+            trend=trend,
+        )
+        self._snapshot = snap   # single reference swap — readers never see a half-built state
+        return snap
+
+    def _cycle(self, loop: asyncio.AbstractEventLoop) -> Snapshot | None:
+        if self.schedule is not None:
+            return self._scheduled_cycle(loop)
+        started = time.time()
+        self.refreshing.set()
+        try:
+            hourly_rows, weekly_rows, bank_rows = self.limits()
+            try:
+                errors = loop.run_until_complete(asyncio.wait_for(
+                    refresh_async(
+                        self.location, self.weather, self.bank,
+                        hourly_rows=hourly_rows,
+                        weekly_rows=weekly_rows,
+                        bank_rows=bank_rows,
+                        board=self.board,
+                    ),
+                    timeout=self.deadline_seconds,
+                ))
+            except asyncio.TimeoutError as e:
+                errors = [e]
+            except Exception as e:    # never let the worker die
+                errors = [e]
+            updated_at = self._snapshot.updated_at if errors else started
+            return self._publish(errors, updated_at, time.time() + self.refresh_seconds)
+        finally:
+            self.refreshing.clear()
+
+    # ── one scheduled cycle ─────────────────────────────────────────
+
+    def _slot_forecast(self) -> Forecast | None:
+        """The hourly series whose slots time the next weather check:
+        the first board site that has one in board mode."""
+        if self.board is None:
+            return self.weather.hourly_forecast
+        return next((site.hourly for site in self.board.snapshot() if site.hourly is not None), None)
+
+    async def _refresh_due(self, due: set[str], ran: dict[str, list[Exception]], *,
+                           hourly_rows: int, weekly_rows: int, bank_rows: int):
+        """Refresh the sources in `due`, recording each one's errors in `ran` as it finishes."""
+        schedule = self.schedule
+
+        async def _location_then_weather():
+            weather_due = "weather" in due
+            if "location" in due:
+                try:
+                    await self.location.update_async()
+                except Exception as e:
+                    ran["location"] = [e]
+                    schedule.location_checked(time.time(), self.location.coords, ok=False)
+                else:
+                    ran["location"] = []
+                    # same grid cell → same forecast, nothing to refetch
+                    weather_due |= schedule.location_checked(time.time(), self.location.coords, ok=True)
+            # board sites are fixed: they follow the slot boundaries, not
+            # movement, and the grid replaces the current location's forecast
+            if self.board is not None:
+                weather_due = "weather" in due
+            if not weather_due:
+                return
+
+            if self.board is None:
+                jobs = [self.weather.update_async(self.location.coords, hourly_rows, weekly_rows)]
+            else:
+                jobs = [asyncio.to_thread(self.board.refresh)]
+            errors: list[Exception] = []
+            for r in await asyncio.gather(*jobs, return_exceptions=True):
+                if isinstance(r, list):
+                    errors.extend(r)
+                elif isinstance(r, Exception):
+                    errors.append(r)
+            ran["weather"] = errors
+            schedule.weather_checked(time.time(), self._slot_forecast(), ok=not errors)
+
+        async def _bank():
+            signature = None
+            try:
+                signature = (await asyncio.to_thread(self.bank.signature), bank_rows)
+                if schedule.bank_changed(signature):
+                    await asyncio.to_thread(self.bank.update, rows=bank_rows)
+            except Exception as e:
+                ran["bank"] = [e]
+                schedule.bank_checked(time.time(), signature, ok=False)
+            else:
+                ran["bank"] = []
+                schedule.bank_checked(time.time(), signature, ok=True)
+
+        jobs = []
+        if due & {"location", "weather"}:
+            jobs.append(_location_then_weather())
+        if "bank" in due:
+            jobs.append(_bank())
+        await asyncio.gather(*jobs)
+
+    def _scheduled_cycle(self, loop: asyncio.AbstractEventLoop) -> Snapshot | None:
+        schedule = self.schedule
+        started = time.time()
+        due = schedule.due(started)
+        if not due:
+            return None
+        self.refreshing.set()
+        try:
+            hourly_rows, weekly_rows, bank_rows = self.limits()
+            ran: dict[str, list[Exception]] = {}
+            try:
+                loop.run_until_complete(asyncio.wait_for(
+                    self._refresh_due(
+                        due, ran,
+                        hourly_rows=hourly_rows, weekly_rows=weekly_rows, bank_rows=bank_rows,
+                    ),
+                    timeout=self.deadline_seconds,
+                ))
+            except Exception as e:    # deadline, or anything else: never let the worker die
+                now = time.time()
+                for name in due - ran.keys():
+                    schedule.failed(name, now)
+                    self._errors[name] = [e]
+            self._errors.update(ran)
+
+            errors = [e for errs in self._errors.values() for e in errs]
+            # only a network refresh counts towards the age, not a bank poll
+            clean = not errors and ("weather" in ran or "location" in ran)
+            updated_at = started if clean else self._snapshot.updated_at
+            return self._publish(errors, updated_at, schedule.weather.due_at)
+        finally:
+            self.refreshing.clear()
+
+    # ── background loop ─────────────────────────────────────────────
+
+    def _idle_seconds(self) -> float:
+        if self.schedule is None:
+            return self.refresh_seconds
+        return max(0.5, self.schedule.next_due() - time.time())
+
+    def _loop(self):
+        # one loop for the worker's life: a cycle cut off by the deadline
+        # leaves its threads to finish instead of blocking loop shutdown
+        loop = asyncio.new_event_loop()
+        try:
+            while not self._stop.is_set():
+                self._cycle(loop)
+                self._wake.wait(self._idle_seconds())
+                self._wake.clear()
+        finally:
+            loop.close()
+
+    # ── lifecycle ───────────────────────────────────────────────────
+
+    def start(self):
+        if self.store is not None and self._snapshot.hourly_forecast is None:
+            self._restore()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="refresh-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None):
+        """Signal the worker to stop and wait up to `timeout` for it."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
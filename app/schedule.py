@@ -0,0 +1,194 @@
+"""
+RefreshSchedule – a separate cadence per data source for RefreshWorker.
+
+Weather data only changes when the provider rolls its 3-hour forecast
+slots, bank data only when a CSV is dropped into the bank directory,
+and location only when the machine moves; refetching all three on one
+fixed interval mostly re-downloads what the dashboard already shows.
+
+    weather   just after the next slot boundary (the first forecast `dt`
+              in the future, plus `slot_grace`); if the slot has turned
+              but the provider still serves the old series, retried with
+              backoff (grace, 2×grace, … up to one slot)
+    location  every `retry_seconds`, backing off to `location_max` while
+              the coordinates stay inside the same geohash cell; moving
+              to another cell makes weather due at once
+    bank      a stat() of the bank directory every `bank_poll` seconds,
+              backing off to `bank_poll_max` while nothing changed; the
+              CSV is only parsed when its signature changes
+
+A failed check is retried after `retry_seconds` whatever the source.
+
+Usage:
+    schedule = RefreshSchedule(retry_seconds=900, grid_precision=6)
+    due = schedule.due(time.time())            # {"location", "weather", "bank"}
+    schedule.location_checked(now, coords, ok=True)
+    schedule.weather_checked(now, forecast, ok=True)
+    if schedule.bank_changed(signature): bank.update(rows)
+    schedule.bank_checked(now, signature, ok=True)
+    schedule.weather.due_at                    # next network refresh
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Hashable
+
+from app.forecast import Forecast
+from requirements.geo_grid import encode
+
+SOURCES = ("location", "weather", "bank")
+
+SLOT_SECONDS = 3 * 3600         # provider forecast step, when the series can't tell
+DEFAULT_SLOT_GRACE = 120.0      # after a boundary, before the provider has rolled over
+DEFAULT_LOCATION_MAX = 3600.0
+DEFAULT_BANK_POLL = 5.0
+DEFAULT_BANK_POLL_MAX = 60.0
+
+
+@dataclass
+class Cadence:
+    """Interval between checks of one source; doubles while nothing changes."""
+
+    min_interval: float
+    max_interval: float
+    interval: float = 0.0
+    due_at: float = 0.0              # 0 → due now
+
+    def __post_init__(self):
+        self.max_interval = max(self.min_interval, self.max_interval)
+        self.interval = self.min_interval
+
+    def due(self, now: float) -> bool:
+        return now >= self.due_at
+
+    def checked(self, now: float, changed: bool):
+        if changed:
+            self.interval = self.min_interval
+        self.due_at = now + self.interval
+        if not changed:
+            self.interval = min(self.interval * 2, self.max_interval)
+
+    def retry(self, now: float, seconds: float):
+        self.due_at = now + seconds
+
+    def wake(self):
+        self.interval = self.min_interval
+        self.due_at = 0.0
+
+
+def slot_step(forecast: Forecast | None) -> int:
+    """Spacing of the forecast's timestamps, SLOT_SECONDS when unknown."""
+    if forecast is None:
+        return SLOT_SECONDS
+    dt = forecast.dt
+    return min((b - a for a, b in zip(dt, dt[1:]) if b > a), default=SLOT_SECONDS)
+
+
+def next_slot(forecast: Forecast | None, now: float) -> float:
+    """The next forecast slot boundary after `now`."""
+    if forecast is not None:
+        for t in forecast.dt:
+            if t > now:
+                return float(t)
+    step = slot_step(forecast)
+    return (now // step + 1) * step
+
+
+class RefreshSchedule:
+    def __init__(
+        self,
+        *,
+        retry_seconds: float,
+        slot_grace: float = DEFAULT_SLOT_GRACE,
+        location_max: float = DEFAULT_LOCATION_MAX,
+        bank_poll: float = DEFAULT_BANK_POLL,
+        bank_poll_max: float = DEFAULT_BANK_POLL_MAX,
+        grid_precision: int = 0,
+    ):
+        self.retry_seconds = retry_seconds
+        self.slot_grace = slot_grace
+        self.grid_precision = grid_precision
+
+        self.location = Cadence(retry_seconds, location_max)
+        self.weather = Cadence(slot_grace, SLOT_SECONDS)
+        self.bank = Cadence(bank_poll, bank_poll_max)
+
+        self._cell: Hashable = None
+        self._forecast: Hashable = None
+        self._awaiting: float | None = None     # slot boundary the weather check waits for
+        self._bank: Any = object()              # never equal: the first poll always parses
+
+    @classmethod
+    def from_config(cls, data: dict, *, retry_seconds: float) -> "RefreshSchedule":
+        return cls(
+            retry_seconds=retry_seconds,
+            slot_grace=float(data.get("forecast_slot_grace_seconds", DEFAULT_SLOT_GRACE)),
+            location_max=float(data.get("location_max_minutes", DEFAULT_LOCATION_MAX / 60)) * 60,
+            bank_poll=float(data.get("bank_poll_seconds", DEFAULT_BANK_POLL)),
+            bank_poll_max=float(data.get("bank_poll_max_seconds", DEFAULT_BANK_POLL_MAX)),
+            grid_precision=int(data.get("forecast_grid_precision", 0)),
+        )
+
+    # ── when ────────────────────────────────────────────────────────
+
+    def due(self, now: float) -> set[str]:
+        return {name for name in SOURCES if getattr(self, name).due(now)}
+
+    def next_due(self) -> float:
+        return min(getattr(self, name).due_at for name in SOURCES)
+
+    def wake(self):
+        """Make every source due now (manual refresh)."""
+        for name in SOURCES:
+            getattr(self, name).wake()
+
+    def failed(self, name: str, now: float):
+        """A check of source `name` that never reported back (deadline, crash)."""
+        getattr(self, name).retry(now, self.retry_seconds)
+
+    # ── after a check ───────────────────────────────────────────────
+
+    def location_checked(self, now: float, coords: tuple[float, float], *, ok: bool) -> bool:
+        """Record a location check; True when it moved to another grid cell."""
+        if not ok:
+            self.location.retry(now, self.retry_seconds)
+            return False
+        lat, lon = coords
+        cell = encode(lat, lon, self.grid_precision) if self.grid_precision > 0 else coords
+        moved = self._cell is not None and cell != self._cell
+        self._cell = cell
+        self.location.checked(now, moved)
+        if moved:
+            self.weather.wake()
+        return moved
+
+    def weather_checked(self, now: float, forecast: Forecast | None, *, ok: bool):
+        if not ok:
+            self.weather.retry(now, self.retry_seconds)
+            return
+        key = forecast.fingerprint() if forecast is not None else None
+        changed = key != self._forecast
+        self._forecast = key
+        w = self.weather
+        w.max_interval = slot_step(forecast)
+        if changed or self._awaiting is None or now < self._awaiting:
+            # new series, or checked early (moved / manual): wait for the next slot
+            self._awaiting = next_slot(forecast, now)
+            w.interval = w.min_interval
+            w.due_at = self._awaiting + self.slot_grace
+        else:
+            # the slot turned but the provider still serves the old series
+            w.checked(now, changed=False)
+
+    def bank_changed(self, signature: Any) -> bool:
+        """Whether the bank directory differs from the last successful parse."""
+        return signature != self._bank
+
+    def bank_checked(self, now: float, signature: Any, *, ok: bool):
+        if not ok:
+            self.bank.retry(now, self.retry_seconds)
+            return
+        changed = self.bank_changed(signature)
+        self._bank = signature
+        self.bank.checked(now, changed)
@@ -0,0 +1,231 @@
+"""
+Transactions – bank rows stored column by column.
+
+A statement row kept as list[str] costs ~450 bytes and every total
+re-parses its amount strings.  Here each row is 24 bytes in four typed
+arrays:
+
+    day        int32   YYYYMMDD booking date, 0 = undated
+    spent      int64   Belastung in cents
+    received   int64   Gutschrift in cents
+    merchant   uint32  Buchungstext, interned: index into `merchants`
+
+Amounts are exact cents, so totals never drift however many years are
+summed.  Totals are kept running as rows are appended; the group-bys
+(per day, month, merchant) are cached and only fold in rows appended
+since they were last asked for, so a monthly breakdown of a multi-year
+ledger costs one pass once and next to nothing afterwards.
+
+Rows are appended; only the last rows can be taken back with drop()
+(Banking's unterminated last line).  The raw strings are not kept —
+Banking holds the few rows it displays.  With columns=False only the running totals are
+kept (constant memory) and the group-bys are empty.
+
+Usage:
+    book = Transactions.from_rows(rows)
+    book.append(["05.03.2024", "05.03.2024", "Coop", "12.40", "", "988.60"])
+    book.totals()                       # (spent, received) in francs
+    book.by_month()[-3:]                # [Group("2024-01", 1830.2, 5200.0, 97), …]
+    book.by_merchant()[0]               # biggest spender first
+"""
+
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from functools import lru_cache
+from operator import itemgetter
+from typing import Callable, Iterable, Sequence
+
+from app.bank_format import NATIVE_DATE, amount_parser, date_parser
+
+# rows reach the book in Banking's own layout (see app/bank_format.py);
+# the other two are still read as before
+_DATE_PARSERS = tuple(date_parser(fmt) for fmt in (NATIVE_DATE, "%d/%m/%Y", "%Y-%m-%d"))
+
+cents = amount_parser(".", "'")
+
+
+@lru_cache(maxsize=8192)   # a statement has one distinct date per day
+def date_key(value: str) -> int:
+    """YYYYMMDD of a booking date, 0 when it does not parse."""
+    for parse in _DATE_PARSERS:
+        key = parse(value or "")
+        if key:
+            return key
+    return 0
+
+
+@dataclass(frozen=True)
+class Group:
+    key: str            # "2024-03-05", "2024-03" or the Buchungstext; "" = undated
+    spent: float
+    received: float
+    count: int
+
+
+def _day_label(day: int) -> str:
+    return f"{day // 10000:04d}-{day // 100 % 100:02d}-{day % 100:02d}" if day else ""
+
+
+def _month_label(month: int) -> str:
+    return f"{month // 100:04d}-{month % 100:02d}" if month else ""
+
+
+class Transactions:
+    __slots__ = ("columns", "day", "spent", "received", "merchant", "merchants",
+                 "_codes", "_rows", "_spent_total", "_received_total", "_groups")
+
+    def __init__(self, columns: bool = True):
+        self.columns = columns
+        self._rows = 0
+        self.day = array("i")
+        self.spent = array("q")
+        self.received = array("q")
+        self.merchant = array("I")
+        self.merchants: list[str] = []
+        self._codes: dict[str, int] = {}
+        self._spent_total = 0
+        self._received_total = 0
+        # group-by name → (rows folded in so far, key → [spent, received, count])
+        self._groups: dict[str, tuple[int, dict[int, list[int]]]] = {}
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Sequence[str]]) -> "Transactions":
+        book = cls()
+        book.extend(rows)
+        return book
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Transactions):
+            return NotImplemented
+        return (len(self) == len(other) and self.totals() == other.totals()
+                and self.day == other.day and self.spent == other.spent and self.received == other.received
+                and [self.merchants[i] for i in self.merchant] == [other.merchants[i] for i in other.merchant])
+
+    def copy(self) -> "Transactions":
+        book = Transactions(self.columns)
+        book._rows = self._rows
+        book.day, book.spent = array("i", self.day), array("q", self.spent)
+        book.received, book.merchant = array("q", self.received), array("I", self.merchant)
+        book.merchants, book._codes = list(self.merchants), dict(self._codes)
+        book._spent_total, book._received_total = self._spent_total, self._received_total
+        book._groups = {name: (done, {k: list(v) for k, v in acc.items()})
+                        for name, (done, acc) in self._groups.items()}
+        return book
+
+    # ── appending ───────────────────────────────────────────────────
+
+    def append(self, row: Sequence[str]):
+        self.extend((row,))
+
+    @staticmethod
+    def _padded(rows: Iterable[Sequence[str]]) -> list[Sequence[str]]:
+        return [row if len(row) >= 5 else [*row, "", "", "", "", ""] for row in rows]
+
+    def extend(self, rows: Iterable[Sequence[str]]):
+        # column by column: the loops run in C except for the parsers
+        rows = self._padded(rows)
+        spent = array("q", map(cents, map(itemgetter(3), rows)))
+        received = array("q", map(cents, map(itemgetter(4), rows)))
+        if self.columns:
+            codes = self._codes
+            self.day.extend(map(date_key, map(itemgetter(0), rows)))
+            self.merchant.extend([codes.setdefault(text, len(codes)) for text in map(str.strip, map(itemgetter(2), rows))])
+            if len(codes) > len(self.merchants):
+                self.merchants.extend(list(codes)[len(self.merchants):])
+            self.spent.extend(spent)
+            self.received.extend(received)
+        # the row count last: a reader on another thread only ever sees
+        # rows whose columns are complete
+        self._spent_total += sum(spent)
+        self._received_total += sum(received)
+        self._rows += len(rows)
+
+    def drop(self, rows: Sequence[Sequence[str]]):
+        """Take back the last len(rows) rows, which must be `rows` as appended.
+
+        Costs O(len(rows)): totals and cached group-bys are wound back,
+        nothing is rebuilt."""
+        rows = self._padded(rows)
+        if not rows:
+            return
+        start = self._rows - len(rows)
+        self._rows = start
+        self._spent_total -= sum(map(cents, map(itemgetter(3), rows)))
+        self._received_total -= sum(map(cents, map(itemgetter(4), rows)))
+        if not self.columns:
+            return
+        for name, (done, acc) in self._groups.items():
+            if done <= start:
+                continue
+            for key, spent, received in zip(_GROUP_KEYS[name](self, start), self.spent[start:done],
+                                            self.received[start:done]):
+                totals = acc[key]
+                totals[0] -= spent
+                totals[1] -= received
+                totals[2] -= 1
+                if not totals[2]:
+                    del acc[key]
+            self._groups[name] = (start, acc)
+        for column in (self.day, self.spent, self.received, self.merchant):
+            del column[start:]
+
+    # ── aggregates ──────────────────────────────────────────────────
+
+    def totals(self) -> tuple[float, float]:
+        """(spent, received) over every row."""
+        return self._spent_total / 100, self._received_total / 100
+
+    def _group(self, name: str) -> dict[int, list[int]]:
+        done, acc = self._groups.get(name, (0, {}))
+        rows = len(self)
+        if done < rows:
+            # slicing copies only the rows not folded in yet
+            for key, spent, received in zip(_GROUP_KEYS[name](self, done), self.spent[done:rows],
+                                            self.received[done:rows]):
+                totals = acc.get(key)
+                if totals is None:
+                    acc[key] = [spent, received, 1]
+                else:
+                    totals[0] += spent
+                    totals[1] += received
+                    totals[2] += 1
+            self._groups[name] = (rows, acc)
+        return acc
+
+    @staticmethod
+    def _groups_of(acc: dict[int, list[int]], label: Callable[[int], str]) -> list[Group]:
+        return [Group(label(key), s / 100, r / 100, n) for key, (s, r, n) in sorted(acc.items())]
+
+    def by_day(self) -> list[Group]:
+        """Per booking day, oldest first; undated rows first under ""."""
+        acc = self._group("day")
+        return self._groups_of(acc, _day_label)
+
+    def by_month(self) -> list[Group]:
+        """Per calendar month ("YYYY-MM"), oldest first."""
+        acc = self._group("month")
+        return self._groups_of(acc, _month_label)
+
+    def by_merchant(self) -> list[Group]:
+        """Per Buchungstext, most spent first."""
+        acc = self._group("merchant")
+        groups = self._groups_of(acc, self.merchants.__getitem__)
+        groups.sort(key=lambda g: (-g.spent, g.key))
+        return groups
+
+    def nbytes(self) -> int:
+        """Bytes held by the columns (interned texts not included)."""
+        return sum(a.itemsize * len(a) for a in (self.day, self.spent, self.received, self.merchant))
+
+
+# group-by name → keys of the rows from `start` on, in row order
+_GROUP_KEYS: dict[str, Callable[[Transactions, int], Iterable[int]]] = {
+    "day": lambda book, start: book.day[start:],
+    "month": lambda book, start: (d // 100 for d in book.day[start:]),
+    "merchant": lambda book, start: book.merchant[start:],
+}
@@ -1,11 +1,18 @@
 from __future__ import annotations
 from datetime import datetime
+from typing import Sequence
+from rich.columns import Columns
+from rich.console import RenderableType
 from rich.layout import Layout
+from rich.panel import Panel
 from rich.rule import Rule
 from rich.table import Table
 from rich.text import Text
 import pyfiglet
-from app.ui.utils import clamp_text
+from app.ui.utils import clamp_text, sparkline
+from app.forecast import WEATHER_ICONS
+from app.board import BatchStats
+from app.transactions import Group
 
 def build_status_bar(
     *,
@@ -14,10 +21,14 @@ def build_status_bar(
     country: str,
     coords: tuple[float, float],
     next_refresh_in_seconds: int,
+    stale: bool = False,
+    age_seconds: int | None = None,
+    refreshing: bool = False,
+    batch: BatchStats | None = None,
 ) -> Text:
     now_local = datetime.now().strftime("%H:%M:%S")
 
-    return Text.assemble(
+    text = Text.assemble(
         (" ● ", "statusbart.text"),
         ("STATUS ", "statusbart.text"),
         (now_local, "statusbart.Time"),
@@ -29,8 +40,24 @@ def build_status_bar(
         ("Next ", "statusbart.text"),
         (f"{max(0, next_refresh_in_seconds)}s", "statusbart.Time"),
     )
+    if refreshing:
+        text.append(" ⟳", "statusbart.Time")
+    if age_seconds is not None:
+        text.append(" | ", "statusbart.text")
+        text.append("Age ", "statusbart.text")
+        text.append(f"{age_seconds}s", "statusbart.Time")
+    if batch is not None:
+        text.append(" | ", "statusbart.text")
+        text.append("Batch ", "statusbart.text")
+        text.append(f"{batch.calls}× {batch.seconds:.2f}s", "statusbart.Time")
+        if batch.errors:
+            text.append(f" {batch.errors} failed", "app.money.bad")
+    if stale:
+        text.append(" | ", "statusbart.text")
+        text.append("STALE", "app.money.bad")
+    return text
 
-def build_banking_table(transactions: list[list[str]]) -> Table:
+def build_banking_table(transactions: Sequence[Sequence[str]]) -> Table:
     bank_table = Table(
         title=f"Letzte {len(transactions)} Transaktionen",
         show_header=True,
@@ -47,51 +74,23 @@ def build_banking_table(transactions: list[list[str]]) -> Table:
     bank_table.add_column("Saldo", justify="right", no_wrap=True, width=10)
 
     for tx in transactions:
-        row = (tx + ["", "", "", "", "", ""])[:6]
+        row = (list(tx) + ["", "", "", "", "", ""])[:6]
         bank_table.add_row(row[0], row[1], row[2], row[3], row[4], row[5])
 
     return bank_table
 
 
-def build_layout(
+def _build_weather(
+    layout: Layout,
     *,
-    location_label: str,
     coords: tuple[float, float],
     city: str,
     country: str,
     hourly_table: Table,
     weekly_table: Table,
-    transactions: list[list[str]],
-    balance: float,
-    total_spent: float,
-    total_received: float,
-    next_refresh_in_seconds: int,
-    refresh_minutes: int,
-    units: str,
-) -> Layout:
-    layout = Layout(name="root")
-
-    layout.split_column(
-        Layout(name="root/spacer",ratio=2),
-        Layout(name="root/status", size=1),
-        Layout(name="root/weather", ratio=5),
-        Layout(name="root/separator", size=1),
-        Layout(name="root/banking", ratio=4),
-    )
-    layout["root/spacer"].update(Text(""))
-    layout["root/status"].update(
-        build_status_bar(
-            location_label=location_label,
-            city=city,
-            country=country,
-            coords=coords,
-            next_refresh_in_seconds=next_refresh_in_seconds,
-        )
-    )
-
-    layout["root/separator"].update(Rule(style="divider", characters="━"))
-
-    # Weather section
+    trend: Sequence[float] = (),
+    temp_unit: str = "",
+) -> None:
     layout["root/weather"].split_column(
         Layout(name="root/weather/info", size=6),
         Layout(name="root/weather/forecast"),
@@ -125,11 +124,106 @@ def build_layout(
     style="app.subtitle"    )
     )
 
-    layout["root/weather/forecast/hourly/title"].update(Text("Hourly Forecast", style="app.weather.title"))
+    hourly_title = Text("Hourly Forecast", style="app.weather.title", no_wrap=True, overflow="ellipsis")
+    if len(trend) > 1:
+        hourly_title.append(f"  {sparkline(trend)}", "app.weather.data")
+        hourly_title.append(f" {min(trend):.0f}–{max(trend):.0f}{temp_unit}", "app.weather.data")
+    layout["root/weather/forecast/hourly/title"].update(hourly_title)
     layout["root/weather/forecast/weekly/title"].update(Text("Weekly Forecast", style="app.weather.title"))
     layout["root/weather/forecast/hourly/data"].update(hourly_table)
     layout["root/weather/forecast/weekly/data"].update(weekly_table)
 
+
+def _board_cell(site, temp_unit: str, hourly_rows: int, weekly_rows: int) -> Panel:
+    lines = Text(no_wrap=True, overflow="ellipsis")
+    hourly, weekly = site.hourly, site.weekly
+    if hourly is not None:
+        for i, (when, _, _) in enumerate(hourly.cells(temp_unit, "")[:hourly_rows]):
+            temp = hourly.temp[i]
+            temp_part = f"{temp:.0f}{temp_unit}" if temp == temp else "—"
+            lines.append(f"{when} {WEATHER_ICONS.get(hourly.icon[i], '')} {temp_part}\n", "app.weather.data")
+    if weekly is not None:
+        for i, (when, _, _) in enumerate(weekly.cells(temp_unit, "")[:weekly_rows]):
+            if i < len(weekly.temp_min) and weekly.temp_min[i] == weekly.temp_min[i]:
+                temp_part = f"{weekly.temp_min[i]:.0f}–{weekly.temp_max[i]:.0f}{temp_unit}"
+            else:
+                temp_part = f"{weekly.temp[i]:.0f}{temp_unit}" if weekly.temp[i] == weekly.temp[i] else "—"
+            lines.append(f"{when} {WEATHER_ICONS.get(weekly.icon[i], '')} {temp_part}\n", "label")
+    if hourly is None and weekly is None:
+        lines.append("…" if site.error is None else "unavailable", "app.subtitle")
+    lines.rstrip()
+
+    border = "app.money.bad" if site.error else "divider"
+    return Panel(lines, title=clamp_text(site.name, 18), title_align="left",
+                 border_style=border, width=24, padding=(0, 1))
+
+
+def build_board_grid(board, *, units: str, hourly_rows: int, weekly_rows: int) -> RenderableType:
+    """Compact grid, one cell per board site (app.board.SiteForecast)."""
+    temp_unit = "°C" if units == "metric" else "°F"
+    return Columns(
+        [_board_cell(site, temp_unit, hourly_rows, weekly_rows) for site in board],
+        padding=(0, 1),
+    )
+
+
+def build_layout(
+    *,
+    location_label: str,
+    coords: tuple[float, float],
+    city: str,
+    country: str,
+    hourly_table: Table,
+    weekly_table: Table,
+    transactions: Sequence[Sequence[str]],
+    balance: float,
+    total_spent: float,
+    total_received: float,
+    next_refresh_in_seconds: int,
+    refresh_minutes: int,
+    units: str,
+    stale: bool = False,
+    age_seconds: int | None = None,
+    refreshing: bool = False,
+    board: RenderableType | None = None,
+    batch: BatchStats | None = None,
+    trend: Sequence[float] = (),
+    months: Sequence[Group] = (),
+) -> Layout:
+    layout = Layout(name="root")
+
+    layout.split_column(
+        Layout(name="root/spacer",ratio=2),
+        Layout(name="root/status", size=1),
+        Layout(name="root/weather", ratio=5),
+        Layout(name="root/separator", size=1),
+        Layout(name="root/banking", ratio=4),
+    )
+    layout["root/spacer"].update(Text(""))
+    layout["root/status"].update(
+        build_status_bar(
+            location_label=location_label,
+            city=city,
+            country=country,
+            coords=coords,
+            next_refresh_in_seconds=next_refresh_in_seconds,
+            stale=stale,
+            age_seconds=age_seconds,
+            refreshing=refreshing,
+            batch=batch,
+        )
+    )
+
+    layout["root/separator"].update(Rule(style="divider", characters="━"))
+
+    # Weather section — the multi-location grid replaces the single city
+    if board is not None:
+        layout["root/weather"].update(board)
+    else:
+        _build_weather(layout, coords=coords, country=country, city=city,
+                       hourly_table=hourly_table, weekly_table=weekly_table,
+                       trend=trend, temp_unit="°C" if units == "metric" else "°F")
+
     # Banking section
     layout["root/banking"].split_row(
         Layout(name="root/banking/info"),
@@ -145,17 +239,21 @@ def build_layout(
 
     saldo_style = "app.money.good" if balance > 0 else "app.money.bad" if balance < 0 else "app.money.neutral"
 
-    layout["root/banking/info/account"].update(
-        Text.assemble(
-            ("\nAusgegeben| ", "label"),
-            (f"{total_spent:.2f}", "app.money.bad"),
-            ("   Bekommen| ", "label"),
-            (f"{total_received:.2f}", "app.money.good"),
-            ("\nKontosumme| ", "label"),
-            (f"{balance:.2f}", saldo_style),
-            ("\n", "")
-        )
+    account = Text.assemble(
+        ("\nAusgegeben| ", "label"),
+        (f"{total_spent:.2f}", "app.money.bad"),
+        ("   Bekommen| ", "label"),
+        (f"{total_received:.2f}", "app.money.good"),
+        ("\nKontosumme| ", "label"),
+        (f"{balance:.2f}", saldo_style),
+        ("\n", "")
     )
+    for month in months:
+        account.append(f"\n{month.key or '—':>10}| ", "label")
+        account.append(f"{month.spent:.2f}", "app.money.bad")
+        account.append("   ")
+        account.append(f"{month.received:.2f}", "app.money.good")
+    layout["root/banking/info/account"].update(account)
 
     layout["root/banking/table"].update(build_banking_table(transactions))
     return layout
\ No newline at end of file
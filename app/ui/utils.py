@@ -1,4 +1,5 @@
 from __future__ import annotations
+from typing import Sequence
 from rich.console import Console
 
 
@@ -24,6 +25,21 @@ def compute_forecast_limits(
     return hourly, weekly
 
 
+SPARK_BARS = "▁▂▃▄▅▆▇█"
+
+
+def sparkline(values: Sequence[float]) -> str:
+    """One block character per value, scaled between the series' min and max."""
+    if not values:
+        return ""
+    lo, hi = min(values), max(values)
+    span = hi - lo
+    if span <= 0:
+        return SPARK_BARS[len(SPARK_BARS) // 2 - 1] * len(values)
+    top = len(SPARK_BARS) - 1
+    return "".join(SPARK_BARS[round((v - lo) / span * top)] for v in values)
+
+
 def clamp_text(value: str | None, max_len: int) -> str:
     if not value:
         return ""
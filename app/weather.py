@@ -1,23 +1,26 @@
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
+from typing import Callable
 
-import requests
 from rich.table import Table
 
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
-from requirements.gateway import GatewayClient
-from requirements import config
+from requirements.gateway import AsyncGatewayClient, GatewayBatch, GatewayClient, shared_client
+from requirements.decoding import DAILY_FIELDS, HOURLY_FIELDS, rows_from_items
+from requirements.geo_grid import snap
+from app.forecast import Forecast, daily_from_hourly, extend_days
 
-WEATHER_ICONS = {
-    "01d": "☀️", "02d": "⛅", "03d": "☁️", "04d": "☁️☁️", "09d": "🌧️",
-    "10d": "🌦️", "11d": "🌩️", "13d": "🌨️", "50d": "🌫️",
-    "01n": "🌙", "02n": "🌙☁️", "03n": "☁️", "04n": "☁️☁️", "09n": "🌧️",
-    "10n": "🌙🌧️", "11n": "🌩️", "13n": "🌨️", "50n": "🌫️",
-}
+HOURLY_TIME_FORMAT = "%H:%M"   # in the city's timezone
+DAILY_TIME_FORMAT = "%d/%m"    # in the machine's timezone
+
+# derive_weekly: the hourly endpoint's full series (5 days × 8 slots),
+# and the days it always covers once the trailing partial day is dropped
+HOURLY_HORIZON = 40
+HOURLY_HORIZON_DAYS = 5
 
 
 class WeatherError(RuntimeError):
@@ -33,13 +36,20 @@ class WeatherResult:
 
 
 class WeatherService:
-    def __init__(self, units: str):
-        self.gateway = GatewayClient(
-            base_url=config.GATEWAY_URL,
-            username=config.GATEWAY_USERNAME,
-            password=config.GATEWAY_PASSWORD
-        )
+    def __init__(
+        self,
+        units: str,
+        gateway: GatewayClient | None = None,
+        compact: bool = False,
+        derive_weekly: bool = False,
+        grid_precision: int = 0,
+    ):
+        self.gateway = gateway or shared_client()
+        self.agateway = AsyncGatewayClient(self.gateway)
         self.units = units  # "metric" or "imperial"
+        self.compact = compact  # decode only the rows/fields we show
+        self.derive_weekly = derive_weekly  # weekly rows from the hourly series; daily endpoint only past it
+        self.grid_precision = grid_precision  # geohash length requests snap to; 0 = exact coordinates
 
         self.temp_unit = "°C" if units == "metric" else "°F"
         self.wind_unit = "m/s" if units == "metric" else "mph"
@@ -47,84 +57,201 @@ class WeatherService:
         # state you can read from main/ui
         self.city = "—"
         self.country = "—"
-        self.hourly_table = Table()
-        self.weekly_table = Table()
+        # last fetched forecasts at full fetch depth — tables for fewer
+        # rows are re-sliced from these offline
+        self.hourly_forecast: Forecast | None = None
+        self.daily_forecast: Forecast | None = None
+
+    def _hourly_call(self, gw, lat: float, lon: float, rows: int):
+        """The hourly request on `gw` — a client, async client or batch.
+
+        Coordinates are snapped to the grid first, so nearby or drifting
+        locations share one cache and single-flight key."""
+        lat, lon = snap(lat, lon, self.grid_precision)
+        if self.compact:
+            return gw.get_hourly_forecast_rows(lat, lon, rows, self.units)
+        return gw.get_hourly_forecast(lat, lon, self.units)
+
+    def _daily_call(self, gw, lat: float, lon: float, rows: int):
+        lat, lon = snap(lat, lon, self.grid_precision)
+        if self.compact:
+            return gw.get_daily_forecast_rows(lat, lon, days=rows, units=self.units)
+        return gw.get_daily_forecast(lat, lon, days=rows, units=self.units)
+
+    def _rows(self, data: dict, fields, rows: int) -> dict:
+        """Full forecast JSON → the compact {"city", "rows"} shape."""
+        if self.compact:
+            return data
+        return {"city": data["city"], "rows": rows_from_items(data.get("list", []), fields, rows)}
 
     def fetch_hourly(self, lat: float, lon: float, rows: int) -> tuple[Table, str, str]:
-        try:
-            data = self.gateway.get_hourly_forecast(lat, lon, self.units)
-        except Exception as e:
-            raise WeatherError(f"API Error: Unable to retrieve hourly forecast: {e}")
+        return self._hourly_table(self._hourly(self._hourly_data(lat, lon, rows)))
 
-        city = data["city"]["name"]
-        country = data["city"]["country"]
+    async def fetch_hourly_async(self, lat: float, lon: float, rows: int) -> tuple[Table, str, str]:
+        return self._hourly_table(self._hourly(await self._hourly_data_async(lat, lon, rows)))
 
+    @staticmethod
+    def _hourly(data: dict) -> Forecast:
+        return Forecast.from_data(data, time_format=HOURLY_TIME_FORMAT)
+
+    @staticmethod
+    def _daily(data: dict) -> Forecast:
+        return Forecast.from_data(data, time_format=DAILY_TIME_FORMAT, city_time=False)
+
+    def _hourly_table(self, forecast: Forecast, rows: int | None = None) -> tuple[Table, str, str]:
         table = Table(show_header=False, box=None, padding=(0, 1), pad_edge=False)
         table.add_column("Time", width=5, no_wrap=True,style="app.weather.data")
         table.add_column("Weather", width=18, overflow="ellipsis",style="app.weather.data")
         table.add_column("Data", width=18, justify="right", no_wrap=True, overflow="ellipsis",style="app.weather.data")
 
-        items = data.get("list", [])
-        for i in range(min(rows, len(items))):
-            icon_code = items[i]["weather"][0]["icon"]
-            icon = WEATHER_ICONS.get(icon_code, "")
-            desc = items[i]["weather"][0]["description"]
-
-            temp = items[i]["main"]["temp"]
-            wind = items[i]["wind"]["speed"]
-            gust = items[i]["wind"].get("gust", None)
+        for when, weather, measures in forecast.cells(self.temp_unit, self.wind_unit)[:rows]:
+            table.add_row(when, weather, measures)
 
-            unix_time = items[i]["dt"]
-            tz_offset = data["city"]["timezone"]
-            local_time = datetime.fromtimestamp(unix_time, tz=timezone(timedelta(seconds=tz_offset)))
-            hhmm = local_time.strftime("%H:%M")
-
-            gust_part = f" {gust:.1f}{self.wind_unit}" if isinstance(gust, (int, float)) else ""
-            table.add_row(
-                hhmm,
-                f"{icon} {desc}",
-                f"{temp:.1f}{self.temp_unit} {wind:.1f}{self.wind_unit}{gust_part}",
-            )
-
-        return table, city, country
+        return table, forecast.city, forecast.country
 
     def fetch_weekly(self, lat: float, lon: float, rows: int) -> tuple[Table, str, str]:
-        try:
-            data = self.gateway.get_daily_forecast(lat, lon, days=rows, units=self.units)
-        except Exception as e:
-            raise WeatherError(f"API Error: Unable to retrieve daily forecast: {e}")
+        return self._weekly_table(self._daily(self._daily_data(lat, lon, rows)))
 
-        city = data["city"]["name"]
-        country = data["city"]["country"]
+    async def fetch_weekly_async(self, lat: float, lon: float, rows: int) -> tuple[Table, str, str]:
+        return self._weekly_table(self._daily(await self._daily_data_async(lat, lon, rows)))
 
+    def _weekly_table(self, forecast: Forecast, rows: int | None = None) -> tuple[Table, str, str]:
         table = Table(show_header=False, box=None, padding=(0, 1), pad_edge=False)
         table.add_column("Date", width=6, no_wrap=True,style="app.weather.data")
         table.add_column("Weather", width=18, overflow="ellipsis",style="app.weather.data")
         table.add_column("Data", width=18, justify="right", no_wrap=True, overflow="ellipsis",style="app.weather.data")
 
-        items = data.get("list", [])
-        for i in range(min(rows, len(items))):
-            icon_code = items[i]["weather"][0]["icon"]
-            icon = WEATHER_ICONS.get(icon_code, "")
-            desc = items[i]["weather"][0]["description"]
+        for when, weather, measures in forecast.cells(self.temp_unit, self.wind_unit)[:rows]:
+            table.add_row(when, weather, measures)
+
+        return table, forecast.city, forecast.country
 
-            temp = items[i]["temp"]["day"]
-            wind = items[i]["speed"]
-            gust = items[i].get("gust", None)
+    def tables(
+        self,
+        hourly_rows: int,
+        weekly_rows: int,
+        hourly_forecast: Forecast | None = None,
+        daily_forecast: Forecast | None = None,
+    ) -> tuple[Table, Table]:
+        """Hourly and weekly tables cut to the given depth, without any request.
 
-            unix_time = items[i]["dt"]
-            date = datetime.fromtimestamp(unix_time).strftime("%d/%m")
+        Uses the last fetched forecasts unless others (e.g. a snapshot's)
+        are passed; a forecast not fetched yet renders as an empty table."""
+        if hourly_forecast is None:
+            hourly_forecast = self.hourly_forecast
+        if daily_forecast is None:
+            daily_forecast = self.daily_forecast
+        hourly = self._hourly_table(hourly_forecast, hourly_rows)[0] if hourly_forecast is not None else Table()
+        weekly = self._weekly_table(daily_forecast, weekly_rows)[0] if daily_forecast is not None else Table()
+        return hourly, weekly
 
-            gust_part = f" {gust:.1f}{self.wind_unit}" if isinstance(gust, (int, float)) else ""
-            table.add_row(
-                date,
-                f"{icon} {desc}",
-                f"{temp:.1f}{self.temp_unit} {wind:.1f}{self.wind_unit}{gust_part}",
-            )
+    def _store(self, hourly: Forecast, weekly: Forecast | None) -> None:
+        # tables are cut from these on demand; see tables()
+        self.city, self.country = hourly.city, hourly.country
+        self.hourly_forecast, self.daily_forecast = hourly, weekly
 
-        return table, city, country
+    def restore(self, hourly: Forecast, daily: Forecast | None) -> None:
+        """Show forecasts fetched earlier (e.g. from a ForecastStore) until the next update."""
+        self._store(hourly, daily)
+
+    def _plan(self, hourly_rows: int, weekly_rows: int) -> tuple[int, bool]:
+        """(hourly slots to fetch, whether the daily endpoint is needed up front)."""
+        if not self.derive_weekly:
+            return hourly_rows, True
+        return max(hourly_rows, HOURLY_HORIZON), weekly_rows > HOURLY_HORIZON_DAYS
+
+    def _weekly(self, hourly: Forecast, daily_data: dict | None, weekly_rows: int) -> Forecast | None:
+        """The weekly forecast, or None when the daily endpoint must fill it."""
+        if not self.derive_weekly:
+            return self._daily(daily_data)
+        weekly = daily_from_hourly(hourly, time_format=DAILY_TIME_FORMAT)
+        if len(weekly) >= weekly_rows:
+            return weekly
+        if daily_data is None:
+            return None
+        return extend_days(weekly, self._daily(daily_data), hourly.offset, limit=weekly_rows)
+
+    def _hourly_data(self, lat: float, lon: float, rows: int) -> dict:
+        try:
+            return self._rows(self._hourly_call(self.gateway, lat, lon, rows), HOURLY_FIELDS, rows)
+        except Exception as e:
+            raise WeatherError(f"API Error: Unable to retrieve hourly forecast: {e}")
+
+    def _daily_data(self, lat: float, lon: float, rows: int) -> dict:
+        try:
+            return self._rows(self._daily_call(self.gateway, lat, lon, rows), DAILY_FIELDS, rows)
+        except Exception as e:
+            raise WeatherError(f"API Error: Unable to retrieve daily forecast: {e}")
+
+    def queue_forecasts(
+        self, batch: GatewayBatch, coords: tuple[float, float], hourly_rows: int, weekly_rows: int,
+    ) -> Callable[[], tuple[Forecast, Forecast]]:
+        """Queue the requests for forecasts() on `batch`; call the returned
+        function once the batch is sent for (hourly, weekly)."""
+        lat, lon = coords
+        depth, need_daily = self._plan(hourly_rows, weekly_rows)
+        hourly = self._hourly_call(batch, lat, lon, depth)
+        daily = self._daily_call(batch, lat, lon, weekly_rows) if need_daily else None
+
+        def result() -> tuple[Forecast, Forecast]:
+            try:
+                hourly_data = self._rows(hourly.result(), HOURLY_FIELDS, depth)
+            except Exception as e:
+                raise WeatherError(f"API Error: Unable to retrieve hourly forecast: {e}")
+            daily_data = None
+            if daily is not None:
+                try:
+                    daily_data = self._rows(daily.result(), DAILY_FIELDS, weekly_rows)
+                except Exception as e:
+                    raise WeatherError(f"API Error: Unable to retrieve daily forecast: {e}")
+
+            hourly_fc = self._hourly(hourly_data)
+            weekly = self._weekly(hourly_fc, daily_data, weekly_rows)
+            if weekly is None:   # hourly series shorter than expected
+                weekly = self._weekly(hourly_fc, self._daily_data(lat, lon, weekly_rows), weekly_rows)
+            return hourly_fc, weekly
+
+        return result
+
+    def forecasts(self, coords: tuple[float, float], hourly_rows: int, weekly_rows: int) -> tuple[Forecast, Forecast]:
+        """(hourly, weekly) for `coords`, sent as one gateway batch; no state is kept."""
+        with self.gateway.batch() as batch:
+            result = self.queue_forecasts(batch, coords, hourly_rows, weekly_rows)
+        return result()
 
     def update(self, coords: tuple[float, float], hourly_rows: int, weekly_rows: int) -> None:
+        """Hourly and daily forecasts are sent as one gateway batch.
+
+        Pass the deepest row counts the UI may show; tables for smaller
+        terminals come from tables() without refetching."""
+        self._store(*self.forecasts(coords, hourly_rows, weekly_rows))
+
+    async def _hourly_data_async(self, lat: float, lon: float, rows: int) -> dict:
+        try:
+            return self._rows(await self._hourly_call(self.agateway, lat, lon, rows), HOURLY_FIELDS, rows)
+        except Exception as e:
+            raise WeatherError(f"API Error: Unable to retrieve hourly forecast: {e}")
+
+    async def _daily_data_async(self, lat: float, lon: float, rows: int) -> dict:
+        try:
+            return self._rows(await self._daily_call(self.agateway, lat, lon, rows), DAILY_FIELDS, rows)
+        except Exception as e:
+            raise WeatherError(f"API Error: Unable to retrieve daily forecast: {e}")
+
+    async def _no_data(self) -> None:
+        return None
+
+    async def update_async(self, coords: tuple[float, float], hourly_rows: int, weekly_rows: int) -> None:
+        """Like update(), but hourly and daily forecasts are fetched concurrently."""
         lat, lon = coords
-        self.hourly_table, self.city, self.country = self.fetch_hourly(lat, lon, hourly_rows)
-        self.weekly_table, _, _ = self.fetch_weekly(lat, lon, weekly_rows)
\ No newline at end of file
+        depth, need_daily = self._plan(hourly_rows, weekly_rows)
+        hourly_data, daily_data = await asyncio.gather(
+            self._hourly_data_async(lat, lon, depth),
+            self._daily_data_async(lat, lon, weekly_rows) if need_daily else self._no_data(),
+        )
+
+        hourly_fc = self._hourly(hourly_data)
+        weekly = self._weekly(hourly_fc, daily_data, weekly_rows)
+        if weekly is None:   # hourly series shorter than expected
+            weekly = self._weekly(hourly_fc, await self._daily_data_async(lat, lon, weekly_rows), weekly_rows)
+        self._store(hourly_fc, weekly)
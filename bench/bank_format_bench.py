@@ -0,0 +1,123 @@
+"""
+Bank export parsing benchmark: sniffing and the compiled cell parsers.
+
+Run from the project root:
+    python -m bench.bank_format_bench [--rows 200000]
+
+Writes the same transactions as three exports — Banking's own layout,
+a German one (signed "Betrag", 1.234,56, BOM) and a US one (",",
+ISO dates, 1,234.56) — and reports for each what sniff() found, how
+long sniffing took, and the CPU time of a full Banking.update().  Every
+export must yield the same totals.
+
+Then times the per-cell parsers against the strptime / float()
+fallback chain Banking used before formats were sniffed, on uncached
+dates and amounts.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import shutil
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from app.bank_format import amount_parser, date_parser, sniff_file
+from app.banking import Banking
+
+
+def _german(value: float) -> str:
+    return f"{value:,.2f}".replace(",", " ").replace(".", ",").replace(" ", ".")
+
+
+def write_exports(root: Path, rows: int, seed: int = 11) -> list[Path]:
+    rng = random.Random(seed)
+    start = date(2000, 1, 1)
+    native = ["Buchung;Valuta;Buchungstext;Belastung;Gutschrift;Saldo\n"]
+    german = ["﻿Buchungstag;Wertstellung;Verwendungszweck;Betrag;Kontostand\n"]
+    us = ["Date,Description,Amount,Balance\n"]
+    saldo = 0.0
+    for i in range(rows):
+        day = start + timedelta(days=i // 30)
+        value = round(rng.uniform(1, 5000), 2) * (1 if rng.random() < 0.2 else -1)
+        saldo += value
+        text = f"Text {i % 400}"
+        spent, received = (f"{-value:,.2f}".replace(",", "'"), "") if value < 0 else ("", f"{value:,.2f}".replace(",", "'"))
+        native.append(f"{day:%d.%m.%Y};{day:%d.%m.%Y};{text};{spent};{received};{saldo:.2f}\n")
+        german.append(f"{day:%d.%m.%Y};{day:%d.%m.%Y};{text};{_german(value)};{_german(saldo)}\n")
+        us.append(f'{day:%Y-%m-%d},{text},"{value:,.2f}","{saldo:,.2f}"\n')
+
+    paths = []
+    for name, lines in (("native", native), ("german", german), ("us", us)):
+        folder = root / name
+        folder.mkdir()
+        path = folder / f"{name}.csv"
+        path.write_text("".join(lines), encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def _legacy_date(value: str):
+    for fmt in ("%d.%m.%Y", "%d/%m/%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value.strip(), fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def _legacy_amount(value: str) -> float:
+    value = (value or "").replace("'", "")
+    try:
+        return float(value) if value else 0.0
+    except ValueError:
+        return 0.0
+
+
+def _cpu(fn, *args) -> float:
+    start = time.process_time()
+    fn(*args)
+    return time.process_time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="bank-format-bench-"))
+    try:
+        paths = write_exports(root, args.rows)
+        print(f"{args.rows} rows per export")
+        print(f"  {'export':<8}{'sniff ms':>10}{'update s':>10}  format")
+        totals = set()
+        for path in paths:
+            start = time.perf_counter()
+            fmt = sniff_file(path)
+            sniffed = time.perf_counter() - start
+            seconds = min(_cpu(Banking(path.parent).update, 20) for _ in range(3))
+            bank = Banking(path.parent)
+            bank.update(20)
+            totals.add((round(bank.total_spent, 2), round(bank.total_received, 2)))
+            print(f"  {path.stem:<8}{sniffed * 1000:>10.1f}{seconds:>10.2f}  {fmt.delimiter!r} {fmt.date_format} "
+                  f"decimal {fmt.decimal!r} thousands {fmt.thousands!r} header {fmt.header}")
+        print(f"  same totals: {len(totals) == 1}")
+
+        # distinct values, so no cache helps either side
+        days = [(date(1900, 1, 1) + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(50_000)]
+        amounts = [f"{i * 37 % 1_000_000 / 100:,.2f}".replace(",", "'") for i in range(50_000)]
+        iso, cents = date_parser("%Y-%m-%d"), amount_parser(".", "'")
+        print("cells (50k, CPU s)       before   sniffed")
+        print(f"  ISO dates           {_cpu(lambda: [_legacy_date(d) for d in days]):>10.3f}"
+              f"{_cpu(lambda: [iso(d) for d in days]):>10.3f}")
+        print(f"  1'234.56 amounts    {_cpu(lambda: [_legacy_amount(a) for a in amounts]):>10.3f}"
+              f"{_cpu(lambda: [cents(a) for a in amounts]):>10.3f}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Forecast decoding benchmark: r.json()-style full decode vs ListDecoder.
+
+Run from the project root:
+    python -m bench.decode_bench [--rows 12] [--number 2000]
+
+For each path it reports mean CPU time per body and peak allocated
+bytes (tracemalloc) while decoding one body.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import tracemalloc
+
+from bench import fixtures
+from requirements.decoding import DAILY_FIELDS, HOURLY_FIELDS, ListDecoder, orjson, rows_from_items
+
+
+def _baseline(fields, rows):
+    # what WeatherService did before: decode everything, then walk `rows` items
+    def run(body: bytes):
+        data = json.loads(body)
+        return data["city"], rows_from_items(data["list"], fields, rows)
+    return run
+
+
+def _measure(fn, body: bytes, number: int) -> tuple[float, int]:
+    fn(body)
+    start = time.process_time()
+    for _ in range(number):
+        fn(body)
+    per_call = (time.process_time() - start) / number
+
+    tracemalloc.start()
+    fn(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return per_call, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=12)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    cases = [
+        ("hourly", json.dumps(fixtures.hourly_forecast()).encode("utf-8"), HOURLY_FIELDS),
+        ("daily", json.dumps(fixtures.daily_forecast(cnt=16)).encode("utf-8"), DAILY_FIELDS),
+    ]
+    backends = ["stream", "json"] + (["orjson"] if orjson is not None else [])
+
+    for name, body, fields in cases:
+        print(f"\n{name}: {len(body)} bytes, first {args.rows} rows")
+        print(f"  {'path':<14}{'µs/body':>10}{'peak KiB':>10}{'speed-up':>10}")
+        base_t, base_mem = _measure(_baseline(fields, args.rows), body, args.number)
+        print(f"  {'r.json()':<14}{base_t * 1e6:>10.1f}{base_mem / 1024:>10.1f}{'1.00x':>10}")
+        for backend in backends:
+            decoder = ListDecoder(fields, limit=args.rows, backend=backend)
+            t, mem = _measure(decoder, body, args.number)
+            print(f"  {backend:<14}{t * 1e6:>10.1f}{mem / 1024:>10.1f}{base_t / t:>9.2f}x")
+        auto = ListDecoder(fields, limit=args.rows)
+        print(f"  (default backend for {args.rows} rows: {auto.backend})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Realistic gateway payloads for offline benchmarks.
+
+Shapes follow what the gateway forwards from OpenWeather / Geoapify /
+IPRegistry, with deterministic pseudo-random values so runs compare.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+
+ICONS = ("01d", "02d", "03d", "04d", "09d", "10d", "11d", "13d", "50d",
+         "01n", "02n", "03n", "04n", "09n", "10n")
+DESCRIPTIONS = ("clear sky", "few clouds", "scattered clouds", "broken clouds",
+                "shower rain", "light rain", "thunderstorm", "snow", "mist")
+
+
+def city(name: str = "Zurich", lat: float = 47.3769, lon: float = 8.5417) -> dict:
+    return {
+        "id": 2657896,
+        "name": name,
+        "coord": {"lat": lat, "lon": lon},
+        "country": "CH",
+        "population": 341730,
+        "timezone": 3600,
+        "sunrise": 1760594400,
+        "sunset": 1760633400,
+    }
+
+
+def _weather(rng: random.Random) -> list:
+    i = rng.randrange(len(DESCRIPTIONS))
+    return [{"id": 800 + i, "main": DESCRIPTIONS[i].split()[0].title(),
+             "description": DESCRIPTIONS[i], "icon": rng.choice(ICONS)}]
+
+
+def hourly_forecast(lat: float = 47.3769, lon: float = 8.5417, *, cnt: int = 40,
+                    start: int | None = None, seed: int = 1) -> dict:
+    """5 days × 8 three-hour slots, like /weather/forecast/hourly."""
+    rng = random.Random(seed)
+    start = start if start is not None else int(time.time()) // 10800 * 10800
+    items = []
+    for i in range(cnt):
+        dt = start + i * 10800
+        temp = round(8 + 6 * rng.random(), 2)
+        items.append({
+            "dt": dt,
+            "main": {
+                "temp": temp, "feels_like": round(temp - 1.3, 2),
+                "temp_min": round(temp - 0.8, 2), "temp_max": round(temp + 0.6, 2),
+                "pressure": 1016, "sea_level": 1016, "grnd_level": 961,
+                "humidity": rng.randrange(40, 95), "temp_kf": 0.33,
+            },
+            "weather": _weather(rng),
+            "clouds": {"all": rng.randrange(0, 100)},
+            "wind": {"speed": round(rng.random() * 6, 2), "deg": rng.randrange(360),
+                     "gust": round(rng.random() * 11, 2)},
+            "visibility": 10000,
+            "pop": round(rng.random(), 2),
+            "rain": {"3h": round(rng.random(), 2)},
+            "sys": {"pod": "d" if 6 <= (dt // 3600) % 24 < 18 else "n"},
+            "dt_txt": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(dt)),
+        })
+    return {"cod": "200", "message": 0, "cnt": cnt, "list": items, "city": city(lat=lat, lon=lon)}
+
+
+def daily_forecast(lat: float = 47.3769, lon: float = 8.5417, *, cnt: int = 7,
+                   start: int | None = None, seed: int = 2) -> dict:
+    """One entry per day, like /weather/forecast/daily."""
+    rng = random.Random(seed)
+    start = start if start is not None else int(time.time()) // 86400 * 86400 + 39600
+    items = []
+    for i in range(cnt):
+        day = round(9 + 5 * rng.random(), 2)
+        items.append({
+            "dt": start + i * 86400,
+            "sunrise": start + i * 86400 - 16000, "sunset": start + i * 86400 + 22000,
+            "temp": {"day": day, "min": round(day - 4, 2), "max": round(day + 3, 2),
+                     "night": round(day - 3, 2), "eve": round(day - 1, 2), "morn": round(day - 2, 2)},
+            "feels_like": {"day": round(day - 1, 2), "night": round(day - 4, 2),
+                           "eve": round(day - 2, 2), "morn": round(day - 3, 2)},
+            "pressure": 1018, "humidity": rng.randrange(40, 95),
+            "weather": _weather(rng),
+            "speed": round(rng.random() * 6, 2), "deg": rng.randrange(360),
+            "gust": round(rng.random() * 12, 2),
+            "clouds": rng.randrange(0, 100), "pop": round(rng.random(), 2),
+        })
+    return {"cod": "200", "message": 0.05, "cnt": cnt, "list": items, "city": city(lat=lat, lon=lon)}
+
+
+def geocode(text: str = "Zurich") -> dict:
+    return {"type": "FeatureCollection", "features": [{
+        "type": "Feature",
+        "properties": {"city": text, "country": "Switzerland", "country_code": "ch",
+                       "lat": 47.3744489, "lon": 8.5410422, "result_type": "city",
+                       "formatted": f"{text}, Switzerland"},
+        "geometry": {"type": "Point", "coordinates": [8.5410422, 47.3744489]},
+    }]}
+
+
+def ip_location(ip: str = "203.0.113.7") -> dict:
+    return {"ip": ip, "type": "IPv4",
+            "location": {"city": "Zurich", "region": {"name": "Zurich"},
+                         "country": {"code": "CH", "name": "Switzerland"},
+                         "latitude": 47.37, "longitude": 8.54}}
+
+
+def rate_limits_me(per_minute: int = 120, per_day: int = 10000) -> dict:
+    return {"user": "bench", "limits": [
+        {"limit": per_minute, "window": "minute", "remaining": per_minute},
+        {"limit": per_day, "window": "day", "remaining": per_day},
+    ]}
+
+
+def rate_limits_apis() -> dict:
+    return {"apis": [
+        {"api": "weather", "limit": 60, "window": "minute"},
+        {"api": "geo", "limit": 30, "window": "minute"},
+    ]}
@@ -0,0 +1,120 @@
+"""
+Local stand-in for a gpsd daemon, for the "gpsd" location provider.
+
+Speaks just enough of gpsd's JSON protocol: a VERSION banner on
+connect, then, once the client sends ?WATCH, one TPV report per
+`interval` seconds around a fixed position.
+
+  delay_ms   before the first TPV (time to fix)
+  no_fix     report mode 1 (no fix) forever
+
+Usage:
+    python -m bench.gpsd_stand_in --port 2947 --lat 47.3769 --lon 8.5417 --delay 400
+
+    with GpsdStandIn(GpsdConfig(delay_ms=200)) as gpsd:
+        GpsdProvider(gpsd.address)
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import socketserver
+import threading
+import time
+from dataclasses import dataclass
+
+
+@dataclass
+class GpsdConfig:
+    lat: float = 47.3769
+    lon: float = 8.5417
+    accuracy_m: float = 8.0
+    delay_ms: float = 0.0
+    interval: float = 1.0
+    no_fix: bool = False
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def _send(self, report: dict):
+        self.wfile.write(json.dumps(report).encode() + b"\n")
+        self.wfile.flush()
+
+    def handle(self):
+        config: GpsdConfig = self.server.config
+        self._send({"class": "VERSION", "release": "3.25", "proto_major": 3, "proto_minor": 15})
+        if not self.rfile.readline().startswith(b"?WATCH"):
+            return
+        self._send({"class": "DEVICES", "devices": [{"path": "/dev/stand-in"}]})
+        time.sleep(config.delay_ms / 1000)
+        try:
+            while not self.server.stopping.is_set():
+                if config.no_fix:
+                    self._send({"class": "TPV", "mode": 1})
+                else:
+                    self._send({"class": "TPV", "mode": 2, "lat": config.lat, "lon": config.lon,
+                                "epx": config.accuracy_m, "epy": config.accuracy_m})
+                time.sleep(config.interval)
+        except OSError:
+            pass   # client went away
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, addr, config: GpsdConfig):
+        super().__init__(addr, _Handler)
+        self.config = config
+        self.stopping = threading.Event()
+
+
+class GpsdStandIn:
+    def __init__(self, config: GpsdConfig | None = None, host: str = "127.0.0.1", port: int = 0):
+        self.server = _Server((host, port), config or GpsdConfig())
+        self._thread: threading.Thread | None = None
+
+    @property
+    def address(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"{host}:{port}"
+
+    def start(self) -> "GpsdStandIn":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.stopping.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "GpsdStandIn":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local gpsd stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2947)
+    parser.add_argument("--lat", type=float, default=GpsdConfig.lat)
+    parser.add_argument("--lon", type=float, default=GpsdConfig.lon)
+    parser.add_argument("--accuracy", type=float, default=GpsdConfig.accuracy_m, help="metres")
+    parser.add_argument("--delay", type=float, default=0.0, help="ms before the first fix")
+    parser.add_argument("--no-fix", action="store_true", help="never report a fix")
+    args = parser.parse_args()
+
+    config = GpsdConfig(args.lat, args.lon, args.accuracy, args.delay, no_fix=args.no_fix)
+    stand_in = GpsdStandIn(config, args.host, args.port)
+    print(f"gpsd stand-in on {stand_in.address}  (Ctrl+C to stop)")
+    try:
+        stand_in.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
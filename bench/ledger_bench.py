@@ -0,0 +1,119 @@
+"""
+Ledger ingestion benchmark: years of overlapping monthly exports.
+
+Run from the project root:
+    python -m bench.ledger_bench [--years 5] [--per-day 40] [--workers 1 2 4 8]
+
+Writes one export per month, each also repeating the previous month's
+last week (as overlapping downloads do), then loads the directory with
+every worker count.  Reports wall time and checks that each run yields
+exactly the single-process ledger, then the memory of the merged rows
+as lists against the columnar Transactions book, and the time of its
+totals and group-bys.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+
+from app.ledger import SEP, Ledger
+from app.transactions import Transactions
+
+HEADER = "Buchung;Valuta;Buchungstext;Belastung;Gutschrift;Saldo\n"
+TEXTS = ("Migros Einkauf", "Coop", "SBB Ticket", "Spotify Abo", "Lohn", "Miete", "Twint", "Apotheke")
+
+
+def write_statements(root: Path, years: int, per_day: int, seed: int = 7) -> int:
+    rng = random.Random(seed)
+    start = date(2025 - years, 1, 1)
+    days: list[list[str]] = []
+    saldo = 1000.0
+    day = start
+    while day < date(2025, 1, 1):
+        lines = []
+        for _ in range(per_day):
+            spent = rng.random() < 0.8
+            value = round(rng.uniform(1, 300), 2)
+            saldo += -value if spent else value
+            stamp = day.strftime("%d.%m.%Y")
+            lines.append(f"{stamp};{stamp};{rng.choice(TEXTS)};{value if spent else ''};"
+                         f"{'' if spent else value};{saldo:.2f}\n")
+        days.append(lines)
+        day += timedelta(days=1)
+
+    files = 0
+    month_start = 0
+    while month_start < len(days):
+        first = start + timedelta(days=month_start)
+        nxt = date(first.year + first.month // 12, first.month % 12 + 1, 1)
+        month_end = min(len(days), (nxt - start).days)
+        overlap = max(0, month_start - 7)
+        body = "".join(line for d in days[overlap:month_end] for line in d)
+        (root / f"statement_{first:%Y_%m}.csv").write_text(HEADER + body, encoding="utf-8")
+        files += 1
+        month_start = month_end
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--per-day", type=int, default=40)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="ledger-bench-"))
+    try:
+        files = write_statements(root, args.years, args.per_day)
+        paths = list(root.glob("*.csv"))
+        size = sum(p.stat().st_size for p in paths)
+        print(f"{files} statements, {size / 1e6:.1f} MB")
+
+        reference = None
+        print(f"  {'workers':<10}{'seconds':>10}{'rows':>12}  match")
+        for workers in args.workers:
+            ledger = Ledger(workers)
+            start = time.perf_counter()
+            result = ledger.load(paths)
+            elapsed = time.perf_counter() - start
+            ledger.close()
+            if reference is None:
+                reference = Ledger(1).load(paths)
+            print(f"  {workers:<10}{elapsed:>10.2f}{len(result[0]):>12}  {result == reference}")
+
+        rows = reference[0]
+        lines = [SEP.join(row) for row in rows]   # rebuilt under tracemalloc, as csv.reader would
+        del rows, reference, result
+        tracemalloc.start()
+        as_lists = [line.split(SEP) for line in lines]
+        list_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        tracemalloc.start()
+        book = Transactions.from_rows(as_lists)
+        book_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"memory: {list_bytes / 1e6:.1f} MB as lists, {book_bytes / 1e6:.1f} MB columnar "
+              f"({list_bytes / book_bytes:.0f}x)")
+
+        for name in ("totals", "by_day", "by_month", "by_merchant"):
+            start = time.perf_counter()
+            getattr(book, name)()
+            first = time.perf_counter() - start
+            book.append(as_lists[-1])
+            start = time.perf_counter()
+            getattr(book, name)()
+            again = time.perf_counter() - start
+            print(f"  {name:<12}{first * 1000:>8.1f} ms, {again * 1000:.2f} ms after one more row")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
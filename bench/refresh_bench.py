@@ -0,0 +1,181 @@
+"""
+End-to-end refresh-cycle benchmark against the local gateway stand-in.
+
+Builds the gateway client and services exactly like app.main (same
+config keys), points them at bench.stand_in, and runs refresh cycles
+through app.refresh.refresh_async.  Reports p50/p99 cycle latency, gateway
+requests per cycle and bytes transferred.
+
+Run from the project root:
+    python -m bench.refresh_bench --cycles 30 --latency 80 --jitter 40
+    python -m bench.refresh_bench --set response_cache=false --error-rate 0.05
+    python -m bench.refresh_bench --sites 50     # multi-location board
+
+--set overrides any key of app.config.DEFAULT_CONFIG (JSON values).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from app.config import Config
+from app.board import WeatherBoard
+from app.main import build_gateway, build_services
+from app.refresh import refresh_async
+from app.paths import PROJECT_ROOT
+from bench.stand_in import StandIn, StandInConfig
+from requirements.gateway import close_shared_sessions
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(1, min(len(ordered), round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[rank - 1]
+
+
+def _parse_overrides(pairs: list[str]) -> dict:
+    out = {}
+    for pair in pairs:
+        key, _, raw = pair.partition("=")
+        try:
+            out[key] = json.loads(raw)
+        except ValueError:
+            out[key] = raw
+    return out
+
+
+def run(args) -> dict:
+    config = Config(None)
+    config.data.update({"use_winrt_location": False})
+    config.data.update(_parse_overrides(args.set))
+    if args.sites:
+        config.data["board_locations"] = [
+            {"name": f"Site {i}", "lat": 45.0 + i * 0.05, "lon": 6.0 + i * 0.07} for i in range(args.sites)
+        ]
+
+    work = Path(tempfile.mkdtemp(prefix="panel-bench-"))
+    bank_dir = work / "bank"
+    bank_dir.mkdir()
+    shutil.copy(PROJECT_ROOT / "example.csv", bank_dir / "example.csv")
+
+    stand_in_config = StandInConfig(
+        latency_ms=args.latency,
+        jitter_ms=args.jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        compress=not args.no_compress,
+    )
+    latencies: list[float] = []
+    per_cycle_requests: list[int] = []
+    per_cycle_bytes: list[int] = []
+    failed_cycles = 0
+
+    with StandIn(stand_in_config) as stand_in:
+        gw = build_gateway(
+            config,
+            cache_dir=work / "http",
+            base_url=stand_in.url, username="bench", password="bench",
+        )
+        bank, location, weather = build_services(config, gw, bank_dir=bank_dir, cache_dir=work)
+        board = WeatherBoard.from_config(config.data, weather, location)
+        loop = asyncio.new_event_loop()
+        try:
+            for _ in range(args.cycles):
+                before = stand_in.stats()
+                start = time.perf_counter()
+                if args.heartbeat:
+                    try:
+                        gw.push_software_heartbeat("python-panel", "ok", {"status": "bench"})
+                    except Exception:
+                        pass
+                errors = loop.run_until_complete(refresh_async(
+                    location, weather, bank,
+                    hourly_rows=int(config.data["max_hourly_forecast"]),
+                    weekly_rows=int(config.data["max_weekly_forecast"]),
+                    bank_rows=max(1, min(int(config.data["bank_rows"]), 50)),
+                    board=board,
+                ))
+                latencies.append(time.perf_counter() - start)
+                after = stand_in.stats()
+                per_cycle_requests.append(after["total_requests"] - before["total_requests"])
+                per_cycle_bytes.append(after["bytes_out"] - before["bytes_out"]
+                                       + after["bytes_in"] - before["bytes_in"])
+                failed_cycles += bool(errors)
+                if args.pause:
+                    time.sleep(args.pause)
+        finally:
+            loop.close()
+            totals = stand_in.stats()
+            close_shared_sessions()
+            shutil.rmtree(work, ignore_errors=True)
+
+    report = {
+        "cycles": args.cycles,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies) * 1000,
+        "requests_per_cycle": sum(per_cycle_requests) / args.cycles,
+        "bytes_per_cycle": sum(per_cycle_bytes) / args.cycles,
+        "failed_cycles": failed_cycles,
+        "logins": totals["logins"],
+        "status": totals["status"],
+        "requests": totals["requests"],
+    }
+    if gw.cache is not None:
+        report["cache"] = gw.cache.stats()
+    if gw.flights is not None:
+        report["single_flight"] = gw.flights.stats()
+    report["traffic"] = gw.traffic_stats()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh-cycle benchmark against the gateway stand-in")
+    parser.add_argument("--cycles", type=int, default=20)
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds between cycles")
+    parser.add_argument("--latency", type=float, default=50.0, help="stand-in latency, ms")
+    parser.add_argument("--jitter", type=float, default=20.0, help="stand-in jitter, ± ms")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--heartbeat", action="store_true", help="push one heartbeat per cycle")
+    parser.add_argument("--no-compress", action="store_true", help="stand-in never gzips responses")
+    parser.add_argument("--sites", type=int, default=0, help="board locations (multi-location mode)")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="override a dashboard config key")
+    parser.add_argument("--json", action="store_true", help="print the raw report")
+    args = parser.parse_args()
+
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"cycles           {report['cycles']}  ({report['failed_cycles']} with errors)")
+    print(f"latency p50      {report['p50_ms']:.1f} ms")
+    print(f"latency p99      {report['p99_ms']:.1f} ms   (max {report['max_ms']:.1f} ms)")
+    print(f"requests/cycle   {report['requests_per_cycle']:.2f}")
+    print(f"bytes/cycle      {report['bytes_per_cycle']:.0f}")
+    print(f"logins           {report['logins']}")
+    print(f"status codes     {report['status']}")
+    for name in ("cache", "single_flight"):
+        if name in report:
+            print(f"{name:<17}{report[name]}")
+
+    traffic = report["traffic"]
+    print(f"\n{'endpoint':<28}{'responses':>10}{'wire B':>10}{'decoded B':>11}{'ratio':>7}")
+    for endpoint, row in [*traffic["endpoints"].items(), ("total", traffic["total"])]:
+        print(f"{endpoint:<28}{row['responses']:>10}{row['wire']:>10}{row['decoded']:>11}{row['ratio']:>7.2f}")
+    print(f"accept-encoding  {traffic['encoding']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+Local stand-in for the API Gateway, for offline end-to-end benchmarks.
+
+Implements the routes the dashboard uses — /auth/login, weather, geo,
+software/hardware heartbeats and rate limits — with fixture payloads
+from bench/fixtures.py, plus fault injection:
+
+  latency / jitter   added to every response (ms)
+  error_rate         fraction of calls answered 502
+  throttle_rate      fraction of calls answered 429 (Retry-After: 1)
+  killed             heartbeats answered 503 — the dashboard's kill switch
+
+GET responses carry an ETag and honour If-None-Match.  Bodies over
+COMPRESS_MIN_BYTES are gzipped when the client accepts it (compress).
+
+Usage:
+    python -m bench.stand_in --port 8080 --latency 80 --jitter 40 --error-rate 0.02
+
+    with StandIn(StandInConfig(latency_ms=50)) as gw:
+        client = GatewayClient(gw.url, "bench", "bench")
+        ...
+        print(gw.stats())
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from bench import fixtures
+
+COMPRESS_MIN_BYTES = 512
+
+
+@dataclass
+class StandInConfig:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    killed: bool = False
+    compress: bool = True
+    seed: int = 7
+
+
+@dataclass
+class _Stats:
+    requests: dict = field(default_factory=dict)    # route → count
+    status: dict = field(default_factory=dict)      # status → count
+    bytes_in: int = 0
+    bytes_out: int = 0
+    logins: int = 0
+
+
+def _route(path: str) -> str:
+    """Collapse path parameters so stats group by endpoint."""
+    parts = path.strip("/").split("/")
+    if parts[0] in ("software", "hardware") and len(parts) >= 2:
+        return "/" + "/".join([parts[0], "{name}"] + parts[2:])
+    return path
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"    # keep-alive, like the real gateway
+    server: "_Server"
+
+    def log_message(self, *args):
+        pass
+
+    # ── plumbing ────────────────────────────────────────────────────
+
+    def _reply(self, status: int, payload=None, headers: dict | None = None):
+        body = b"" if payload is None else json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        headers = dict(headers or {})
+        if (self.server.config.compress and len(body) >= COMPRESS_MIN_BYTES
+                and "gzip" in self.headers.get("Accept-Encoding", "")):
+            body = gzip.compress(body, compresslevel=6, mtime=0)
+            headers["Content-Encoding"] = "gzip"
+            headers["Vary"] = "Accept-Encoding"
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+        with self.server.lock:
+            st = self.server.stats
+            st.status[status] = st.status.get(status, 0) + 1
+            st.bytes_out += len(body)
+
+    def _get_json(self, payload):
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+        if self.headers.get("If-None-Match") == etag:
+            return self._reply(304, headers={"ETag": etag})
+        self._reply(200, payload, {"ETag": etag})
+
+    def _inject(self, route: str) -> bool:
+        """Sleep and maybe fail.  Returns True if a fault was sent."""
+        cfg = self.server.config
+        with self.server.lock:
+            st = self.server.stats
+            st.requests[route] = st.requests.get(route, 0) + 1
+            roll = self.server.rng.random()
+            jitter = self.server.rng.uniform(-cfg.jitter_ms, cfg.jitter_ms)
+        delay = max(0.0, cfg.latency_ms + jitter) / 1000
+        if delay:
+            time.sleep(delay)
+        if route == "/auth/login":
+            return False
+        if roll < cfg.throttle_rate:
+            self._reply(429, {"detail": "rate limited"}, {"Retry-After": "1"})
+            return True
+        if roll < cfg.throttle_rate + cfg.error_rate:
+            self._reply(502, {"detail": "bad gateway"})
+            return True
+        return False
+
+    def _read_body(self) -> dict:
+        n = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(n) if n else b""
+        with self.server.lock:
+            self.server.stats.bytes_in += n
+        return json.loads(raw) if raw else {}
+
+    # ── routes ──────────────────────────────────────────────────────
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        route = _route(url.path)
+        payload = self._read_body()
+        if self._inject(route):
+            return
+
+        if route == "/auth/login":
+            with self.server.lock:
+                self.server.stats.logins += 1
+            return self._reply(200, {"access_token": f"stand-in.{payload.get('username', '')}",
+                                     "token_type": "bearer"})
+        if route.endswith("/heartbeat"):
+            if self.server.config.killed:
+                return self._reply(503, {"detail": "disabled"})
+            return self._reply(200, {"ok": True, "health": payload.get("health")})
+        self._reply(404, {"detail": "not found"})
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        route = _route(url.path)
+        q = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if self._inject(route):
+            return
+
+        lat = float(q.get("lat", 47.3769))
+        lon = float(q.get("lon", 8.5417))
+        if route == "/weather/forecast/hourly":
+            return self._get_json(fixtures.hourly_forecast(lat, lon, start=self.server.epoch))
+        if route == "/weather/forecast/daily":
+            cnt = int(q.get("cnt", 7))
+            return self._get_json(fixtures.daily_forecast(lat, lon, cnt=cnt, start=self.server.epoch))
+        if route == "/weather":
+            return self._get_json(fixtures.hourly_forecast(lat, lon, cnt=1, start=self.server.epoch)["list"][0])
+        if route == "/geo/geocode":
+            return self._get_json(fixtures.geocode(q.get("text", "Zurich")))
+        if route == "/geo/ip":
+            return self._get_json(fixtures.ip_location(q.get("ip", "203.0.113.7")))
+        if route == "/rate-limits/me":
+            return self._get_json(fixtures.rate_limits_me())
+        if route == "/rate-limits/apis":
+            return self._get_json(fixtures.rate_limits_apis())
+        if route in ("/software", "/hardware"):
+            return self._get_json([])
+        self._reply(404, {"detail": "not found"})
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, addr, config: StandInConfig):
+        super().__init__(addr, _Handler)
+        self.config = config
+        self.stats = _Stats()
+        self.lock = threading.Lock()
+        self.rng = random.Random(config.seed)
+        # forecasts start at a fixed slot so ETags stay stable for a run
+        self.epoch = int(time.time()) // 10800 * 10800
+
+
+class StandIn:
+    def __init__(self, config: StandInConfig | None = None, host: str = "127.0.0.1", port: int = 0):
+        self.server = _Server((host, port), config or StandInConfig())
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def config(self) -> StandInConfig:
+        return self.server.config
+
+    def start(self) -> "StandIn":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "StandIn":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self) -> dict:
+        with self.server.lock:
+            st = self.server.stats
+            return {
+                "requests": dict(st.requests),
+                "total_requests": sum(st.requests.values()),
+                "status": dict(st.status),
+                "bytes_in": st.bytes_in,
+                "bytes_out": st.bytes_out,
+                "logins": st.logins,
+            }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local API Gateway stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="ms added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="± ms around --latency")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--killed", action="store_true", help="answer heartbeats with 503")
+    parser.add_argument("--no-compress", action="store_true", help="never gzip responses")
+    args = parser.parse_args()
+
+    config = StandInConfig(args.latency, args.jitter, args.error_rate, args.throttle_rate, args.killed,
+                           compress=not args.no_compress)
+    stand_in = StandIn(config, args.host, args.port)
+    print(f"Gateway stand-in on {stand_in.url}  (Ctrl+C to stop)")
+    try:
+        stand_in.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(stand_in.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Selective decoding of list-shaped gateway responses.
+
+Forecast endpoints return an object whose "list" holds every 3-hour (or
+daily) slot, while the dashboard only shows the first few rows and a
+handful of fields.  ListDecoder walks the body incrementally, decodes
+just the first `limit` list items, plucks the wanted fields into flat
+rows, and skips straight to the trailing keys it still needs ("city")
+without materialising the rest of the list.
+
+When orjson is installed and more than ORJSON_MIN_ROWS rows are wanted,
+its C decoder is used instead — past that point a full decode there is
+cheaper than a partial one in pure Python.  See bench/decode_bench.py.
+
+Usage:
+    decoder = ListDecoder(HOURLY_FIELDS, limit=12)
+    data = gw.get("/weather/forecast/hourly", params=..., decoder=decoder)
+    data["city"]["name"], data["rows"][0]   # [dt, temp, wind, gust, icon, description]
+"""
+
+import json
+import re
+import zlib
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional
+    orjson = None
+
+ORJSON_MIN_ROWS = 8
+
+# every row is [dt, temp, wind, gust, icon, description]
+ROW_FIELDS = ("dt", "temp", "wind", "gust", "icon", "description")
+
+HOURLY_FIELDS: Tuple[Tuple, ...] = (
+    ("dt",),
+    ("main", "temp"),
+    ("wind", "speed"),
+    ("wind", "gust"),
+    ("weather", 0, "icon"),
+    ("weather", 0, "description"),
+)
+
+DAILY_FIELDS: Tuple[Tuple, ...] = (
+    ("dt",),
+    ("temp", "day"),
+    ("speed",),
+    ("gust",),
+    ("weather", 0, "icon"),
+    ("weather", 0, "description"),
+)
+
+_decoder = json.JSONDecoder()
+_scanstring = json.decoder.scanstring
+_WS = re.compile(r"[ \t\n\r]*")
+
+
+def pluck(item: Any, path: Sequence) -> Any:
+    for step in path:
+        try:
+            item = item[step]
+        except (KeyError, IndexError, TypeError):
+            return None
+    return item
+
+
+def rows_from_items(items: List[Any], fields: Sequence[Sequence], limit: int) -> List[list]:
+    return [[pluck(item, path) for path in fields] for item in items[:limit]]
+
+
+def _skip_ws(text: str, idx: int) -> int:
+    return _WS.match(text, idx).end()
+
+
+def _closes_the_object(text: str, idx: int) -> bool:
+    """True if text[idx:] is the rest of the outermost object — more
+    `, "key": value` pairs, then "}" and nothing after it."""
+    try:
+        while True:
+            idx = _skip_ws(text, idx)
+            if text[idx:idx + 1] == "}":
+                return _skip_ws(text, idx + 1) == len(text)
+            if text[idx:idx + 1] != ",":
+                return False
+            idx = _skip_ws(text, idx + 1)
+            if text[idx:idx + 1] != '"':
+                return False
+            _, idx = _scanstring(text, idx + 1)
+            idx = _skip_ws(text, idx)
+            if text[idx:idx + 1] != ":":
+                return False
+            _, idx = _decoder.raw_decode(text, _skip_ws(text, idx + 1))
+    except ValueError:
+        return False
+
+
+def _trailing_value(text: str, name: str, start: int) -> Tuple[bool, Any]:
+    """(found, value) of the top-level key `name` somewhere after `start`.
+
+    Matches are tried last to first; one inside a list item or inside
+    another trailing value is rejected because the outermost object
+    does not close right after it."""
+    marker = f'"{name}"'
+    end = len(text)
+    while True:
+        pos = text.rfind(marker, start, end)
+        if pos < 0:
+            return False, None
+        end = pos
+        colon = _skip_ws(text, pos + len(marker))
+        if text[colon:colon + 1] != ":":
+            continue                       # a string value, not a key
+        try:
+            value, after = _decoder.raw_decode(text, _skip_ws(text, colon + 1))
+        except ValueError:
+            continue
+        if _closes_the_object(text, after):
+            return True, value
+
+
+def decode_list_prefix(
+    text: str,
+    *,
+    list_key: str,
+    limit: int,
+    fields: Sequence[Sequence],
+    keep: Sequence[str] = ("city",),
+) -> Dict[str, Any]:
+    """Decode the top-level keys before `list_key`, the first `limit`
+    items of it, and any `keep` keys that follow it.
+
+    Raises ValueError on malformed JSON, like json.loads."""
+    out: Dict[str, Any] = {}
+    rows: List[list] = []
+
+    idx = _skip_ws(text, 0)
+    if text[idx:idx + 1] != "{":
+        raise ValueError("expected a JSON object")
+    idx += 1
+
+    while True:
+        idx = _skip_ws(text, idx)
+        if text[idx:idx + 1] == "}":
+            break
+        if text[idx:idx + 1] != '"':
+            raise ValueError(f"expected a key at {idx}")
+        key, idx = _scanstring(text, idx + 1)
+        idx = _skip_ws(text, idx)
+        if text[idx:idx + 1] != ":":
+            raise ValueError(f"expected ':' at {idx}")
+        idx = _skip_ws(text, idx + 1)
+
+        if key == list_key:
+            if text[idx:idx + 1] != "[":
+                raise ValueError(f"'{list_key}' is not a list")
+            idx += 1
+            while len(rows) < limit:
+                idx = _skip_ws(text, idx)
+                if text[idx:idx + 1] == "]":
+                    break
+                item, idx = _decoder.raw_decode(text, idx)
+                rows.append([pluck(item, path) for path in fields])
+                idx = _skip_ws(text, idx)
+                if text[idx:idx + 1] == ",":
+                    idx += 1
+
+            # the rest of the list is never decoded; trailing keys are
+            # found from the end by their `"key":` marker instead
+            for name in keep:
+                if name in out:
+                    continue
+                found, value = _trailing_value(text, name, idx)
+                if found:
+                    out[name] = value
+            break
+
+        out[key], idx = _decoder.raw_decode(text, idx)
+        idx = _skip_ws(text, idx)
+        if text[idx:idx + 1] == ",":
+            idx += 1
+
+    out["rows"] = rows
+    return out
+
+
+class ListDecoder:
+    """Callable body → {"city": ..., "rows": [...]} for GatewayClient(decoder=...)."""
+
+    def __init__(
+        self,
+        fields: Sequence[Sequence],
+        *,
+        limit: int,
+        list_key: str = "list",
+        keep: Sequence[str] = ("city",),
+        backend: Optional[str] = None,
+    ):
+        self.fields = fields
+        self.limit = limit
+        self.list_key = list_key
+        self.keep = tuple(keep)
+        if backend is None:
+            backend = "orjson" if orjson is not None and limit > ORJSON_MIN_ROWS else "stream"
+        self.backend = backend
+
+    @property
+    def tag(self) -> str:
+        """Distinguishes decoded results in cache and single-flight keys."""
+        spec = "|".join(".".join(map(str, path)) for path in self.fields)
+        return f"{self.list_key}:{self.limit}:{zlib.crc32(spec.encode('utf-8')):08x}"
+
+    def __call__(self, body: bytes) -> Dict[str, Any]:
+        if self.backend == "orjson":
+            data = orjson.loads(body)
+            out = {k: data[k] for k in self.keep if k in data}
+            out["rows"] = rows_from_items(data.get(self.list_key) or [], self.fields, self.limit)
+            return out
+        if self.backend == "json":
+            data = json.loads(body)
+            out = {k: data[k] for k in self.keep if k in data}
+            out["rows"] = rows_from_items(data.get(self.list_key) or [], self.fields, self.limit)
+            return out
+
+        text = body.decode("utf-8") if isinstance(body, (bytes, bytearray)) else body
+        out = decode_list_prefix(
+            text, list_key=self.list_key, limit=self.limit, fields=self.fields, keep=self.keep,
+        )
+        return {k: out[k] for k in (*self.keep, "rows") if k in out}
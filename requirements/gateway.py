@@ -5,66 +5,163 @@ Handles JWT auth (auto-refresh at 55 min) and exposes every endpoint the
 gateway provides: weather, geo, telephone, nasa, library, email,
 software/hardware heartbeats, rate limits.
 
+All clients talking to the same gateway share one pooled keep-alive
+session, and all clients logged in as the same user share one token, so
+a process performs at most one login per token lifetime.
+
 Usage:
-    from gateway import GatewayClient
+    from gateway import GatewayClient, shared_client
 
     gw = GatewayClient("https://api.novaroma-homelab.uk", "username", "password")
     print(gw.get_weather("Zurich"))
     gw.push_software_heartbeat("my-app", "ok", {"version": "1.0"})
+
+    gw = shared_client()          # process-wide client from requirements/config.py
+    gw.cache = ResponseCache(Path("cache/http"))   # optional on-disk GET cache
+    gw.scheduler = RateLimitScheduler()            # optional client-side pacing
+    agw = AsyncGatewayClient(gw)  # same endpoints as coroutines
+    gw.traffic_stats()            # wire vs decoded bytes per endpoint
+
+    with gw.batch() as batch:     # endpoints return futures, sent together on exit
+        hourly = batch.get_hourly_forecast(lat, lon)
+        daily = batch.get_daily_forecast(lat, lon)
+    print(hourly.result(), batch.elapsed)
 """
 
+import asyncio
+import threading
+import time
 import requests
-from typing import Optional, Dict, Any
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Tuple
 from datetime import datetime, timedelta
 
+from requirements.decoding import DAILY_FIELDS, HOURLY_FIELDS, ListDecoder
+from requirements.singleflight import SingleFlight, flight_key
+from requirements.traffic import ACCEPT_ENCODING, TrafficStats
+from requirements.resilience import (
+    RETRYABLE_STATUS, BreakerBoard, CircuitOpenError, Deadline, DeadlineExceeded, RetryPolicy,
+)
+
+if TYPE_CHECKING:
+    from requirements.rate_limit import RateLimitScheduler
+    from requirements.response_cache import ResponseCache
+
+DEFAULT_POOL_CONNECTIONS = 4   # hosts kept warm per session
+DEFAULT_POOL_MAXSIZE = 10      # keep-alive connections per host
+MAX_THROTTLED_RETRIES = 3      # 429s absorbed per call when a scheduler paces it
+DEFAULT_TIMEOUT = 10.0         # seconds per attempt
+DEFAULT_DEADLINE = 20.0        # seconds per call, retries included
+
+
+class _AuthContext:
+    """JWT cache shared by every client logged in as the same user."""
+
+    def __init__(self):
+        self.token: Optional[str] = None
+        self.expiry: Optional[datetime] = None
+        self.lock = threading.Lock()
+
+    def valid(self) -> bool:
+        return bool(self.token and self.expiry and datetime.now() < self.expiry)
+
+
+# ── process-wide registry ───────────────────────────────────────────
+
+_registry_lock = threading.Lock()
+_sessions: Dict[str, requests.Session] = {}
+_auth_contexts: Dict[Tuple[str, str], _AuthContext] = {}
+_clients: Dict[Tuple[str, str], "GatewayClient"] = {}
+
+
+def _shared_session(base_url: str, pool_connections: int, pool_maxsize: int) -> requests.Session:
+    """One keep-alive session per gateway URL; created on first use."""
+    with _registry_lock:
+        session = _sessions.get(base_url)
+        if session is None:
+            session = requests.Session()
+            session.headers["Accept-Encoding"] = ACCEPT_ENCODING   # gzip/deflate, br/zstd if decodable
+            adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[base_url] = session
+        return session
+
+
+def _shared_auth(base_url: str, username: str) -> _AuthContext:
+    with _registry_lock:
+        return _auth_contexts.setdefault((base_url, username), _AuthContext())
+
+
+def shared_client(
+    base_url: Optional[str] = None,
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+    *,
+    pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+    pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+) -> "GatewayClient":
+    """Return the process-wide client for (base_url, username).
+
+    Missing credentials are read from requirements/config.py.  Pool sizes
+    only take effect for the first client created for a gateway URL."""
+    if base_url is None:
+        from requirements import config
+        base_url = config.GATEWAY_URL
+        username = config.GATEWAY_USERNAME if username is None else username
+        password = config.GATEWAY_PASSWORD if password is None else password
+
+    key = (base_url.rstrip("/"), username or "")
+    with _registry_lock:
+        client = _clients.get(key)
+    if client is not None:
+        return client
+
+    client = GatewayClient(
+        base_url, username or "", password or "",
+        pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+    )
+    with _registry_lock:
+        return _clients.setdefault(key, client)
+
+
+def close_shared_sessions():
+    """Close every pooled connection and forget the shared clients and
+    logins (e.g. on shutdown).
+
+    Clients created before the call keep the closed session and must not
+    be used afterwards; shared_client() builds new ones, with a new
+    session and a fresh login."""
+    with _registry_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+        _clients.clear()
+        _auth_contexts.clear()
+
+
+def _keyed_params(kwargs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Params identifying a GET for caching/coalescing, decoder included."""
+    params = kwargs.get("params")
+    decoder = kwargs.get("decoder")
+    if decoder is None:
+        return params
+    return {**(params or {}), "_decoder": decoder.tag}
+
+
+class GatewayEndpoints(ABC):
+    """Every gateway endpoint, expressed through get()/post().
 
-class GatewayClient:
-    def __init__(self, base_url: str, username: str, password: str):
-        self.base_url = base_url.rstrip("/")
-        self.username = username
-        self.password = password
-        self._token: Optional[str] = None
-        self._token_expiry: Optional[datetime] = None
-
-    # ── auth ────────────────────────────────────────────────────────
-
-    def _get_token(self) -> str:
-        """Return a cached token or log in for a fresh one."""
-        if self._token and self._token_expiry and datetime.now() < self._token_expiry:
-            return self._token
-
-        r = requests.post(
-            f"{self.base_url}/auth/login",
-            json={"username": self.username, "password": self.password},
-            timeout=10,
-        )
-        r.raise_for_status()
-
-        self._token = r.json()["access_token"]
-        self._token_expiry = datetime.now() + timedelta(minutes=55)  # token lives 60 min
-        return self._token
-
-    # ── generic requests ────────────────────────────────────────────
-
-    def _request(self, method: str, endpoint: str, **kwargs) -> Any:
-        token = self._get_token()
-        headers = kwargs.pop("headers", {})
-        headers["Authorization"] = f"Bearer {token}"
-
-        r = requests.request(
-            method,
-            f"{self.base_url}{endpoint}",
-            headers=headers,
-            **kwargs,
-        )
-        r.raise_for_status()
-        return r.json()
-
-    def get(self, endpoint: str, **kwargs) -> Any:
-        return self._request("GET", endpoint, **kwargs)
-
-    def post(self, endpoint: str, **kwargs) -> Any:
-        return self._request("POST", endpoint, **kwargs)
+    GatewayClient answers with decoded JSON; AsyncGatewayClient answers
+    with awaitables, so the same methods serve both code paths."""
+
+    @abstractmethod
+    def get(self, endpoint: str, **kwargs) -> Any: ...
+
+    @abstractmethod
+    def post(self, endpoint: str, **kwargs) -> Any: ...
 
     # ── weather ─────────────────────────────────────────────────────
 
@@ -77,6 +174,22 @@ class GatewayClient:
     def get_daily_forecast(self, lat: float, lon: float, days: int = 7, units: str = "metric") -> Dict[str, Any]:
         return self.get("/weather/forecast/daily", params={"lat": lat, "lon": lon, "cnt": days, "units": units})
 
+    def get_hourly_forecast_rows(self, lat: float, lon: float, rows: int, units: str = "metric") -> Dict[str, Any]:
+        """{"city": ..., "rows": [[dt, temp, wind, gust, icon, description], ...]} — first `rows` slots only."""
+        return self.get(
+            "/weather/forecast/hourly",
+            params={"lat": lat, "lon": lon, "units": units},
+            decoder=ListDecoder(HOURLY_FIELDS, limit=rows),
+        )
+
+    def get_daily_forecast_rows(self, lat: float, lon: float, days: int = 7, units: str = "metric") -> Dict[str, Any]:
+        """Like get_hourly_forecast_rows, for the daily forecast."""
+        return self.get(
+            "/weather/forecast/daily",
+            params={"lat": lat, "lon": lon, "cnt": days, "units": units},
+            decoder=ListDecoder(DAILY_FIELDS, limit=days),
+        )
+
     # ── geo ─────────────────────────────────────────────────────────
 
     def geocode(self, city: str) -> Dict[str, Any]:
@@ -178,3 +291,358 @@ class GatewayClient:
 
     def get_api_rate_limits(self) -> Dict[str, Any]:
         return self.get("/rate-limits/apis")
+
+
+class GatewayClient(GatewayEndpoints):
+    def __init__(
+        self,
+        base_url: str,
+        username: str,
+        password: str,
+        *,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        cache: Optional["ResponseCache"] = None,
+        scheduler: Optional["RateLimitScheduler"] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.username = username
+        self.password = password
+        self.session = _shared_session(self.base_url, pool_connections, pool_maxsize)
+        self._auth = _shared_auth(self.base_url, username)
+        self.cache = cache            # optional ResponseCache for GETs
+        self.scheduler = scheduler    # optional RateLimitScheduler pacing every call
+
+        self.timeout = DEFAULT_TIMEOUT      # per attempt
+        self.deadline = DEFAULT_DEADLINE    # per call, retries included
+        self.retry = RetryPolicy()
+        self.breakers = BreakerBoard()
+        self.flights: Optional[SingleFlight] = SingleFlight()   # coalesces identical GETs in flight
+        self.batch_workers = pool_maxsize   # threads per batch, one pooled connection each
+        self.traffic = TrafficStats()       # wire vs decoded bytes per endpoint
+
+    # ── auth ────────────────────────────────────────────────────────
+
+    def _get_token(self, stale: Optional[str] = None, deadline: Optional[Deadline] = None) -> str:
+        """Return the shared token or log in for a fresh one.
+
+        `stale` is a token the gateway just rejected; it is dropped unless
+        another thread already replaced it."""
+        auth = self._auth
+        with auth.lock:
+            if stale is not None and auth.token == stale:
+                auth.token = None
+            if auth.valid():
+                return auth.token
+
+            r = self.session.post(
+                f"{self.base_url}/auth/login",
+                json={"username": self.username, "password": self.password},
+                timeout=deadline.clip(10) if deadline else 10,
+            )
+            self.traffic.record("/auth/login", r)
+            r.raise_for_status()
+
+            auth.token = r.json()["access_token"]
+            auth.expiry = datetime.now() + timedelta(minutes=55)  # token lives 60 min
+            return auth.token
+
+    # ── generic requests ────────────────────────────────────────────
+
+    def _pace(self, endpoint: str, deadline: Deadline) -> float:
+        """Wait for the scheduler's go-ahead within the deadline."""
+        try:
+            return self.scheduler.acquire(endpoint, timeout=deadline.remaining())
+        except TimeoutError:
+            raise DeadlineExceeded(f"{endpoint}: deadline exceeded while rate limited")
+
+    def _attempt(self, method: str, endpoint: str, *, paced: bool, deadline: Deadline, **kwargs) -> requests.Response:
+        """One try: auth, pacing, the request itself, 401 and 429 handling."""
+        token = self._get_token(deadline=deadline)
+        headers = dict(kwargs.pop("headers", {}))
+        headers["Authorization"] = f"Bearer {token}"
+        timeout = kwargs.pop("timeout", self.timeout)
+        scheduler = self.scheduler
+
+        for attempt in range(MAX_THROTTLED_RETRIES + 1):
+            if scheduler is not None and not (paced and attempt == 0):
+                self._pace(endpoint, deadline)
+
+            r = self.session.request(
+                method,
+                f"{self.base_url}{endpoint}",
+                headers=headers,
+                timeout=deadline.clip(timeout),
+                **kwargs,
+            )
+            if r.status_code == 401:
+                # token revoked or expired early → one fresh login, one retry
+                token = self._get_token(stale=token, deadline=deadline)
+                headers["Authorization"] = f"Bearer {token}"
+                self.traffic.record(endpoint, r)
+                r = self.session.request(
+                    method,
+                    f"{self.base_url}{endpoint}",
+                    headers=headers,
+                    timeout=deadline.clip(timeout),
+                    **kwargs,
+                )
+            self.traffic.record(endpoint, r)
+
+            if scheduler is None:
+                break
+            scheduler.observe(endpoint, r)
+            if r.status_code != 429:
+                break
+        return r
+
+    def _send(self, method: str, endpoint: str, *, paced: bool = False,
+              deadline: Optional[Deadline] = None, **kwargs) -> requests.Response:
+        """Authenticated request; the caller checks the status.
+
+        The whole call, retries included, is bounded by `deadline`.  GETs
+        are idempotent and retried with jittered backoff on network errors
+        and 5xx; every call is guarded by the endpoint's circuit breaker.
+        With a scheduler attached the request waits for its turn (unless
+        the caller already did: `paced`), and a 429 is retried after the
+        scheduler's backoff instead of surfacing as an error."""
+        deadline = deadline or Deadline(self.deadline)
+        breaker = self.breakers.get(endpoint)
+        if not breaker.allow():
+            raise CircuitOpenError(f"{endpoint}: circuit open, gateway unhealthy")
+
+        attempts = self.retry.attempts if method == "GET" else 1
+        error: Optional[Exception] = None
+        r: Optional[requests.Response] = None
+        try:
+            for attempt in range(1, attempts + 1):
+                try:
+                    r = self._attempt(method, endpoint, paced=paced and attempt == 1,
+                                      deadline=deadline, **kwargs)
+                    error = None
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    r, error = None, e
+                else:
+                    # a 5xx only means "unhealthy" for GETs — a 503 on a
+                    # heartbeat POST is the gateway's kill switch
+                    if method != "GET" or r.status_code not in RETRYABLE_STATUS:
+                        breaker.record_success()
+                        return r
+
+                if attempt == attempts:
+                    break
+                pause = self.retry.backoff(attempt)
+                left = deadline.remaining()
+                if left is not None and left <= pause:
+                    break
+                time.sleep(pause)
+        except BaseException:
+            # a failed login, a missed deadline while pacing, any other
+            # error: count it, so a half-open trial is always released
+            breaker.record_failure()
+            raise
+
+        breaker.record_failure()
+        if error is not None:
+            raise error
+        return r
+
+    def _request(self, method: str, endpoint: str, **kwargs) -> Any:
+        deadline = Deadline(kwargs.pop("deadline", self.deadline))
+        if method == "GET" and self.flights is not None:
+            key = flight_key(method, endpoint, _keyed_params(kwargs))
+            # a follower gives up at its own deadline, not the leader's
+            return self.flights.do(key, lambda: self._dispatch(method, endpoint, deadline=deadline, **kwargs),
+                                   timeout=deadline.remaining())
+        return self._dispatch(method, endpoint, deadline=deadline, **kwargs)
+
+    def _dispatch(self, method: str, endpoint: str, *, deadline: Deadline, **kwargs) -> Any:
+        if method == "GET" and self.cache is not None and self.cache.ttl_for(endpoint) > 0:
+            return self._cached_get(endpoint, deadline=deadline, **kwargs)
+
+        decoder = kwargs.pop("decoder", None)
+        r = self._send(method, endpoint, deadline=deadline, **kwargs)
+        r.raise_for_status()
+        return decoder(r.content) if decoder is not None else r.json()
+
+    def _cached_get(self, endpoint: str, *, deadline: Deadline, **kwargs) -> Any:
+        cache = self.cache
+        params = _keyed_params(kwargs)
+        decoder = kwargs.pop("decoder", None)
+        entry = cache.lookup(endpoint, params)
+        if entry is not None and entry.fresh():
+            cache.hits += 1
+            return entry.body
+
+        paced = False
+        if self.scheduler is not None:
+            paced = True
+            if self._pace(endpoint, deadline) > 0.001:
+                # queued behind other calls — one of them may have fetched this already
+                entry = cache.lookup(endpoint, params)
+                if entry is not None and entry.fresh():
+                    self.scheduler.refund(endpoint)
+                    cache.hits += 1
+                    return entry.body
+
+        if entry is not None:
+            kwargs["headers"] = {**kwargs.get("headers", {}), **entry.validators()}
+
+        r = self._send("GET", endpoint, paced=paced, deadline=deadline, **kwargs)
+        if r.status_code == 304 and entry is not None:
+            cache.revalidated += 1
+            cache.refresh(entry)
+            return entry.body
+
+        r.raise_for_status()
+        body = decoder(r.content) if decoder is not None else r.json()
+        cache.misses += 1
+        cache.store(
+            endpoint, params, body,
+            etag=r.headers.get("ETag"),
+            last_modified=r.headers.get("Last-Modified"),
+        )
+        return body
+
+    def get(self, endpoint: str, **kwargs) -> Any:
+        return self._request("GET", endpoint, **kwargs)
+
+    def post(self, endpoint: str, **kwargs) -> Any:
+        return self._request("POST", endpoint, **kwargs)
+
+    def batch(self, max_workers: Optional[int] = None, stagger: float = 0.0) -> "GatewayBatch":
+        """Queue endpoint calls and send them together; see GatewayBatch."""
+        return GatewayBatch(self, max_workers=max_workers, stagger=stagger)
+
+    # ── health ──────────────────────────────────────────────────────
+
+    def breaker_states(self) -> Dict[str, str]:
+        """Circuit state per endpoint seen so far: closed / open / half_open."""
+        return self.breakers.states()
+
+    def healthy(self) -> bool:
+        return self.breakers.healthy()
+
+    def traffic_stats(self) -> Dict[str, Any]:
+        """Wire and decoded bytes per endpoint; see requirements/traffic.py."""
+        return self.traffic.stats()
+
+
+class AsyncGatewayClient(GatewayEndpoints):
+    """Coroutine twin of GatewayClient.
+
+    Endpoint methods return awaitables:
+
+        agw = AsyncGatewayClient(shared_client())
+        hourly, daily = await asyncio.gather(
+            agw.get_hourly_forecast(lat, lon),
+            agw.get_daily_forecast(lat, lon),
+        )
+
+    Requests run on worker threads over the wrapped client's pooled
+    session, so concurrent calls reuse the same warm connections and
+    the same login.  Identical GETs in flight are coalesced on the loop
+    before they reach a thread."""
+
+    def __init__(self, client: GatewayClient):
+        self.client = client
+
+    async def _request(self, method: str, endpoint: str, **kwargs) -> Any:
+        flights = self.client.flights
+        if method == "GET" and flights is not None:
+            # followers wait on the loop instead of each holding a worker thread
+            key = flight_key(method, endpoint, _keyed_params(kwargs))
+            return await flights.do_async(
+                key, lambda: asyncio.to_thread(self.client._request, method, endpoint, **kwargs),
+                timeout=kwargs.get("deadline", self.client.deadline),
+            )
+        return await asyncio.to_thread(self.client._request, method, endpoint, **kwargs)
+
+    async def get(self, endpoint: str, **kwargs) -> Any:
+        return await self._request("GET", endpoint, **kwargs)
+
+    async def post(self, endpoint: str, **kwargs) -> Any:
+        return await self._request("POST", endpoint, **kwargs)
+
+
+class GatewayBatch(GatewayEndpoints):
+    """Endpoint calls queued as futures and sent concurrently on exit.
+
+        with gw.batch() as batch:
+            hourly = batch.get_hourly_forecast(lat, lon)
+            beat = batch.push_software_heartbeat("my-app", "ok")
+        hourly.result()     # decoded JSON, or raises that call's error
+
+    Calls go through the client's normal path (auth, cache, pacing,
+    retries, single-flight) on at most `max_workers` threads, so they
+    share its pooled connections.  One failing call does not affect the
+    others: its exception is set on its future and listed in `errors`.
+    Calls are started `stagger` seconds apart, so a large batch does not
+    burst at the gateway.  If the with-block itself raises, nothing is
+    sent and every future is cancelled."""
+
+    def __init__(self, client: GatewayClient, *, max_workers: Optional[int] = None, stagger: float = 0.0):
+        self.client = client
+        self.max_workers = max_workers or client.batch_workers
+        self.stagger = max(0.0, stagger)
+        self._calls: List[Tuple[Future, str, str, Dict[str, Any]]] = []
+        self.errors: List[Tuple[str, str, Exception]] = []   # (method, endpoint, error)
+        self.elapsed: Optional[float] = None                 # wall time of the send, seconds
+        self.sent = 0
+
+    def __len__(self) -> int:
+        """Calls queued and not sent yet."""
+        return len(self._calls)
+
+    def _queue(self, method: str, endpoint: str, kwargs: Dict[str, Any]) -> Future:
+        if self.elapsed is not None:
+            raise RuntimeError("batch already sent")
+        future: Future = Future()
+        self._calls.append((future, method, endpoint, kwargs))
+        return future
+
+    def get(self, endpoint: str, **kwargs) -> Future:
+        return self._queue("GET", endpoint, kwargs)
+
+    def post(self, endpoint: str, **kwargs) -> Future:
+        return self._queue("POST", endpoint, kwargs)
+
+    def _run(self, future: Future, method: str, endpoint: str, kwargs: Dict[str, Any]):
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(self.client._request(method, endpoint, **kwargs))
+        except Exception as e:
+            self.errors.append((method, endpoint, e))
+            future.set_exception(e)
+
+    def send(self):
+        """Send every queued call and wait for all of them."""
+        start = time.perf_counter()
+        calls, self._calls = self._calls, []
+        self.sent = len(calls)
+        if len(calls) == 1:
+            self._run(*calls[0])
+        elif calls:
+            with ThreadPoolExecutor(max_workers=min(len(calls), self.max_workers),
+                                    thread_name_prefix="gateway-batch") as pool:
+                for i, call in enumerate(calls):
+                    if i and self.stagger:
+                        time.sleep(self.stagger)
+                    pool.submit(self._run, *call)
+        self.elapsed = time.perf_counter() - start
+
+    def __enter__(self) -> "GatewayBatch":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            for future, *_ in self._calls:
+                future.cancel()
+            self._calls = []
+            return False
+        self.send()
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {"calls": self.sent, "errors": len(self.errors), "elapsed": self.elapsed}
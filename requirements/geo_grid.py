@@ -0,0 +1,75 @@
+"""
+Geohash grid for sharing forecasts between nearby coordinates.
+
+WinRT and IP geolocation drift in the last decimals between refreshes;
+snapping coordinates to the centre of their geohash cell before a
+forecast request makes "the same place" one cache / single-flight key,
+for this dashboard and for any other using the same cache directory.
+
+    precision   cell size (at the equator)
+        5       4.9 km × 4.9 km
+        6       1.2 km × 0.61 km
+        7       153 m  × 153 m
+
+Usage:
+    snap(47.376887, 8.541694, 6)   # → (47.37579, 8.54187)
+    encode(47.376887, 8.541694, 6) # → "u0qjd2"
+"""
+
+from typing import Tuple
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE = {c: i for i, c in enumerate(_BASE32)}
+
+
+def encode(lat: float, lon: float, precision: int) -> str:
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    out = []
+    bits, ch, even = 0, 0, True
+    while len(out) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if lon >= mid:
+                ch, lon_lo = ch << 1 | 1, mid
+            else:
+                ch, lon_hi = ch << 1, mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                ch, lat_lo = ch << 1 | 1, mid
+            else:
+                ch, lat_hi = ch << 1, mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            out.append(_BASE32[ch])
+            bits, ch = 0, 0
+    return "".join(out)
+
+
+def bounds(geohash: str) -> Tuple[float, float, float, float]:
+    """(lat_lo, lat_hi, lon_lo, lon_hi) of a geohash cell."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    even = True
+    for c in geohash:
+        value = _DECODE[c]
+        for shift in range(4, -1, -1):
+            bit = value >> shift & 1
+            if even:
+                mid = (lon_lo + lon_hi) / 2
+                lon_lo, lon_hi = (mid, lon_hi) if bit else (lon_lo, mid)
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                lat_lo, lat_hi = (mid, lat_hi) if bit else (lat_lo, mid)
+            even = not even
+    return lat_lo, lat_hi, lon_lo, lon_hi
+
+
+def snap(lat: float, lon: float, precision: int) -> Tuple[float, float]:
+    """Centre of the cell containing (lat, lon); unchanged when precision <= 0."""
+    if precision <= 0:
+        return lat, lon
+    lat_lo, lat_hi, lon_lo, lon_hi = bounds(encode(lat, lon, precision))
+    return round((lat_lo + lat_hi) / 2, 5), round((lon_lo + lon_hi) / 2, 5)
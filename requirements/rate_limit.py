@@ -0,0 +1,335 @@
+"""
+Client-side rate limiting for the API Gateway.
+
+A token bucket sized from /rate-limits/me (plus one bucket per upstream
+API from /rate-limits/apis) paces every request the client sends.  When
+several callers wait at once the most important one goes first:
+heartbeats, then weather, then geocoding.  Waiting callers are delayed,
+never failed.  A 429 drains the bucket, honours Retry-After and halves
+the rate; successful calls grow it back towards the seeded limit.
+
+Usage:
+    from gateway    import shared_client
+    from rate_limit import RateLimitScheduler
+
+    gw = shared_client()
+    gw.scheduler = RateLimitScheduler()
+    gw.scheduler.seed(gw)          # read the real limits from the gateway
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Optional, Dict, Any, Iterator, Tuple
+
+import requests
+
+DEFAULT_RATE = 2.0      # requests per second until seeded
+DEFAULT_BURST = 10.0
+MIN_RATE = 0.05         # never back off below one request per 20 s
+SHORT_WINDOW = 60.0     # seconds; only windows this short react to a 429
+
+# lower number = served first; longest matching prefix wins
+PRIORITY_HEARTBEAT = 0
+PRIORITY_WEATHER = 1
+PRIORITY_DEFAULT = 2
+PRIORITY_GEO = 3
+
+DEFAULT_PRIORITIES: Dict[str, int] = {
+    "/software": PRIORITY_HEARTBEAT,
+    "/hardware": PRIORITY_HEARTBEAT,
+    "/rate-limits": PRIORITY_HEARTBEAT,
+    "/weather": PRIORITY_WEATHER,
+    "/geo": PRIORITY_GEO,
+}
+
+_WINDOW_SECONDS = {
+    "per_second": 1, "second": 1, "sec": 1, "s": 1,
+    "per_minute": 60, "minute": 60, "min": 60, "m": 60,
+    "per_hour": 3600, "hour": 3600, "h": 3600,
+    "per_day": 86400, "day": 86400, "d": 86400,
+}
+_LIMIT_KEYS = ("limit", "max_requests", "requests", "quota", "max")
+_WINDOW_KEYS = ("window_seconds", "window", "period_seconds", "period", "interval", "per")
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float, remaining: Optional[float] = None):
+        self.rate = rate
+        self.ceiling = rate          # seeded rate; backoff recovers towards it
+        self.capacity = capacity
+        self.tokens = capacity if remaining is None else min(capacity, remaining)
+        self.blocked_until = 0.0
+        self._stamp = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def delay(self, now: float) -> float:
+        """Seconds until one token can be taken (0 = now)."""
+        self._refill(now)
+        wait = max(0.0, self.blocked_until - now)
+        if self.tokens < 1.0:
+            wait = max(wait, (1.0 - self.tokens) / self.rate)
+        return wait
+
+    def take(self, now: float):
+        self._refill(now)
+        self.tokens -= 1.0
+
+    def drain(self, now: float, pause: float):
+        self._refill(now)
+        self.tokens = 0.0
+        self.blocked_until = max(self.blocked_until, now + pause)
+
+    @property
+    def window(self) -> float:
+        return self.capacity / self.ceiling
+
+    def pause(self, now: float, pause: float):
+        self.blocked_until = max(self.blocked_until, now + pause)
+
+    def back_off(self):
+        self.rate = max(min(MIN_RATE, self.ceiling), self.rate / 2)
+
+    def recover(self):
+        self.rate = min(self.ceiling, self.rate + self.ceiling * 0.05)
+
+
+def _parse_window(value: Any) -> Optional[float]:
+    if isinstance(value, (int, float)) and value > 0:
+        return float(value)
+    if isinstance(value, str):
+        return _WINDOW_SECONDS.get(value.strip().lower())
+    return None
+
+
+def _iter_limits(data: Any) -> Iterator[Tuple[float, float, Optional[float]]]:
+    """Yield (rate/s, capacity, remaining) for every limit-like node.
+
+    The gateway reports limits as either {"limit": 60, "window": 60,
+    "remaining": 42}, {"per_minute": 60}, or nested lists/dicts of those."""
+    if isinstance(data, list):
+        for item in data:
+            yield from _iter_limits(item)
+        return
+    if not isinstance(data, dict):
+        return
+
+    remaining = data.get("remaining")
+    remaining = float(remaining) if isinstance(remaining, (int, float)) else None
+
+    limit = next((data[k] for k in _LIMIT_KEYS if isinstance(data.get(k), (int, float))), None)
+    window = next((_parse_window(data[k]) for k in _WINDOW_KEYS if k in data), None)
+    if limit and window:
+        yield float(limit) / window, float(limit), remaining
+
+    for key, seconds in _WINDOW_SECONDS.items():
+        value = data.get(key)
+        if key.startswith("per_") and isinstance(value, (int, float)) and value > 0:
+            yield float(value) / seconds, float(value), remaining
+
+    for value in data.values():
+        if isinstance(value, (dict, list)):
+            yield from _iter_limits(value)
+
+
+def _buckets_from(data: Any) -> list:
+    """One bucket per distinct window (e.g. per-minute and per-day)."""
+    by_capacity: Dict[float, TokenBucket] = {}
+    for rate, capacity, remaining in _iter_limits(data):
+        current = by_capacity.get(capacity)
+        if current is None or rate < current.rate:
+            by_capacity[capacity] = TokenBucket(rate, capacity, remaining)
+    return list(by_capacity.values())
+
+
+class RateLimitScheduler:
+    def __init__(
+        self,
+        *,
+        rate: float = DEFAULT_RATE,
+        burst: float = DEFAULT_BURST,
+        priorities: Optional[Dict[str, int]] = None,
+    ):
+        self.priorities = dict(DEFAULT_PRIORITIES if priorities is None else priorities)
+
+        self._global: list = [TokenBucket(rate, burst)]
+        self._apis: Dict[str, list] = {}
+
+        self._cond = threading.Condition()
+        self._queue: list = []         # heap of (priority, seq)
+        self._seq = itertools.count()
+
+        self.delayed = 0               # calls that had to wait
+        self.throttled = 0             # 429s received
+
+    # ── classification ──────────────────────────────────────────────
+
+    def priority_for(self, endpoint: str) -> int:
+        best, prio = "", PRIORITY_DEFAULT
+        for prefix, p in self.priorities.items():
+            if endpoint.startswith(prefix) and len(prefix) > len(best):
+                best, prio = prefix, p
+        return prio
+
+    @staticmethod
+    def api_for(endpoint: str) -> str:
+        return endpoint.strip("/").split("/", 1)[0]
+
+    def _buckets(self, endpoint: str) -> list:
+        return self._global + self._apis.get(self.api_for(endpoint), [])
+
+    # ── pacing ──────────────────────────────────────────────────────
+
+    def acquire(self, endpoint: str, timeout: Optional[float] = None) -> float:
+        """Block until `endpoint` may be sent.  Returns seconds waited.
+
+        Raises TimeoutError if the go-ahead would come after `timeout`."""
+        start = time.monotonic()
+        give_up = None if timeout is None else start + timeout
+        ticket = (self.priority_for(endpoint), next(self._seq))
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    if self._queue[0] == ticket:
+                        buckets = self._buckets(endpoint)
+                        wait = max(b.delay(now) for b in buckets)
+                        if wait <= 0:
+                            for b in buckets:
+                                b.take(now)
+                            break
+                    else:
+                        wait = None
+                    if give_up is not None:
+                        if (wait or 0.0) >= give_up - now or now >= give_up:
+                            raise TimeoutError(f"{endpoint}: rate limited past the deadline")
+                        wait = give_up - now if wait is None else wait
+                    self._cond.wait(wait)
+            finally:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                self._cond.notify_all()
+
+        waited = time.monotonic() - start
+        if waited > 0.001:
+            self.delayed += 1
+        return waited
+
+    def refund(self, endpoint: str):
+        """Return the token of a call that turned out not to be needed."""
+        with self._cond:
+            for b in self._buckets(endpoint):
+                b.tokens = min(b.capacity, b.tokens + 1.0)
+            self._cond.notify_all()
+
+    def observe(self, endpoint: str, response: requests.Response):
+        """Feed a response back: 429s back off, successes recover."""
+        now = time.monotonic()
+        with self._cond:
+            buckets = self._buckets(endpoint)
+            if response.status_code == 429:
+                self.throttled += 1
+                pause = _retry_after(response)
+                short = [b for b in buckets if b.window <= SHORT_WINDOW] or buckets[:1]
+                if pause is None:
+                    pause = max(1.0 / b.rate for b in short)
+                for b in buckets:
+                    if b in short:
+                        # the burst allowance caused the 429: empty it and slow down
+                        b.drain(now, pause)
+                        b.back_off()
+                    else:
+                        # day/hour quotas keep their tokens, they only wait
+                        b.pause(now, pause)
+            else:
+                for b in buckets:
+                    b.recover()
+
+                remaining = response.headers.get("X-RateLimit-Remaining", "")
+                if remaining.isdigit():
+                    for b in buckets:
+                        b.tokens = min(b.tokens, float(remaining))
+                    if int(remaining) == 0:
+                        pause = _retry_after(response)
+                        for b in buckets:
+                            b.drain(now, pause if pause is not None else 1.0 / b.rate)
+            self._cond.notify_all()
+
+    # ── seeding ─────────────────────────────────────────────────────
+
+    def seed(self, client) -> bool:
+        """Size the buckets from /rate-limits/me and /rate-limits/apis.
+
+        Returns False (and keeps the defaults) if the gateway did not
+        answer with anything usable."""
+        seeded = False
+        try:
+            mine = _buckets_from(client.get_my_rate_limits())
+        except (requests.exceptions.RequestException, ValueError):
+            mine = []
+        if mine:
+            with self._cond:
+                self._global = mine
+            seeded = True
+
+        try:
+            apis = client.get_api_rate_limits()
+        except (requests.exceptions.RequestException, ValueError):
+            apis = None
+        for name, data in _api_entries(apis):
+            buckets = _buckets_from(data)
+            if buckets:
+                with self._cond:
+                    self._apis[name] = buckets
+                seeded = True
+
+        with self._cond:
+            self._cond.notify_all()
+        return seeded
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "limits": [(b.rate, b.ceiling, b.tokens) for b in self._global],
+                "apis": {name: [b.rate for b in bs] for name, bs in self._apis.items()},
+                "queued": len(self._queue),
+                "delayed": self.delayed,
+                "throttled": self.throttled,
+            }
+
+
+def _api_entries(data: Any) -> Iterator[Tuple[str, Any]]:
+    """(api name, limit data) from /rate-limits/apis — dict or list form."""
+    if isinstance(data, dict):
+        items = data.get("apis", data)
+        if isinstance(items, dict):
+            for name, value in items.items():
+                yield str(name).strip("/").split("/", 1)[0], value
+            return
+        data = items
+    if isinstance(data, list):
+        for item in data:
+            if isinstance(item, dict):
+                name = item.get("api") or item.get("name") or item.get("prefix")
+                if name:
+                    yield str(name).strip("/").split("/", 1)[0], item
+
+
+def _retry_after(response: requests.Response) -> Optional[float]:
+    for header in ("Retry-After", "X-RateLimit-Reset"):
+        value = response.headers.get(header)
+        if not value:
+            continue
+        try:
+            seconds = float(value)
+        except ValueError:
+            continue
+        if seconds > 1e9:            # epoch timestamp
+            seconds -= time.time()
+        return max(0.0, seconds)
+    return None
@@ -0,0 +1,145 @@
+"""
+Failure handling for the API Gateway client.
+
+  Deadline        – a hard time budget for one call, retries included
+  RetryPolicy     – jittered exponential backoff for idempotent GETs
+  CircuitBreaker  – per-endpoint; after repeated failures it opens and
+                    calls fail fast until a cool-down has passed, then one
+                    trial call decides whether it closes again
+
+All errors raised here subclass requests' exceptions, so existing
+`except requests.exceptions.RequestException` handlers (e.g. Heartbeat)
+treat them like any other network problem.
+
+Usage:
+    gw = shared_client()
+    gw.get_hourly_forecast(lat, lon)          # bounded by gw.deadline
+    gw.get("/weather", params=..., deadline=5)
+    print(gw.breaker_states())               # {"/weather/forecast/hourly": "open", ...}
+"""
+
+import random
+import threading
+import time
+from typing import Optional, Dict
+
+import requests
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+RETRYABLE_STATUS = (500, 502, 503, 504)
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """The endpoint's breaker is open — the call was not attempted."""
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """The call's time budget ran out (waiting, sending or retrying)."""
+
+
+class Deadline:
+    def __init__(self, seconds: Optional[float]):
+        self.expires = None if seconds is None else time.monotonic() + seconds
+
+    def remaining(self) -> Optional[float]:
+        if self.expires is None:
+            return None
+        return self.expires - time.monotonic()
+
+    def expired(self) -> bool:
+        left = self.remaining()
+        return left is not None and left <= 0
+
+    def clip(self, timeout: Optional[float]) -> Optional[float]:
+        """Shorten a per-attempt timeout so it cannot outlive the deadline."""
+        left = self.remaining()
+        if left is None:
+            return timeout
+        if left <= 0:
+            raise DeadlineExceeded("deadline exceeded")
+        return left if timeout is None else min(timeout, left)
+
+
+class RetryPolicy:
+    def __init__(self, attempts: int = 3, base: float = 0.25, cap: float = 4.0):
+        self.attempts = attempts   # total tries, including the first
+        self.base = base
+        self.cap = cap
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay before retry number `attempt` (1-based)."""
+        return random.uniform(0, min(self.cap, self.base * (2 ** (attempt - 1))))
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = 0.0
+        self._state = CLOSED
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """May a call go out now?  In half-open state only one trial may."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            if self._trial_running:
+                return False
+            self._state = HALF_OPEN
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._state = CLOSED
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self._state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self._state = OPEN
+                self.opened_at = time.monotonic()
+
+
+class BreakerBoard:
+    """One CircuitBreaker per endpoint, created on first use."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, endpoint: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(endpoint)
+            if breaker is None:
+                breaker = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+                self._breakers[endpoint] = breaker
+            return breaker
+
+    def states(self) -> Dict[str, str]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {endpoint: b.state for endpoint, b in breakers.items()}
+
+    def healthy(self) -> bool:
+        return all(state == CLOSED for state in self.states().values())
@@ -0,0 +1,249 @@
+"""
+On-disk cache for gateway GET responses.
+
+Entries are keyed by endpoint + normalized params and live one JSON file
+each in a cache directory, so they survive restarts.  Every endpoint has
+its own TTL, optionally cut at the endpoint's data step (a forecast
+cached at 11:50 expires at the 12:00 slot, not at 12:00 + TTL) so every
+client sharing the directory rolls over together.  Processes may share
+the directory: an entry another one wrote is read from disk on first
+lookup.  A stale entry is kept (not deleted) so the client can
+revalidate it with If-None-Match / If-Modified-Since and reuse the body
+on a 304.  Total size is bounded — least recently used files go first.
+
+Usage:
+    from gateway        import GatewayClient
+    from response_cache import ResponseCache
+
+    gw = GatewayClient(url, username, password,
+                       cache=ResponseCache(Path("cache/http")))
+    gw.get_hourly_forecast(47.37, 8.54)   # network
+    gw.get_hourly_forecast(47.37, 8.54)   # disk
+    print(gw.cache.stats())
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+# seconds; longest matching prefix wins, unknown endpoints are not cached
+DEFAULT_TTLS: Dict[str, float] = {
+    "/geo/geocode": 7 * 24 * 3600,       # a city does not move
+    "/geo/ip": 15 * 60,
+    "/weather/forecast/daily": 60 * 60,
+    "/weather/forecast/hourly": 10 * 60,
+    "/weather": 10 * 60,
+    "/library": 24 * 3600,
+    "/nasa": 6 * 3600,
+}
+
+# seconds; entries expire at the next multiple of the step (UTC epoch)
+DEFAULT_STEPS: Dict[str, float] = {
+    "/weather/forecast/hourly": 3 * 3600,   # 3-hour slots
+    "/weather/forecast/daily": 24 * 3600,
+}
+
+DEFAULT_MAX_BYTES = 20 * 1024 * 1024
+
+
+@dataclass
+class CacheEntry:
+    path: Path
+    stored_at: float
+    ttl: float
+    body: Any
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    step: float = 0.0
+
+    def fresh(self, now: Optional[float] = None) -> bool:
+        now = now or time.time()
+        if now - self.stored_at >= self.ttl:
+            return False
+        # stored in an earlier data step → the data has rolled over
+        return not self.step or now // self.step == self.stored_at // self.step
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating this entry."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttls: Optional[Dict[str, float]] = None,
+        steps: Optional[Dict[str, float]] = None,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.steps = dict(DEFAULT_STEPS if steps is None else steps)
+
+        self.hits = 0            # served from disk without a request
+        self.revalidated = 0     # 304 → served from disk after a request
+        self.misses = 0          # full download
+
+        self._lock = threading.Lock()
+        # file name → (size, last used); mtime doubles as LRU clock on disk
+        self._index: Dict[str, list] = {}
+        for p in self.directory.glob("*.json"):
+            st = p.stat()
+            self._index[p.name] = [st.st_size, st.st_mtime]
+
+    # ── keys / ttl ──────────────────────────────────────────────────
+
+    @staticmethod
+    def _match(table: Dict[str, float], endpoint: str) -> float:
+        best = ""
+        for prefix in table:
+            if endpoint.startswith(prefix) and len(prefix) > len(best):
+                best = prefix
+        return table.get(best, 0.0) if best else 0.0
+
+    def ttl_for(self, endpoint: str) -> float:
+        return self._match(self.ttls, endpoint)
+
+    def step_for(self, endpoint: str) -> float:
+        return self._match(self.steps, endpoint)
+
+    @staticmethod
+    def key(endpoint: str, params: Optional[Dict[str, Any]]) -> str:
+        norm = sorted((str(k), str(v)) for k, v in (params or {}).items() if v is not None)
+        raw = json.dumps([endpoint, norm], separators=(",", ":"))
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest() + ".json"
+
+    # ── read / write ────────────────────────────────────────────────
+
+    def lookup(self, endpoint: str, params: Optional[Dict[str, Any]]) -> Optional[CacheEntry]:
+        """Return the stored entry (fresh or stale), or None."""
+        ttl = self.ttl_for(endpoint)
+        if ttl <= 0:
+            return None
+
+        name = self.key(endpoint, params)
+        path = self.directory / name
+        with self._lock:
+            # not in the index: another process sharing the directory may
+            # have written it, so the file decides
+            try:
+                data = path.read_bytes()
+                raw = json.loads(data)
+            except FileNotFoundError:
+                self._index.pop(name, None)
+                return None
+            except (OSError, ValueError):
+                self._drop(name)
+                return None
+            self._index.setdefault(name, [len(data), 0.0])
+            self._use(name)
+
+        return CacheEntry(
+            path=path,
+            stored_at=raw["stored_at"],
+            ttl=ttl,
+            body=raw["body"],
+            etag=raw.get("etag"),
+            last_modified=raw.get("last_modified"),
+            step=self.step_for(endpoint),
+        )
+
+    def store(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        body: Any,
+        *,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ):
+        if self.ttl_for(endpoint) <= 0:
+            return
+        name = self.key(endpoint, params)
+        self._write(name, {
+            "stored_at": time.time(),
+            "etag": etag,
+            "last_modified": last_modified,
+            "body": body,
+        })
+
+    def refresh(self, entry: CacheEntry):
+        """The gateway answered 304 — restart the entry's TTL."""
+        entry.stored_at = time.time()
+        self._write(entry.path.name, {
+            "stored_at": entry.stored_at,
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+            "body": entry.body,
+        })
+
+    def clear(self):
+        with self._lock:
+            for name in list(self._index):
+                self._drop(name)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = sum(s for s, _ in self._index.values())
+            entries = len(self._index)
+        lookups = self.hits + self.revalidated + self.misses
+        return {
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "hit_ratio": (self.hits + self.revalidated) / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": size,
+        }
+
+    # ── internals ───────────────────────────────────────────────────
+
+    def _write(self, name: str, payload: Dict[str, Any]):
+        data = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        path = self.directory / name
+        # one temp file per writer: processes sharing the directory may
+        # store the same key at once
+        tmp = path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with self._lock:
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+            self._index[name] = [len(data), time.time()]
+            self._evict()
+
+    def _use(self, name: str):
+        now = time.time()
+        self._index[name][1] = now
+        try:
+            os.utime(self.directory / name, (now, now))
+        except OSError:
+            pass
+
+    def _drop(self, name: str):
+        self._index.pop(name, None)
+        try:
+            (self.directory / name).unlink()
+        except OSError:
+            pass
+
+    def _evict(self):
+        total = sum(s for s, _ in self._index.values())
+        if total <= self.max_bytes:
+            return
+        for name, (size, _) in sorted(self._index.items(), key=lambda kv: kv[1][1]):
+            self._drop(name)
+            total -= size
+            if total <= self.max_bytes:
+                break
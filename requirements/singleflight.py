@@ -0,0 +1,120 @@
+"""
+Single-flight coalescing for identical in-flight gateway calls.
+
+While a call for a key is running, every other caller asking for the
+same key waits for it and receives the same result — or the same
+exception — instead of sending a duplicate request.  Works for threads
+(do) and coroutines (do_async); `saved` counts the requests avoided.
+A follower waits at most its own `timeout` (the caller's deadline),
+then raises DeadlineExceeded; the leader's call is not affected.
+An async leader is expected to end up in do() (GatewayClient._request
+on a worker thread), so threaded and async callers coalesce with each
+other and every call is counted once.
+
+Results are shared objects: callers must not mutate them.
+
+Usage:
+    flights = SingleFlight()
+    key = flight_key("GET", "/geo/geocode", {"text": "Zurich"})
+    data = flights.do(key, lambda: fetch("Zurich"), timeout=20.0)
+
+    GatewayClient does this for every GET; see gw.flights.stats().
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from requirements.resilience import DeadlineExceeded
+
+
+def flight_key(method: str, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Tuple:
+    norm = tuple(sorted((str(k), str(v)) for k, v in (params or {}).items() if v is not None))
+    return method.upper(), endpoint, norm
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._async_calls: Dict[Tuple[int, Hashable], asyncio.Future] = {}
+
+        self.calls = 0      # every do()/do_async()
+        self.saved = 0      # of those, answered by someone else's request
+
+    def do(self, key: Hashable, fn: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.saved += 1
+
+        if not leader:
+            if not call.done.wait(None if timeout is None else max(0.0, timeout)):
+                raise DeadlineExceeded(f"deadline exceeded waiting for an identical call in flight: {key!r}")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]],
+                       timeout: Optional[float] = None) -> Any:
+        loop = asyncio.get_running_loop()
+        slot = (id(loop), key)
+        with self._lock:
+            future = self._async_calls.get(slot)
+            leader = future is None
+            if leader:
+                future = self._async_calls[slot] = loop.create_future()
+            else:
+                self.calls += 1
+                self.saved += 1
+
+        if not leader:
+            # shield: a cancelled or timed-out follower must not cancel the leader's call
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), timeout)
+            except asyncio.TimeoutError:
+                raise DeadlineExceeded(f"deadline exceeded waiting for an identical call in flight: {key!r}") from None
+
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()    # mark retrieved when nobody else waits
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._async_calls[slot]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"calls": self.calls, "saved": self.saved, "in_flight": len(self._calls) + len(self._async_calls)}
@@ -0,0 +1,88 @@
+"""
+Compressed transfer negotiation and per-endpoint byte accounting.
+
+ACCEPT_ENCODING lists every content coding the installed urllib3 can
+decode: always gzip and deflate, plus br when brotli (or brotlicffi)
+is installed and zstd when zstandard is.  GatewayClient sends it on
+its shared session, so the gateway may compress any response.
+
+TrafficStats records, per endpoint, how many bytes came over the wire
+(compressed, headers excluded) and how many the decoder saw after
+decompression, plus request body bytes sent.
+
+Usage:
+    gw.traffic.stats()
+    # {"endpoints": {"/weather/forecast/hourly": {"responses": 3,
+    #   "wire": 9120, "decoded": 41712, "sent": 0, "ratio": 0.219}, ...},
+    #  "total": {...}, "encoding": "gzip, deflate, br"}
+"""
+
+import threading
+from typing import Any, Dict
+
+import requests
+from urllib3.util import make_headers
+
+ACCEPT_ENCODING = make_headers(accept_encoding=True)["accept-encoding"]
+
+
+def wire_bytes(r: requests.Response) -> int:
+    """Body bytes as transferred — before urllib3 decompressed them."""
+    raw = getattr(r, "raw", None)
+    tell = getattr(raw, "tell", None)
+    if tell is not None:
+        try:
+            return int(tell())
+        except (TypeError, ValueError, OSError):
+            pass
+    length = r.headers.get("Content-Length")
+    return int(length) if length and length.isdigit() else len(r.content)
+
+
+def _sent_bytes(r: requests.Response) -> int:
+    body = getattr(r.request, "body", None)
+    if body is None:
+        return 0
+    return len(body.encode("utf-8") if isinstance(body, str) else body)
+
+
+def _ratio(row: Dict[str, int]) -> float:
+    return round(row["wire"] / row["decoded"], 3) if row["decoded"] else 1.0
+
+
+class TrafficStats:
+    """Thread-safe byte counters keyed by endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows: Dict[str, Dict[str, int]] = {}
+
+    def record(self, endpoint: str, r: requests.Response):
+        wire = wire_bytes(r)
+        decoded = len(r.content)
+        sent = _sent_bytes(r)
+        with self._lock:
+            row = self._rows.get(endpoint)
+            if row is None:
+                row = self._rows[endpoint] = {"responses": 0, "wire": 0, "decoded": 0, "sent": 0}
+            row["responses"] += 1
+            row["wire"] += wire
+            row["decoded"] += decoded
+            row["sent"] += sent
+
+    def reset(self):
+        with self._lock:
+            self._rows.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-endpoint totals, heaviest (by wire bytes) first."""
+        with self._lock:
+            rows = {k: dict(v) for k, v in self._rows.items()}
+        total = {"responses": 0, "wire": 0, "decoded": 0, "sent": 0}
+        for row in rows.values():
+            for k in total:
+                total[k] += row[k]
+            row["ratio"] = _ratio(row)
+        total["ratio"] = _ratio(total)
+        ordered = dict(sorted(rows.items(), key=lambda kv: kv[1]["wire"], reverse=True))
+        return {"endpoints": ordered, "total": total, "encoding": ACCEPT_ENCODING}
@@ -0,0 +1,77 @@
+import csv
+import io
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.bank_format import NATIVE_COLUMNS, SNIFF_BYTES, BankFormat, sniff_file
+
+NATIVE = ("Buchung;Valuta;Buchungstext;Belastung;Gutschrift;Saldo\n"
+          "01.03.2024;01.03.2024;Coop;10.00;;1'990.00\n"
+          "02.03.2024;02.03.2024;Lohn;;5'000.00;6'990.00\n")
+
+
+class SniffFileTest(unittest.TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp(prefix="bank-format-test-"))
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+
+    def write(self, data: bytes) -> Path:
+        path = self.root / "export.csv"
+        path.write_bytes(data)
+        return path
+
+    def rows(self, path: Path, fmt: BankFormat) -> list[list[str]]:
+        text = path.read_bytes().decode(fmt.encoding)
+        rows = list(csv.reader(io.StringIO(text), delimiter=fmt.delimiter))
+        normalize = fmt.normalizer()
+        return [normalize(row) for row in rows[fmt.header:]]
+
+    def test_native_export_passes_through(self):
+        path = self.write(NATIVE.encode("utf-8"))
+        fmt = sniff_file(path)
+        self.assertEqual(fmt, BankFormat(thousands="'"))
+        self.assertTrue(fmt.native)
+        self.assertEqual(self.rows(path, fmt)[1], ["02.03.2024", "02.03.2024", "Lohn", "", "5'000.00", "6'990.00"])
+
+    def test_english_export_with_bom_and_a_signed_amount(self):
+        path = self.write(("\ufeffDate,Description,Amount,Balance\n"
+                           '2024-03-15,Coop,"-1,234.50","8,765.50"\n'
+                           "2024-03-16,Salary,5000.00,13765.50\n").encode("utf-8"))
+        fmt = sniff_file(path)
+        self.assertEqual((fmt.encoding, fmt.delimiter, fmt.header), ("utf-8-sig", ",", True))
+        self.assertEqual(fmt.columns, (("date", 0), ("text", 1), ("amount", 2), ("balance", 3)))
+        self.assertEqual((fmt.date_format, fmt.decimal, fmt.thousands), ("%Y-%m-%d", ".", ","))
+        self.assertEqual(self.rows(path, fmt), [
+            ["15.03.2024", "", "Coop", "1234.50", "", "8765.50"],
+            ["16.03.2024", "", "Salary", "", "5000.00", "13765.50"],
+        ])
+
+    def test_german_windows_export(self):
+        path = self.write(("Buchungstag\tVerwendungszweck\tSoll\tHaben\tKontostand\n"
+                           "15.03.24\tBäckerei Müller\t1.234,50\t\t8.765,50\n"
+                           "16.03.24\tGehalt\t\t5.000,00\t13.765,50\n").encode("cp1252"))
+        fmt = sniff_file(path)
+        self.assertEqual((fmt.encoding, fmt.delimiter), ("cp1252", "\t"))
+        self.assertEqual((fmt.date_format, fmt.decimal, fmt.thousands), ("%d.%m.%y", ",", "."))
+        self.assertEqual(self.rows(path, fmt)[0], ["15.03.2024", "", "Bäckerei Müller", "1234.50", "", "8765.50"])
+
+    def test_no_header_falls_back_to_the_native_columns(self):
+        fmt = sniff_file(self.write(NATIVE.split("\n", 1)[1].encode("utf-8")))
+        self.assertFalse(fmt.header)
+        self.assertEqual(fmt.columns, NATIVE_COLUMNS)
+
+    def test_empty_file(self):
+        self.assertEqual(sniff_file(self.write(b"")), BankFormat())
+
+    def test_reads_only_the_first_sniff_bytes(self):
+        line = "01.03.2024;01.03.2024;Coop;10.00;;990.00\n"
+        body = NATIVE + line * (2 * SNIFF_BYTES // len(line))
+        # past the sample: a different date format and a cp1252 byte that is not UTF-8
+        path = self.write(body.encode("utf-8") + "2024-03-02;x;Café;1,00;;2,00\n".encode("cp1252"))
+        self.assertEqual(sniff_file(path), BankFormat(thousands="'"))
+
+
+if __name__ == "__main__":
+    unittest.main()
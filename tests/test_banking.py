@@ -0,0 +1,77 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.banking import Banking
+
+HEADER = "Buchung;Valuta;Buchungstext;Belastung;Gutschrift;Saldo\n"
+
+
+class NewestCsvTest(unittest.TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp(prefix="banking-test-"))
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+
+    def write(self, name: str, text: str, mtime: int):
+        path = self.root / name
+        with path.open("a", encoding="utf-8") as f:
+            f.write(text)
+        os.utime(path, ns=(mtime, mtime))
+
+    def test_follows_an_older_file_that_grows(self):
+        self.write("a.csv", HEADER + "01.03.2024;01.03.2024;Coop;10.00;;990.00\n", 1_000_000_000)
+        bank = Banking(self.root)
+        bank.update(20)
+        self.write("b.csv", HEADER + "02.03.2024;02.03.2024;Migros;20.00;;970.00\n", 2_000_000_000)
+        bank.update(20)
+        self.assertEqual(bank.total_spent, 20.0)
+
+        # no file comes or goes, so the directory mtime stays put
+        dir_mtime = self.root.stat().st_mtime_ns
+        self.write("a.csv", "03.03.2024;03.03.2024;Denner;5.00;;985.00\n", 3_000_000_000)
+        os.utime(self.root, ns=(dir_mtime, dir_mtime))
+        bank.update(20)
+        self.assertEqual(bank.total_spent, 15.0)
+        self.assertEqual(bank.transactions[-1][2], "Denner")
+
+
+class UnterminatedLineTest(unittest.TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp(prefix="banking-test-"))
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        self.path = self.root / "a.csv"
+        rows = "".join(f"01.03.2024;01.03.2024;Coop;{i}.00;;1.00\n" for i in range(1, 1001))
+        self.path.write_text(HEADER + rows.rstrip("\n"), encoding="utf-8")
+
+    def test_unchanged_file_keeps_the_same_history(self):
+        bank = Banking(self.root)
+        bank.update(20)
+        history = bank.history
+        bank.update(20)
+        self.assertEqual(bank.rows_parsed, 0)
+        self.assertIs(bank.history, history)
+        self.assertEqual(bank.total_spent, 500500.0)
+
+    def test_append_extends_the_book_in_place(self):
+        bank = Banking(self.root)
+        bank.update(20)
+        history = bank.history
+        history.by_month()
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write("5\n02.03.2024;02.03.2024;Migros;1.00;;0.00\n")
+        bank.update(20)
+        self.assertIs(bank.history, history)
+        self.assertEqual(bank.rows_parsed, 2)
+        self.assertEqual(bank.total_spent, 500501.0)
+        self.assertEqual(bank.transactions[-2][5], "1.005")
+        fresh = Banking(self.root)
+        fresh.update(20)
+        self.assertEqual(bank.history, fresh.history)
+        self.assertEqual(bank.history.by_month(), fresh.history.by_month())
+        self.assertEqual(bank.transactions, fresh.transactions)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import json
+import unittest
+
+from requirements.decoding import HOURLY_FIELDS, ListDecoder, decode_list_prefix
+
+CITY = {"id": 2657896, "name": "Zurich", "country": "CH", "timezone": 7200}
+
+
+def item(i: int, **extra) -> dict:
+    return {"dt": 1_700_000_000 + i * 10800, "main": {"temp": 10.0 + i}, "wind": {"speed": 3.0, "gust": 5.5},
+            "weather": [{"icon": "10d", "description": f"rain {i}"}], **extra}
+
+
+def body(*pairs) -> str:
+    return json.dumps(dict(pairs))
+
+
+def decode(text: str, limit: int = 2) -> dict:
+    return decode_list_prefix(text, list_key="list", limit=limit, fields=HOURLY_FIELDS)
+
+
+class DecodeListPrefixTest(unittest.TestCase):
+    def test_matches_a_full_decode(self):
+        text = body(("cod", "200"), ("cnt", 40), ("list", [item(i) for i in range(40)]), ("city", CITY))
+        full = ListDecoder(HOURLY_FIELDS, limit=3, backend="json")(text.encode())
+        self.assertEqual(decode(text, limit=3), {"cod": "200", "cnt": 40, **full})
+        self.assertEqual(decode(text, limit=3)["rows"][2], [1_700_021_600, 12.0, 3.0, 5.5, "10d", "rain 2"])
+
+    def test_city_before_the_list(self):
+        text = body(("city", CITY), ("list", [item(i) for i in range(5)]))
+        self.assertEqual(decode(text)["city"], CITY)
+
+    def test_items_past_the_limit_with_a_city_key(self):
+        items = [item(i, city={"name": f"decoy {i}"}) for i in range(5)]
+        self.assertEqual(decode(body(("list", items), ("city", CITY)))["city"], CITY)
+        self.assertNotIn("city", decode(body(("list", items))))
+
+    def test_city_string_inside_the_trailing_keys(self):
+        city = {**CITY, "type": "city"}
+        text = body(("list", [item(i) for i in range(5)]), ("city", city), ("kind", "city"))
+        self.assertEqual(decode(text)["city"], city)
+
+    def test_city_key_nested_in_the_trailing_city(self):
+        city = {"city": "Zurich", "country": "CH"}
+        self.assertEqual(decode(body(("list", [item(0)]), ("city", city)))["city"], city)
+
+    def test_short_list(self):
+        out = decode(body(("list", [item(0)]), ("city", CITY)), limit=5)
+        self.assertEqual(len(out["rows"]), 1)
+        self.assertEqual(out["city"], CITY)
+
+    def test_malformed(self):
+        for text in ("[]", '{"list": {}}', '{"list" [1]}', '{"list": [1,'):
+            with self.subTest(text=text), self.assertRaises(ValueError):
+                decode(text)
+
+
+if __name__ == "__main__":
+    unittest.main()
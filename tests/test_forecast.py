@@ -0,0 +1,50 @@
+import unittest
+from array import array
+
+from app.forecast import DAY, Forecast, daily_from_hourly
+
+MIDNIGHT = 1_700_006_400   # 2023-11-15 00:00 UTC
+STEP = 10800
+
+
+def hourly(start: int, rows: int, offset: int = 0) -> Forecast:
+    return Forecast(
+        city="Zurich", country="CH", offset=offset, time_format="%H:%M",
+        dt=array("q", [start + i * STEP for i in range(rows)]),
+        temp=array("d", [float(i) for i in range(rows)]),
+        wind=array("d", [float(i % 5) for i in range(rows)]),
+        gust=array("d", [float(i % 7) for i in range(rows)]),
+        icon=tuple("01n" if i % 8 < 2 else "10d" if i % 3 else "02d" for i in range(rows)),
+        description=tuple(f"row {i}" for i in range(rows)),
+    )
+
+
+class DailyFromHourlyTest(unittest.TestCase):
+    def test_one_row_per_local_day(self):
+        # today from 15:00 (3 slots), two whole days, a 2-slot trailing day
+        daily = daily_from_hourly(hourly(MIDNIGHT + 15 * 3600, 3 + 16 + 2), time_format="%d/%m")
+        self.assertEqual(len(daily), 3)
+        self.assertEqual(list(daily.dt), [MIDNIGHT + k * DAY + DAY // 2 for k in range(3)])
+        self.assertEqual(list(daily.temp_min), [0.0, 3.0, 11.0])
+        self.assertEqual(list(daily.temp_max), [2.0, 10.0, 18.0])
+        self.assertEqual(daily.temp[1], sum(range(3, 11)) / 8)
+        self.assertEqual(daily.gust[1], 6.0)
+        self.assertIsNone(daily.offset)
+
+    def test_days_follow_the_city_offset(self):
+        # at UTC+3 the series starts at local midnight
+        daily = daily_from_hourly(hourly(MIDNIGHT - 3 * 3600, 16, offset=3 * 3600), time_format="%d/%m")
+        self.assertEqual(len(daily), 2)
+        self.assertEqual(list(daily.temp_min), [0.0, 8.0])
+
+    def test_dominant_daytime_icon_and_its_description(self):
+        daily = daily_from_hourly(hourly(MIDNIGHT, 8), time_format="%d/%m")
+        self.assertEqual(daily.icon, ("10d",))
+        self.assertEqual(daily.description, ("row 2",))
+
+    def test_empty_series(self):
+        self.assertEqual(len(daily_from_hourly(hourly(MIDNIGHT, 0), time_format="%d/%m")), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import time
+import unittest
+
+import requests
+
+from requirements.gateway import GatewayClient, close_shared_sessions, shared_client
+from requirements.resilience import OPEN
+
+
+class HalfOpenTrialTest(unittest.TestCase):
+    def setUp(self):
+        self.client = GatewayClient("http://gateway.invalid", "user", "secret")
+        self.breaker = self.client.breakers.get("/weather")
+        self.breaker._state = OPEN
+        self.breaker.opened_at = time.monotonic() - self.breaker.reset_timeout
+
+    def test_failed_login_releases_the_trial(self):
+        def refused(*args, **kwargs):
+            raise requests.HTTPError("401 Client Error: login refused")
+
+        self.client._get_token = refused
+        with self.assertRaises(requests.HTTPError):
+            self.client.get("/weather", params={"city": "Zurich"})
+
+        self.assertFalse(self.breaker._trial_running)
+        self.assertEqual(self.breaker.state, OPEN)
+        # once the reset timeout passes again, the next call gets its trial
+        # instead of CircuitOpenError
+        self.breaker.opened_at = time.monotonic() - self.breaker.reset_timeout
+        with self.assertRaises(requests.HTTPError):
+            self.client.get("/weather", params={"city": "Zurich"})
+
+
+class SharedClientTest(unittest.TestCase):
+    def tearDown(self):
+        close_shared_sessions()
+
+    def test_one_client_session_and_login_per_user(self):
+        gw = shared_client("http://gateway.invalid/", "user", "secret")
+        self.assertIs(shared_client("http://gateway.invalid", "user", "secret"), gw)
+        other = GatewayClient("http://gateway.invalid", "user", "secret")
+        self.assertIs(other.session, gw.session)
+        self.assertIs(other._auth, gw._auth)
+
+    def test_close_forgets_sessions_and_logins(self):
+        gw = shared_client("http://gateway.invalid", "user", "secret")
+        gw._auth.token = "old"
+        close_shared_sessions()
+        fresh = shared_client("http://gateway.invalid", "user", "secret")
+        self.assertIsNot(fresh, gw)
+        self.assertIsNot(fresh.session, gw.session)
+        self.assertIsNot(fresh._auth, gw._auth)
+        self.assertIsNone(fresh._auth.token)
+
+
+if __name__ == "__main__":
+    unittest.main()
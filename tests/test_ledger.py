@@ -0,0 +1,74 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from app.banking import Banking
+from app.ledger import Ledger
+
+HEADER = "Buchung;Valuta;Buchungstext;Belastung;Gutschrift;Saldo\n"
+
+
+class UnchangedLedgerTest(unittest.TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp(prefix="ledger-test-"))
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+
+    def write(self, name: str, text: str, mtime: int):
+        path = self.root / name
+        path.write_text(HEADER + text, encoding="utf-8")
+        os.utime(path, ns=(mtime, mtime))
+
+    def test_keeps_the_book_until_a_file_changes(self):
+        self.write("a.csv", "01.03.2024;01.03.2024;Coop;10.00;;990.00\n", 1_000_000_000)
+        bank = Banking(self.root, Ledger(workers=1))
+        bank.update(20)
+        book = bank.history
+        months = book.by_month()
+
+        bank.update(20)
+        self.assertEqual(bank.ledger.files_parsed, 0)
+        self.assertIs(bank.history, book)
+        self.assertEqual(book._groups["month"][0], len(book))
+        self.assertEqual(bank.history.by_month(), months)
+
+        self.write("b.csv", "02.03.2024;02.03.2024;Migros;20.00;;970.00\n", 2_000_000_000)
+        bank.update(20)
+        self.assertIsNot(bank.history, book)
+        self.assertEqual(bank.total_spent, 30.0)
+
+
+class WorkerPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp(prefix="ledger-test-"))
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+
+    def write(self, name: str, day: int):
+        rows = "".join(f"{day:02d}.03.2024;{day:02d}.03.2024;Shop {i};{i}.00;;{1000 - i}.00\n" for i in range(50))
+        (self.root / name).write_text(HEADER + rows, encoding="utf-8")
+
+    @mock.patch("app.ledger.PARALLEL_MIN_BYTES", 0)
+    def test_one_spawned_pool_serves_every_load(self):
+        ledger = Ledger(workers=2)
+        self.addCleanup(ledger.close)
+        self.write("a.csv", 1)
+        self.write("b.csv", 2)
+        rows, _ = ledger.load(list(self.root.glob("*.csv")))
+        pool = ledger._pool
+        self.assertIsNotNone(pool)
+        self.assertEqual(pool._mp_context.get_start_method(), "spawn")
+
+        self.write("c.csv", 3)
+        self.write("d.csv", 4)
+        rows, _ = ledger.load(list(self.root.glob("*.csv")))
+        self.assertIs(ledger._pool, pool)
+        self.assertEqual(rows, Ledger(workers=1).load(list(self.root.glob("*.csv")))[0])
+
+        ledger.close()
+        self.assertIsNone(ledger._pool)
+
+
+if __name__ == "__main__":
+    unittest.main()
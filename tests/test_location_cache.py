@@ -0,0 +1,46 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from app.location_cache import MAX_IP_TTL, LocationCache
+
+NOW = 1_700_000_000.0
+
+
+@mock.patch("app.location_cache.network_id", return_value="192.168.1.20")
+class IpCityTest(unittest.TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp(prefix="location-cache-test-"))
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+
+    def cache(self, ip_ttl: float) -> LocationCache:
+        return LocationCache(self.root / "location.json", ip_ttl=ip_ttl)
+
+    def test_expires_after_the_ttl_on_the_same_network(self, _):
+        cache = self.cache(3600)
+        cache.put_ip_city("Zurich", ip="203.0.113.7", now=NOW)
+        self.assertEqual(cache.ip_city(now=NOW + 3599), "Zurich")
+        self.assertIsNone(cache.ip_city(now=NOW + 3600))
+
+    def test_ttl_is_capped(self, _):
+        cache = self.cache(30 * 24 * 3600)
+        self.assertEqual(cache.ip_ttl, MAX_IP_TTL)
+        cache.put_ip_city("Zurich", now=NOW)
+        self.assertIsNone(self.cache(30 * 24 * 3600).ip_city(now=NOW + MAX_IP_TTL))
+
+    def test_entry_from_the_future_is_stale(self, _):
+        cache = self.cache(3600)
+        cache.put_ip_city("Zurich", now=NOW)
+        self.assertIsNone(cache.ip_city(now=NOW - 60))
+
+    def test_another_network_misses(self, network_id):
+        cache = self.cache(3600)
+        cache.put_ip_city("Zurich", now=NOW)
+        network_id.return_value = "10.0.0.5"
+        self.assertIsNone(cache.ip_city(now=NOW + 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
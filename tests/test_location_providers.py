@@ -0,0 +1,91 @@
+import asyncio
+import unittest
+
+from app.location_providers import Fix, LocationError, StaticProvider, build_providers, provider_names, race
+
+
+class FakeProvider:
+    def __init__(self, name: str, delay: float, accuracy_m: float | None = 50.0,
+                 deadline: float | None = None, error: Exception | None = None):
+        self.name = name
+        self.delay = delay
+        self.accuracy_m = accuracy_m
+        self.deadline = deadline
+        self.error = error
+
+    async def locate(self) -> Fix:
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return Fix(self.name, (47.0, 8.0), self.accuracy_m, self.name)
+
+
+def run_race(providers, **kwargs):
+    timings = {}
+    try:
+        fix, _ = asyncio.run(race(providers, timings=timings, **kwargs))
+    except LocationError as e:
+        return e, timings
+    return fix, timings
+
+
+class RaceTest(unittest.TestCase):
+    def test_first_accurate_fix_wins_and_cancels_the_rest(self):
+        fix, timings = run_race([FakeProvider("slow", 1.0), FakeProvider("fast", 0.01)],
+                                deadline=2.0, accuracy_m=100)
+        self.assertEqual(fix.provider, "fast")
+        self.assertEqual(timings["fast"].outcome, "ok")
+        self.assertEqual(timings["slow"].outcome, "cancelled")
+
+    def test_most_accurate_fix_by_the_deadline(self):
+        fix, timings = run_race([FakeProvider("city", 0.01, 10_000), FakeProvider("street", 0.05, 500),
+                                 FakeProvider("never", 5.0)], deadline=0.2, accuracy_m=100)
+        self.assertEqual(fix.provider, "street")
+        self.assertEqual(timings["never"].outcome, "timeout")
+
+    def test_unknown_accuracy_loses_to_a_known_one(self):
+        fix, _ = run_race([FakeProvider("unknown", 0.01, None), FakeProvider("known", 0.02, 20_000)],
+                          deadline=0.1, accuracy_m=100)
+        self.assertEqual(fix.provider, "known")
+
+    def test_provider_deadline_gives_up_on_a_slow_provider(self):
+        slow = FakeProvider("winrt", 1.0, 10, deadline=0.05)
+        fix, timings = run_race([slow, FakeProvider("ip", 0.1, 10_000)], deadline=2.0, accuracy_m=100)
+        self.assertEqual(timings["winrt"].outcome, "timeout")
+        self.assertLess(timings["winrt"].seconds, 0.5)
+        # the ip fix is not accurate enough, but with winrt given up on
+        # nothing is left to wait for
+        self.assertEqual(fix.provider, "ip")
+        self.assertLess(timings["ip"].seconds, 0.5)
+
+    def test_every_provider_failing_raises_with_timings(self):
+        error, timings = run_race([FakeProvider("a", 0.01, error=OSError("no device")),
+                                   FakeProvider("b", 1.0, deadline=0.02)], deadline=0.5)
+        self.assertIsInstance(error, LocationError)
+        self.assertIn("a: no device", str(error))
+        self.assertTrue(timings["a"].outcome.startswith("error: OSError"))
+        self.assertEqual(timings["b"].outcome, "timeout")
+
+    def test_no_providers(self):
+        with self.assertRaises(LocationError):
+            asyncio.run(race([]))
+
+
+class ProviderConfigTest(unittest.TestCase):
+    def test_static_location_is_used_alone(self):
+        config = {"static_location": {"name": "Office", "lat": 47.0, "lon": 8.0},
+                  "location_providers": ["winrt", "ip"]}
+        self.assertEqual(provider_names(config), ["static"])
+
+    def test_use_winrt_location_off_drops_winrt(self):
+        self.assertEqual(provider_names({"use_winrt_location": False}), ["ip"])
+
+    def test_provider_deadlines_from_config(self):
+        config = {"static_location": {"lat": 47.0, "lon": 8.0}, "location_provider_deadlines": {"static": 0.5}}
+        [static] = build_providers(["static"], None, config)
+        self.assertIsInstance(static, StaticProvider)
+        self.assertEqual(static.deadline, 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
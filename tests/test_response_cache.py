@@ -0,0 +1,66 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from requirements.response_cache import CacheEntry, ResponseCache
+
+HOURLY = "/weather/forecast/hourly"
+PARAMS = {"lat": 47.37, "lon": 8.54, "units": "metric"}
+SLOT = 3 * 3600
+
+
+class FreshTest(unittest.TestCase):
+    def entry(self, stored_at: float, ttl: float = 600, step: float = 0.0) -> CacheEntry:
+        return CacheEntry(Path("x.json"), stored_at, ttl, body={}, step=step)
+
+    def test_ttl(self):
+        entry = self.entry(1000.0)
+        self.assertTrue(entry.fresh(1000.0 + 599))
+        self.assertFalse(entry.fresh(1000.0 + 600))
+
+    def test_expires_at_the_next_step_not_after_the_ttl(self):
+        stored = 10 * SLOT - 60           # one minute before a slot boundary
+        entry = self.entry(stored, step=SLOT)
+        self.assertTrue(entry.fresh(10 * SLOT - 1))
+        self.assertFalse(entry.fresh(10 * SLOT))
+
+    def test_step_does_not_extend_the_ttl(self):
+        entry = self.entry(10 * SLOT, step=SLOT)
+        self.assertTrue(entry.fresh(10 * SLOT + 599))
+        self.assertFalse(entry.fresh(10 * SLOT + 600))
+
+
+class SharedDirectoryTest(unittest.TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp(prefix="response-cache-test-"))
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+
+    def test_reads_an_entry_another_process_wrote(self):
+        reader = ResponseCache(self.root)      # index built before the entry exists
+        writer = ResponseCache(self.root)
+        writer.store(HOURLY, PARAMS, {"city": "Zurich"}, etag='"v1"')
+
+        entry = reader.lookup(HOURLY, PARAMS)
+        self.assertIsNotNone(entry)
+        self.assertEqual(entry.body, {"city": "Zurich"})
+        self.assertEqual(entry.validators(), {"If-None-Match": '"v1"'})
+        self.assertEqual(entry.step, SLOT)
+        self.assertEqual(reader.stats()["entries"], 1)
+
+    def test_entry_removed_by_another_process_is_a_miss(self):
+        cache = ResponseCache(self.root)
+        cache.store(HOURLY, PARAMS, {"city": "Zurich"})
+        ResponseCache(self.root).clear()
+        self.assertIsNone(cache.lookup(HOURLY, PARAMS))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_uncached_endpoint(self):
+        cache = ResponseCache(self.root)
+        cache.store("/email/send", None, {"ok": True})
+        self.assertIsNone(cache.lookup("/email/send", None))
+        self.assertEqual(list(self.root.iterdir()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
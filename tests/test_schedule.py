@@ -0,0 +1,126 @@
+import unittest
+from array import array
+
+from app.forecast import Forecast
+from app.schedule import RefreshSchedule, next_slot, slot_step
+
+SLOT = 3 * 3600
+T0 = 1_700_006_400   # a slot boundary
+ZURICH = (47.3769, 8.5417)
+ZURICH_NEARBY = (47.3771, 8.5419)
+BERN = (46.9480, 7.4474)
+
+
+def forecast(start: int, rows: int = 8, temp: float = 10.0) -> Forecast:
+    return Forecast(
+        city="Zurich", country="CH", offset=0, time_format="%H:%M",
+        dt=array("q", [start + i * SLOT for i in range(rows)]),
+        temp=array("d", [temp] * rows), wind=array("d", [3.0] * rows), gust=array("d", [5.0] * rows),
+        icon=("10d",) * rows, description=("rain",) * rows,
+    )
+
+
+def schedule(**kwargs) -> RefreshSchedule:
+    return RefreshSchedule(**{"retry_seconds": 900, "slot_grace": 120, "location_max": 3600,
+                              "bank_poll": 5, "bank_poll_max": 60, **kwargs})
+
+
+class SlotTest(unittest.TestCase):
+    def test_next_slot(self):
+        f = forecast(T0)
+        self.assertEqual(slot_step(f), SLOT)
+        self.assertEqual(next_slot(f, T0 + 100), T0 + SLOT)
+        self.assertEqual(next_slot(None, T0 + 100), T0 + SLOT)
+        # past the end of the series, keep stepping on the grid
+        self.assertEqual(next_slot(forecast(T0, rows=1), T0 + 100), T0 + SLOT)
+
+
+class WeatherTest(unittest.TestCase):
+    def test_everything_is_due_at_first(self):
+        self.assertEqual(schedule().due(T0), {"location", "weather", "bank"})
+
+    def test_due_just_after_the_next_slot(self):
+        s = schedule()
+        s.weather_checked(T0 + 100, forecast(T0), ok=True)
+        self.assertEqual(s.weather.due_at, T0 + SLOT + 120)
+        self.assertNotIn("weather", s.due(T0 + SLOT))
+
+    def test_backs_off_while_the_provider_serves_the_old_series(self):
+        s = schedule()
+        f = forecast(T0)
+        s.weather_checked(T0 + 100, f, ok=True)
+        now = s.weather.due_at
+        dues = []
+        for _ in range(3):
+            s.weather_checked(now, f, ok=True)
+            dues.append(s.weather.due_at - now)
+            now = s.weather.due_at
+        self.assertEqual(dues, [120, 240, 480])
+
+        s.weather_checked(now, forecast(T0 + SLOT, temp=12.0), ok=True)
+        self.assertEqual(s.weather.due_at, T0 + 2 * SLOT + 120)
+
+    def test_early_check_waits_for_the_same_slot(self):
+        s = schedule()
+        f = forecast(T0)
+        s.weather_checked(T0 + 100, f, ok=True)
+        s.weather_checked(T0 + 200, f, ok=True)       # manual refresh
+        self.assertEqual(s.weather.due_at, T0 + SLOT + 120)
+
+    def test_failure_retries_after_retry_seconds(self):
+        s = schedule()
+        s.weather_checked(T0, None, ok=False)
+        self.assertEqual(s.weather.due_at, T0 + 900)
+
+
+class LocationTest(unittest.TestCase):
+    def test_backs_off_while_in_the_same_cell(self):
+        s = schedule(grid_precision=6)
+        now, dues = 0.0, []
+        for coords in (ZURICH, ZURICH_NEARBY, ZURICH, ZURICH):
+            self.assertFalse(s.location_checked(now, coords, ok=True))
+            dues.append(s.location.due_at - now)
+            now = s.location.due_at
+        self.assertEqual(dues, [900, 1800, 3600, 3600])
+
+    def test_moving_cells_makes_weather_due(self):
+        s = schedule(grid_precision=6)
+        s.weather_checked(T0 + 100, forecast(T0), ok=True)
+        s.location_checked(T0 + 100, ZURICH, ok=True)
+        self.assertTrue(s.location_checked(T0 + 200, BERN, ok=True))
+        self.assertIn("weather", s.due(T0 + 200))
+        self.assertEqual(s.location.due_at, T0 + 200 + 900)
+
+    def test_without_a_grid_any_move_counts(self):
+        s = schedule()
+        s.location_checked(0.0, ZURICH, ok=True)
+        self.assertTrue(s.location_checked(900.0, ZURICH_NEARBY, ok=True))
+
+
+class BankTest(unittest.TestCase):
+    def test_polls_back_off_until_the_signature_changes(self):
+        s = schedule()
+        self.assertTrue(s.bank_changed(("a.csv", 1)))
+        now, dues = 0.0, []
+        for sig in [("a.csv", 1)] * 6 + [("b.csv", 2)]:
+            s.bank_checked(now, sig, ok=True)
+            dues.append(s.bank.due_at - now)
+            now = s.bank.due_at
+        self.assertEqual(dues, [5, 5, 10, 20, 40, 60, 5])
+        self.assertFalse(s.bank_changed(("b.csv", 2)))
+
+    def test_failed_parse_is_retried_and_still_counts_as_changed(self):
+        s = schedule()
+        s.bank_checked(0.0, ("a.csv", 1), ok=False)
+        self.assertEqual(s.bank.due_at, 900)
+        self.assertTrue(s.bank_changed(("a.csv", 1)))
+
+    def test_wake(self):
+        s = schedule()
+        s.bank_checked(0.0, ("a.csv", 1), ok=True)
+        s.wake()
+        self.assertEqual(s.due(1.0), {"location", "weather", "bank"})
+
+
+if __name__ == "__main__":
+    unittest.main()
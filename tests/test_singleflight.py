@@ -0,0 +1,81 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from requirements.resilience import DeadlineExceeded
+from requirements.singleflight import SingleFlight, flight_key
+
+KEY = flight_key("GET", "/weather/forecast/hourly", {"lat": 47.37, "lon": 8.54})
+
+
+class SingleFlightTest(unittest.TestCase):
+    def setUp(self):
+        self.flights = SingleFlight()
+        self.release = threading.Event()
+        self.requests = 0
+
+    def slow_fetch(self):
+        self.requests += 1
+        self.release.wait(5)
+        return {"city": "Zurich"}
+
+    def start_leader(self) -> dict:
+        out = {}
+        thread = threading.Thread(target=lambda: out.update(result=self.flights.do(KEY, self.slow_fetch)))
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(self.release.set)
+        while not self.flights.stats()["in_flight"]:
+            time.sleep(0.001)
+        out["thread"] = thread
+        return out
+
+    def test_followers_share_the_leaders_result(self):
+        leader = self.start_leader()
+        results = []
+        followers = [threading.Thread(target=lambda: results.append(self.flights.do(KEY, self.slow_fetch)))
+                     for _ in range(3)]
+        for t in followers:
+            t.start()
+        time.sleep(0.02)
+        self.release.set()
+        for t in followers:
+            t.join()
+        leader["thread"].join()
+        self.assertEqual(self.requests, 1)
+        self.assertEqual(results, [{"city": "Zurich"}] * 3)
+        self.assertEqual(self.flights.stats(), {"calls": 4, "saved": 3, "in_flight": 0})
+
+    def test_follower_gives_up_at_its_own_deadline(self):
+        leader = self.start_leader()
+        start = time.monotonic()
+        with self.assertRaises(DeadlineExceeded):
+            self.flights.do(KEY, self.slow_fetch, timeout=0.05)
+        self.assertLess(time.monotonic() - start, 1.0)
+        # the leader carries on and still gets its answer
+        self.release.set()
+        leader["thread"].join()
+        self.assertEqual(leader["result"], {"city": "Zurich"})
+
+    def test_async_follower_gives_up_at_its_own_deadline(self):
+        async def scenario():
+            release = asyncio.Event()
+
+            async def fetch():
+                await release.wait()
+                return {"city": "Zurich"}
+
+            leader = asyncio.ensure_future(self.flights.do_async(KEY, fetch))
+            await asyncio.sleep(0)
+            with self.assertRaises(DeadlineExceeded):
+                await self.flights.do_async(KEY, fetch, timeout=0.05)
+            self.assertFalse(leader.done())
+            release.set()
+            return await leader
+
+        self.assertEqual(asyncio.run(scenario()), {"city": "Zurich"})
+
+
+if __name__ == "__main__":
+    unittest.main()